@@ -1,81 +1,172 @@
 class Node(object):
+    __slots__ = ('lineno',)
+    field_names = __slots__  # every subclass gets its own, see __init_subclass__
+
     def __init__(self):
         self.lineno = None
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.field_names = tuple([name for c in reversed(cls.__mro__) for name in c.__dict__.get('__slots__', ())])
+
     def accept(self, visitor):
         return visitor.visit(self)
 
+    def fields(self):  # (name, value) of every attribute in the order __init__ sets them, vars() of a slotted node
+        return [(name, getattr(self, name)) for name in self.field_names]
+
+    def nodes(self):  # this node and all the nodes below it
+        yield self
+        for _, value in self.fields():
+            for child in value if isinstance(value, list) else [value]:
+                if isinstance(child, Node):
+                    yield from child.nodes()
+
 
 class IntNum(Node):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         super().__init__()
         self.value = int(value)
 
 
 class FloatNum(Node):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         super().__init__()
         self.value = float(value)
 
 
 class StringLiteral(Node):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         super().__init__()
         self.value = value
 
 
 class Tensor(Node):
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+
+class Array(Node):  # constant tensor literal, materialized by the parser as one ndarray
+    __slots__ = ('value',)
+
     def __init__(self, value):
         super().__init__()
         self.value = value
 
 
 class Index(Node):
+    __slots__ = ('index',)
+
     def __init__(self, index):
         super().__init__()
         self.index = index
 
 
 class Variable(Node):
+    __slots__ = ('name', 'index', 'address', 'shape')
+
     def __init__(self, name, index=None):
         super().__init__()
         self.name = name
         self.index = index
+        self.address = None  # (depth, slot), resolved by TypeChecker
+        self.shape = None  # shape of the tensor it reads, None for a scalar, set by TypeChecker
 
 
 class BinExpr(Node):
+    __slots__ = ('op', 'left', 'right', 'type', 'shape')
+
     def __init__(self, op, left, right):
         super().__init__()
         self.op = op
         self.left = left
         self.right = right
+        self.type = None  # 'int', 'float' or 'str', inferred by TypeChecker
+        self.shape = None  # shape of a tensor result, None for a scalar
+
+
+class TypedBinExpr(BinExpr):  # operation whose operand types are known, set up by TypeSpecializer
+    __slots__ = ('operator',)
+
+    def __init__(self, op, left, right, operator):
+        super().__init__(op, left, right)
+        self.operator = operator  # function computing op, no lookup at run time
+
+
+class ScalarBinExpr(TypedBinExpr):  # int/float scalar operands
+    __slots__ = ()
+
+
+class ScalarDivision(TypedBinExpr):  # '/' of int/float scalars, the only one that checks for zero
+    __slots__ = ()
+
+
+class TensorBinExpr(TypedBinExpr):  # element-wise operation of two tensors
+    __slots__ = ()
 
 
 class Transpose(Node):
+    __slots__ = ('expr',)
+
     def __init__(self, expr):
         super().__init__()
         self.expr = expr
 
 
 class Negation(Node):
+    __slots__ = ('expr',)
+
     def __init__(self, expr):
         super().__init__()
         self.expr = expr
 
 
+class FusedExpr(Node):  # tree of element-wise tensor operations evaluated blockwise, set up by TensorFuser
+    __slots__ = ('operands', 'program')
+
+    def __init__(self, operands, program):
+        super().__init__()
+        self.operands = operands  # subtrees below the fused operations
+        self.program = program  # postfix form: operand numbers, '.+', '.-', '.*', './' and 'neg'
+
+
 class Tuple(Node):
+    __slots__ = ('args',)
+
     def __init__(self, args):
+        super().__init__()
         self.args = args
 
 
 class Function(Node):
+    __slots__ = ('function_name', 'args')
+
     def __init__(self, function_name, args):
         super().__init__()
         self.function_name = function_name
         self.args = args
 
 
+class Call(Node):  # statement calling a function for its effect, save(A, "a.npy");
+    __slots__ = ('function',)
+
+    def __init__(self, function):
+        super().__init__()
+        self.function = function
+
+
 class Assignment(Node):
+    __slots__ = ('identifier', 'assignment_type', 'expr')
+
     def __init__(self, identifier, assignment_type, expr):
         super().__init__()
         self.identifier = identifier
@@ -84,14 +175,19 @@ class Assignment(Node):
 
 
 class ForLoop(Node):
+    __slots__ = ('identifier', 'range', 'instructions', 'frame_size')
+
     def __init__(self, identifier, range, instructions):
         super().__init__()
         self.identifier = identifier
         self.range = range
         self.instructions = instructions
+        self.frame_size = None
 
 
 class Range(Node):
+    __slots__ = ('start', 'end')
+
     def __init__(self, start, end):
         super().__init__()
         self.start = start
@@ -99,39 +195,56 @@ class Range(Node):
 
 
 class While(Node):
+    __slots__ = ('condition', 'instructions', 'frame_size')
+
     def __init__(self, condition, instructions):
         super().__init__()
         self.condition = condition
         self.instructions = instructions
+        self.frame_size = None
 
 
 class IfElse(Node):
+    __slots__ = ('condition', 'then_instructions', 'else_instructions', 'then_frame_size', 'else_frame_size')
+
     def __init__(self, condition, then_instructions, else_instructions=None):
         super().__init__()
         self.condition = condition
         self.then_instructions = then_instructions
         self.else_instructions = else_instructions
+        self.then_frame_size = None
+        self.else_frame_size = None
 
 
 class Instructions(Node):
+    __slots__ = ('instructions', 'frame_size')
+
     def __init__(self, instructions):
         super().__init__()
         self.instructions = instructions
+        self.frame_size = None  # set on the program only
 
 
 class Scope(Node):
+    __slots__ = ('instructions', 'frame_size')
+
     def __init__(self, instructions):
         super().__init__()
         self.instructions = instructions
+        self.frame_size = None
 
 
 class Print(Node):
+    __slots__ = ('args',)
+
     def __init__(self, args):
         super().__init__()
         self.args = args
 
 
 class Controlflow(Node):
+    __slots__ = ('command', 'ret_val')
+
     def __init__(self, command, ret_val=None):
         super().__init__()
         self.command = command
@@ -142,6 +255,8 @@ class Controlflow(Node):
 
 
 class Error(Node):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         pass
@@ -0,0 +1,143 @@
+import AST
+import copy
+import struct
+from array import array
+
+# Flat storage of a tree.  Node i has its kind (index in node_classes), its
+# line and the offset of its fields in parallel typed arrays; a field is one
+# int in refs: a node index, NO_VALUE for None, or -2 - k for objects[k], which
+# holds any other value, and the child indices of a list of nodes as an
+# array('i').  arena.node(i) is a view of node i: an instance of a subclass of
+# the node's class, named like it, reading and writing its fields in the arena.
+# Visitors dispatching on the class (TreePrinter, TypeChecker, Interpreter and
+# the other backends) walk views the way they walk ordinary nodes.
+
+node_classes = [cls for cls in vars(AST).values() if isinstance(cls, type) and issubclass(cls, AST.Node)]
+kind_of = {cls: kind for kind, cls in enumerate(node_classes)}
+
+NO_VALUE = -1
+NO_LINE = -1
+
+
+def view_class(cls):
+    namespace = {'__slots__': ('arena', 'node_index')}  # not index, Variable and Index have that field
+
+    def lineno(self):
+        line = self.arena.linenos[self.node_index]
+        return None if line == NO_LINE else line
+
+    def set_lineno(self, value):
+        self.arena.linenos[self.node_index] = NO_LINE if value is None else value
+    namespace['lineno'] = property(lineno, set_lineno)
+
+    for position, name in enumerate(cls.field_names[1:]):
+        def field(self, position=position):
+            arena = self.arena
+            return arena.value(arena.refs[arena.offsets[self.node_index] + position])
+
+        def set_field(self, value, position=position):
+            arena = self.arena
+            arena.refs[arena.offsets[self.node_index] + position] = arena.ref(value)
+        namespace[name] = property(field, set_field)
+
+    namespace['__reduce_ex__'] = lambda self, protocol: self.arena.unpack(self.node_index).__reduce_ex__(protocol)  # pickled as a node
+    namespace['__deepcopy__'] = lambda self, memo: copy.deepcopy(self.arena.unpack(self.node_index), memo)  # copies are nodes
+
+    view = type(cls.__name__, (cls,), namespace)
+    view.field_names = cls.field_names
+    return view
+
+
+view_classes = [view_class(cls) for cls in node_classes]
+kind_of.update({view: kind for kind, view in enumerate(view_classes)})
+
+
+class Arena(object):
+
+    def __init__(self, tree=None):  # arena holding <tree>, its view is arena.root
+        self.kinds = array('B')
+        self.linenos = array('i')
+        self.offsets = array('i')
+        self.refs = array('i')
+        self.objects = []
+        self.object_index = {}  # hashable objects are stored once
+        self.root = self.node(self.pack(tree)) if tree is not None else None
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def nbytes(self):  # size of the arrays and of the object table, not of the objects it refers to
+        arrays = [self.kinds, self.linenos, self.offsets, self.refs]
+        arrays += [obj for obj in self.objects if isinstance(obj, array)]
+        return sum([a.itemsize * len(a) for a in arrays]) + 8 * len(self.objects)
+
+    def pack(self, node):  # index of the copy of <node> and the tree below it appended to the arena
+        index = len(self.kinds)
+        names = node.field_names[1:]
+        self.kinds.append(kind_of[type(node)])
+        self.linenos.append(NO_LINE if node.lineno is None else node.lineno)
+        offset = len(self.refs)
+        self.offsets.append(offset)
+        self.refs.extend([NO_VALUE] * len(names))
+        for position, name in enumerate(names):
+            self.refs[offset + position] = self.ref(getattr(node, name))
+        return index
+
+    def ref(self, value):
+        if value is None:
+            return NO_VALUE
+        if isinstance(value, AST.Node):
+            if getattr(value, 'arena', None) is self:
+                return value.node_index
+            return self.pack(value)
+        if isinstance(value, list) and all([isinstance(el, AST.Node) for el in value]):
+            return self.store(array('i', [self.ref(el) for el in value]))
+        return self.store(value)
+
+    def store(self, obj):
+        try:
+            key = (type(obj), struct.pack('d', obj) if type(obj) is float else obj)  # 0.0 == -0.0, their bits differ
+            hash(key)
+        except TypeError:
+            key = None
+        if key is not None and key in self.object_index:
+            return -2 - self.object_index[key]
+        self.objects.append(obj)
+        if key is not None:
+            self.object_index[key] = len(self.objects) - 1
+        return -1 - len(self.objects)
+
+    def value(self, ref):
+        if ref >= 0:
+            return self.node(ref)
+        if ref == NO_VALUE:
+            return None
+        obj = self.objects[-2 - ref]
+        if isinstance(obj, array):
+            return [self.node(i) for i in obj]
+        return obj
+
+    def node(self, index):  # view of node <index>
+        view = view_classes[self.kinds[index]].__new__(view_classes[self.kinds[index]])
+        view.arena = self
+        view.node_index = index
+        return view
+
+    def unpack(self, index):  # ordinary node equal to node <index>, with the tree below it
+        cls = node_classes[self.kinds[index]]
+        node = cls.__new__(cls)
+        line = self.linenos[index]
+        node.lineno = None if line == NO_LINE else line
+        offset = self.offsets[index]
+        for position, name in enumerate(cls.field_names[1:]):
+            ref = self.refs[offset + position]
+            if ref >= 0:
+                value = self.unpack(ref)
+            elif ref == NO_VALUE:
+                value = None
+            else:
+                value = self.objects[-2 - ref]
+                if isinstance(value, array):
+                    value = [self.unpack(i) for i in value]
+            setattr(node, name, value)
+        return node
@@ -0,0 +1,110 @@
+import sys
+from collections import OrderedDict
+from Fusion import ufunc_names
+
+# Reuse of the tensors a program allocates and drops, e.g. the zeros(n, m),
+# ones(n, m) and A .+ B of a loop body, made again by every iteration.  The
+# pool keeps a reference to every tensor it hands out, by (shape, dtype); one
+# the program no longer refers to, which only the pool holds, is dead and is
+# handed out again for the next request of its shape and dtype.  Views keep
+# their base alive, so a tensor is never reused under a slice or a transpose
+# of it.  Retained bytes are capped: past the cap, the least recently used
+# shapes are dropped from the pool, and their tensors freed once the program
+# drops them too.
+
+
+def free_references():  # references to a dead tensor while take() looks at it: its list, the loop variable, getrefcount's argument
+    for buffer in [object()]:
+        return sys.getrefcount(buffer)
+
+
+FREE = free_references()
+
+
+class BufferPool(object):
+
+    def __init__(self, capacity=1 << 28):  # pool retaining at most <capacity> bytes
+        self.capacity = capacity
+        self.buffers = OrderedDict()  # (shape, dtype) -> tensors handed out, least recently used first
+        self.plans = {}  # (op, dtype, dtype) -> (ufunc, dtype of the result), () if not pooled
+        self.retained = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def take(self, shape, dtype):  # tensor of <shape> and <dtype>, with undefined contents
+        key = (shape, dtype)
+        buffers = self.buffers.get(key)
+        if buffers is not None:
+            self.buffers.move_to_end(key)
+            for buffer in buffers:
+                if sys.getrefcount(buffer) == FREE:
+                    self.hits += 1
+                    return buffer
+
+        import numpy as np
+        buffer = np.empty(shape, dtype)
+        self.misses += 1
+        self.buffers.setdefault(key, []).append(buffer)
+        self.retained += buffer.nbytes
+        while self.retained > self.capacity:
+            self.evict()
+        return buffer
+
+    def evict(self):  # drops the least recently used tensor, the program may still use it
+        key, buffers = next(iter(self.buffers.items()))
+        self.retained -= buffers.pop(0).nbytes
+        self.evictions += 1
+        if not buffers:
+            del self.buffers[key]
+
+    def zeros(self, shape):
+        buffer = self.take(shape, float_dtype())
+        buffer.fill(0)
+        return buffer
+
+    def ones(self, shape):
+        buffer = self.take(shape, float_dtype())
+        buffer.fill(1)
+        return buffer
+
+    def eye(self, n):
+        buffer = self.zeros((n, n))
+        buffer.reshape(-1)[::n + 1] = 1
+        return buffer
+
+    def elementwise(self, op, left, right):  # left <op> right into a pooled tensor, None unless both are same-shaped tensors
+        try:
+            key = (op, left.dtype, right.dtype)
+        except AttributeError:  # a scalar
+            return None
+        plan = self.plans.get(key)
+        if plan is None:
+            plan = self.plans[key] = self.plan(*key)
+        if not plan or not left.shape or left.shape != right.shape:  # NumPy scalars have a dtype and no shape
+            return None
+        ufunc, dtype = plan
+        return ufunc(left, right, out=self.take(left.shape, dtype))
+
+    @staticmethod
+    def plan(op, left, right):  # (ufunc, dtype of the result) of <op> on numeric dtypes <left> and <right>, () otherwise
+        import numpy as np
+        if left.kind not in 'biufc' or right.kind not in 'biufc':
+            return ()
+        ufunc = getattr(np, ufunc_names[op])
+        try:
+            return ufunc, ufunc.resolve_dtypes((left, right, None))[-1]
+        except (TypeError, ValueError):  # the plain operator raises its own error
+            return ()
+
+    def report(self, file=sys.stderr):
+        requests = self.hits + self.misses
+        print(f'\nbuffer pool: {self.hits} hits, {self.misses} misses '
+              f'({100 * self.hits / requests if requests else 0:.1f}% hits), {self.evictions} evictions, '
+              f'{self.retained / 2 ** 20:.1f}MB retained in {sum([len(b) for b in self.buffers.values()])} tensors',
+              file=file)
+
+
+def float_dtype():
+    import numpy as np
+    return np.dtype(np.float64)
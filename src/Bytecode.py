@@ -0,0 +1,463 @@
+import AST
+import struct
+from array import array
+from visit import *
+from Interpreter import constant_index, inplace_mapping
+
+# Register-based bytecode.  Every instruction is four ints: opcode, a, b, c.
+# Register operands index one flat register file laid out as
+# [variables | constants | temporaries]; constants are interned in Program.consts
+# and copied into their registers once, when the VM starts.
+
+opnames = [
+    'HALT',
+    'MOVE',       # a = b
+    'COPY',       # a = copy of array b
+    'ADD',        # a = b + c
+    'SUB',        # a = b - c
+    'MUL',        # a = b * c
+    'DIV',        # a = b / c, raises on division by zero
+    'TRUEDIV',    # a = b ./ c
+    'LT',         # a = b < c
+    'GT',         # a = b > c
+    'LE',         # a = b <= c
+    'GE',         # a = b >= c
+    'EQ',         # a = b == c
+    'NE',         # a = b != c
+    'JNLT',       # if not b < c: goto a
+    'JNGT',       # if not b > c: goto a
+    'JNLE',       # if not b <= c: goto a
+    'JNGE',       # if not b >= c: goto a
+    'JNEQ',       # if not b == c: goto a
+    'JNNE',       # if not b != c: goto a
+    'JMP',        # goto a
+    'JMPF',       # if not b: goto a
+    'NEG',        # a = -b
+    'TRANSPOSE',  # a = b'
+    'FORPREP',    # loop counter b (end in b+1), iterator c: c = b, or goto a when the range is empty
+    'FORLOOP',    # b += 1; if b < b+1: c = b; goto a
+    'RANGE',      # a = b:c
+    'INDEX',      # a = index tuple of registers b .. b+c-1
+    'GETITEM',    # a = b[c]
+    'SETITEM',    # a[b] = c
+    'INPLACE',    # a = a <op> b, in place into tensor a when it holds the result, op = inplace_ops[c]
+    'INPLACEITEM',  # a[b] <op>= b+1, in place into the sub-tensor, op = inplace_ops[c]
+    'TUPLE',      # a = tuple of registers b .. b+c-1
+    'TENSOR',     # a = np.array of registers b .. b+c-1
+    'FUSED',      # a = fused program b of operands b+1 .. b+c-1
+    'CALL',       # a = names[b](*c)
+    'PRINT',      # print registers a .. a+b-1
+    'RETURN',     # exit with a
+    'RETURNNONE',  # exit with no value
+    'UNDECLARED',  # raise, names[a] is not declared
+]
+
+for opcode, name in enumerate(opnames):
+    globals()[name] = opcode
+
+# operand kinds per opcode: r - register, j - jump target, n - count, s - name, o - element-wise operator
+operands = {
+    HALT: '', MOVE: 'rr', COPY: 'rr', ADD: 'rrr', SUB: 'rrr', MUL: 'rrr', DIV: 'rrr', TRUEDIV: 'rrr',
+    LT: 'rrr', GT: 'rrr', LE: 'rrr', GE: 'rrr', EQ: 'rrr', NE: 'rrr',
+    JNLT: 'jrr', JNGT: 'jrr', JNLE: 'jrr', JNGE: 'jrr', JNEQ: 'jrr', JNNE: 'jrr',
+    JMP: 'j', JMPF: 'jr', NEG: 'rr', TRANSPOSE: 'rr',
+    FORPREP: 'jrr', FORLOOP: 'jrr', RANGE: 'rrr', INDEX: 'rrn', GETITEM: 'rrr', SETITEM: 'rrr',
+    INPLACE: 'rro', INPLACEITEM: 'rro',
+    TUPLE: 'rrn', TENSOR: 'rrn', FUSED: 'rrn', CALL: 'rsr', PRINT: 'rn', RETURN: 'r', RETURNNONE: '', UNDECLARED: 's',
+}
+
+binary_opcodes = {
+    '+': ADD, '-': SUB, '*': MUL, '/': DIV,
+    '.+': ADD, '.-': SUB, '.*': MUL, './': TRUEDIV,
+    '<': LT, '>': GT, '<=': LE, '>=': GE, '==': EQ, '!=': NE,
+}
+
+jump_unless = {LT: JNLT, GT: JNGT, LE: JNLE, GE: JNGE, EQ: JNEQ, NE: JNNE}
+
+inplace_ops = list(inplace_mapping)  # operators of the compound assignments to tensors, A .+= B
+
+VAR, CONST, TEMP = range(3)  # register kinds before relocation
+
+
+class Program(object):
+    def __init__(self, code, lines, consts, names, variables, temps):
+        self.code = code            # array('i'), four ints per instruction
+        self.lines = lines          # array('i'), .m line of every instruction
+        self.consts = consts        # interned constants, and the arrays of tensor literals
+        self.names = names          # interned variable and function names
+        self.variables = variables  # names index of every variable register
+        self.temps = temps          # number of temporary registers
+
+    @property
+    def registers(self):
+        return len(self.variables) + len(self.consts) + self.temps
+
+    def register_name(self, r):
+        if r < len(self.variables):
+            return self.names[self.variables[r]]
+        if r < len(self.variables) + len(self.consts):
+            return repr(self.consts[r - len(self.variables)])
+        return f'r{r}'
+
+
+class BytecodeCompiler(object):
+    """Compiles a checked AST into a Program for VirtualMachine.
+
+    Variables are resolved statically to registers, one per (frame, name)
+    pair, following the scoping rules of MemoryStack.  Expressions write their
+    result straight into the destination register whenever they can.
+    """
+
+    def __init__(self):
+        self.code = []
+        self.lines = []
+        self.consts = []
+        self.const_index = {}
+        self.names = []
+        self.name_index = {}
+        self.variables = []
+        self.frames = [{}]  # one {name: register} dict per run-time frame
+        self.temp = 0
+        self.max_temps = 0
+        self.loops = []  # ([break jumps], [continue jumps]) of enclosing loops
+
+    def compile_program(self, node):
+        self.compile(node)
+        self.emit(HALT, lineno=0)
+        return self.relocate()
+
+    # registers are (kind, index) pairs until relocate() lays out the register file
+    def intern_name(self, name):
+        if name not in self.name_index:
+            self.name_index[name] = len(self.names)
+            self.names.append(name)
+        return self.name_index[name]
+
+    def constant(self, value):
+        key = (type(value), struct.pack('d', value) if type(value) is float else value)  # 0.0 == -0.0, their bits differ
+        if key not in self.const_index:
+            self.const_index[key] = len(self.consts)
+            self.consts.append(value)
+        return CONST, self.const_index[key]
+
+    def new_temp(self, count=1):
+        r = self.temp
+        self.temp += count
+        self.max_temps = max(self.max_temps, self.temp)
+        return [(TEMP, r + i) for i in range(count)]
+
+    def lookup(self, name):
+        for frame in reversed(self.frames):
+            if name in frame:
+                return frame[name]
+        return None
+
+    def declare(self, name):
+        r = self.lookup(name)
+        if r is None:
+            r = VAR, len(self.variables)
+            self.variables.append(self.intern_name(name))
+            self.frames[-1][name] = r
+        return r
+
+    def reference(self, name, lineno):
+        r = self.lookup(name)
+        if r is None:
+            self.emit(UNDECLARED, self.intern_name(name), lineno=lineno)
+            r = self.new_temp()[0]
+        return r
+
+    def emit(self, opcode, a=0, b=0, c=0, lineno=None):
+        self.code.append([opcode, a, b, c])
+        self.lines.append(lineno or 0)
+        return len(self.code) - 1
+
+    def label(self):
+        return len(self.code)
+
+    def patch(self, instruction, target):
+        self.code[instruction][1] = target
+
+    def relocate(self):
+        base = {VAR: 0, CONST: len(self.variables), TEMP: len(self.variables) + len(self.consts)}
+        code = array('i')
+        for opcode, *args in self.code:
+            code.append(opcode)
+            for kind, arg in zip(operands[opcode].ljust(3), args):
+                if kind == 'r':
+                    arg = base[arg[0]] + arg[1]
+                elif kind == 'j':
+                    arg *= 4
+                code.append(arg)
+        return Program(code, array('i', self.lines), self.consts, self.names, self.variables, self.max_temps)
+
+    def into(self, node, target):  # compiles <node> so that its value ends up in register <target>
+        r = self.compile(node, target)
+        if r != target:
+            self.emit(MOVE, target, r, lineno=node.lineno)
+
+    def statement(self, node):  # temporaries live only as long as the statement that needs them
+        temp = self.temp
+        self.compile(node)
+        self.temp = temp
+
+    def condition(self, node):  # emits a conditional jump taken when <node> is false, returns it for patching
+        if isinstance(node, AST.BinExpr) and binary_opcodes[node.op] in jump_unless:
+            left = self.compile(node.left)
+            right = self.compile(node.right)
+            return self.emit(jump_unless[binary_opcodes[node.op]], 0, left, right, lineno=node.lineno)
+        return self.emit(JMPF, 0, self.compile(node), lineno=node.lineno)
+
+    def sequence(self, nodes):  # compiles <nodes> into consecutive registers, returns the first one
+        registers = self.new_temp(len(nodes))
+        for node, r in zip(nodes, registers):
+            self.into(node, r)
+        return registers[0] if registers else (TEMP, self.temp)
+
+    @on('node')
+    def compile(self, node, target=None):
+        pass
+
+    @when(AST.Node)
+    def compile(self, node, target=None):
+        raise RuntimeError(f'BytecodeCompilerError: can\'t compile {node.__class__.__name__}, line {node.lineno}')
+
+    @when(AST.BinExpr)
+    def compile(self, node, target=None):
+        left = self.compile(node.left)
+        right = self.compile(node.right)
+        target = target or self.new_temp()[0]
+        self.emit(binary_opcodes[node.op], target, left, right, lineno=node.lineno)
+        return target
+
+    @when(AST.Assignment)
+    def compile(self, node, target=None):
+        idf = node.identifier
+
+        if idf.index is None:  # working with simple variable
+            if node.assignment_type == '=':
+                var = self.lookup(idf.name)
+                if var is not None:
+                    self.into(node.expr, var)
+                else:
+                    r = self.compile(node.expr)
+                    self.emit(MOVE, self.declare(idf.name), r, lineno=node.lineno)
+            elif node.assignment_type[:-1] in inplace_mapping:  # element-wise, on a tensor
+                r = self.compile(node.expr)
+                var = self.reference(idf.name, node.lineno)
+                self.emit(INPLACE, var, r, inplace_ops.index(node.assignment_type[:-1]), lineno=node.lineno)
+            else:
+                r = self.compile(node.expr)
+                left = self.reference(idf.name, node.lineno)
+                var = self.declare(idf.name)
+                self.emit(binary_opcodes[node.assignment_type[:-1]], var, left, r, lineno=node.lineno)
+        elif node.assignment_type[:-1] in inplace_mapping:  # element-wise, on a sub-tensor
+            index, value = self.new_temp(2)
+            self.into(node.expr, value)
+            self.into(idf.index, index)
+            var = self.reference(idf.name, node.lineno)
+            self.emit(INPLACEITEM, var, index, inplace_ops.index(node.assignment_type[:-1]), lineno=node.lineno)
+        else:  # variable with indexes
+            r = self.compile(node.expr)
+            index = self.compile(idf.index)
+            var = self.reference(idf.name, node.lineno)
+            if node.assignment_type != '=':
+                value = self.new_temp()[0]
+                self.emit(GETITEM, value, var, index, lineno=node.lineno)
+                self.emit(binary_opcodes[node.assignment_type[:-1]], value, value, r, lineno=node.lineno)
+                r = value
+            self.emit(SETITEM, var, index, r, lineno=node.lineno)
+
+    @when(AST.Index)
+    def compile(self, node, target=None):
+        constant = constant_index(node)
+        if constant is not None:  # slices aren't hashable, so every literal index gets its own constant
+            self.consts.append(constant)
+            return CONST, len(self.consts) - 1
+        first = self.sequence(node.index)
+        target = target or self.new_temp()[0]
+        self.emit(INDEX, target, first, len(node.index), lineno=node.lineno)
+        return target
+
+    @when(AST.Variable)
+    def compile(self, node, target=None):
+        var = self.reference(node.name, node.lineno)
+        if not node.index:
+            return var
+        index = self.compile(node.index)
+        target = target or self.new_temp()[0]
+        self.emit(GETITEM, target, var, index, lineno=node.lineno)
+        return target
+
+    @when(AST.Transpose)
+    def compile(self, node, target=None):
+        r = self.compile(node.expr)
+        target = target or self.new_temp()[0]
+        self.emit(TRANSPOSE, target, r, lineno=node.lineno)
+        return target
+
+    @when(AST.FusedExpr)
+    def compile(self, node, target=None):
+        first = self.new_temp()[0]
+        self.emit(MOVE, first, self.constant(node.program), lineno=node.lineno)
+        self.sequence(node.operands)
+        target = target or self.new_temp()[0]
+        self.emit(FUSED, target, first, len(node.operands) + 1, lineno=node.lineno)
+        return target
+
+    @when(AST.Negation)
+    def compile(self, node, target=None):
+        r = self.compile(node.expr)
+        target = target or self.new_temp()[0]
+        self.emit(NEG, target, r, lineno=node.lineno)
+        return target
+
+    @when(AST.Tuple)
+    def compile(self, node, target=None):
+        first = self.sequence(node.args)
+        target = target or self.new_temp()[0]
+        self.emit(TUPLE, target, first, len(node.args))
+        return target
+
+    @when(AST.Function)
+    def compile(self, node, target=None):
+        args = self.compile(node.args)
+        target = target or self.new_temp()[0]
+        self.emit(CALL, target, self.intern_name(node.function_name), args, lineno=node.lineno)
+        return target
+
+    @when(AST.Call)
+    def compile(self, node, target=None):
+        self.compile(node.function)
+
+    @when(AST.While)
+    def compile(self, node, target=None):
+        self.frames.append({})
+        start = self.label()
+        exit_jump = self.condition(node.condition)
+        self.loops.append(([], []))
+        self.statement(node.instructions)
+        breaks, continues = self.loops.pop()
+        self.emit(JMP, start, lineno=node.lineno)
+        for jump in continues:
+            self.patch(jump, start)
+        for jump in [exit_jump] + breaks:
+            self.patch(jump, self.label())
+        self.frames.pop()
+
+    @when(AST.Range)
+    def compile(self, node, target=None):
+        start = self.compile(node.start)
+        end = self.compile(node.end)
+        target = target or self.new_temp()[0]
+        self.emit(RANGE, target, start, end, lineno=node.lineno)
+        return target
+
+    @when(AST.ForLoop)
+    def compile(self, node, target=None):
+        counter = self.new_temp(2)
+        self.into(node.range.start, counter[0])
+        self.into(node.range.end, counter[1])
+        self.frames.append({})
+        iterator = self.declare(node.identifier.name)
+        prep = self.emit(FORPREP, 0, counter[0], iterator, lineno=node.lineno)
+        body = self.label()
+        self.loops.append(([], []))
+        self.statement(node.instructions)
+        breaks, continues = self.loops.pop()
+        step = self.emit(FORLOOP, body, counter[0], iterator, lineno=node.lineno)
+        for jump in continues:
+            self.patch(jump, step)
+        for jump in [prep] + breaks:
+            self.patch(jump, self.label())
+        self.frames.pop()
+
+    @when(AST.IfElse)
+    def compile(self, node, target=None):
+        else_jump = self.condition(node.condition)
+        self.frames.append({})
+        self.statement(node.then_instructions)
+        self.frames.pop()
+        if node.else_instructions:
+            end_jump = self.emit(JMP, lineno=node.lineno)
+            self.patch(else_jump, self.label())
+            self.frames.append({})
+            self.statement(node.else_instructions)
+            self.frames.pop()
+            self.patch(end_jump, self.label())
+        else:
+            self.patch(else_jump, self.label())
+
+    @when(AST.Instructions)
+    def compile(self, node, target=None):
+        for instruction in node.instructions:
+            self.statement(instruction)
+
+    @when(AST.Scope)
+    def compile(self, node, target=None):
+        self.frames.append({})
+        self.statement(node.instructions)
+        self.frames.pop()
+
+    @when(AST.Print)
+    def compile(self, node, target=None):
+        first = self.sequence(node.args.args)
+        self.emit(PRINT, first, len(node.args.args), lineno=node.lineno)
+
+    @when(AST.Controlflow)
+    def compile(self, node, target=None):
+        if node.command == 'return':
+            if node.ret_val:
+                self.emit(RETURN, self.compile(node.ret_val), lineno=node.lineno)
+            else:
+                self.emit(RETURNNONE, lineno=node.lineno)
+        else:  # jump targets are patched once the enclosing loop is complete
+            breaks, continues = self.loops[-1]
+            (breaks if node.command == 'break' else continues).append(self.emit(JMP, lineno=node.lineno))
+
+    @when(AST.IntNum)
+    def compile(self, node, target=None):
+        return self.constant(node.value)
+
+    @when(AST.FloatNum)
+    def compile(self, node, target=None):
+        return self.constant(node.value)
+
+    @when(AST.StringLiteral)
+    def compile(self, node, target=None):
+        return self.constant(node.value)
+
+    @when(AST.Array)
+    def compile(self, node, target=None):  # arrays aren't hashable, so every literal gets its own constant
+        self.consts.append(node.value)
+        target = target or self.new_temp()[0]
+        self.emit(COPY, target, (CONST, len(self.consts) - 1), lineno=node.lineno)
+        return target
+
+    @when(AST.Tensor)
+    def compile(self, node, target=None):
+        first = self.sequence(node.value)
+        target = target or self.new_temp()[0]
+        self.emit(TENSOR, target, first, len(node.value), lineno=node.lineno)
+        return target
+
+
+def disassemble(program, file=None):
+    print(f'{program.registers} registers: {len(program.variables)} variables, '
+          f'{len(program.consts)} constants, {program.temps} temporaries', file=file)
+    code = program.code
+    for pc in range(0, len(code), 4):
+        opcode = code[pc]
+        args = []
+        for kind, arg in zip(operands[opcode], code[pc + 1:pc + 4]):
+            if kind == 'r':
+                args.append(program.register_name(arg))
+            elif kind == 'j':
+                args.append(f'-> {arg}')
+            elif kind == 's':
+                args.append(program.names[arg])
+            elif kind == 'o':
+                args.append(inplace_ops[arg])
+            else:
+                args.append(str(arg))
+        print(f'{program.lines[pc // 4]:>6} {pc:>6}  {opnames[opcode]:<11} {", ".join(args)}', file=file)
@@ -0,0 +1,397 @@
+import AST
+from Memory import *
+from Signals import *
+from visit import *
+from Interpreter import Interpreter, index_element, constant_index, in_bounds, index_text
+from Interpreter import inplace_mapping, compound, compound_item
+from Fusion import fused
+from Library import functions
+import sys
+
+
+class ClosureCompiler(object):
+    """Execution backend that translates a checked AST into nested closures.
+
+    Every node is compiled exactly once, before execution starts, into a
+    zero-argument callable.  Running the program is then a chain of direct
+    calls, with no per-node type dispatch on the hot path.  Semantics (scopes,
+    break/continue/return, error messages and line numbers) follow Interpreter.
+    """
+    operator_mapping = Interpreter.operator_mapping
+
+    def error(self, msg, lineno):
+        raise RuntimeError(f'{msg}, line {lineno}')
+
+    def __init__(self):
+        self.memory_stack = MemoryStack()
+
+    def visit(self, node):  # so that ast.accept(ClosureCompiler()) compiles and runs the program
+        return self.compile(node)()
+
+    @on('node')
+    def compile(self, node):
+        pass
+
+    @when(AST.Node)
+    def compile(self, node):
+        self.error(f'InterpreterFatalError: can\'t execute instruction of type {node.__class__.__name__}', node.lineno)
+
+    @when(AST.BinExpr)
+    def compile(self, node):
+        left = self.compile(node.left)
+        right = self.compile(node.right)
+        op = self.operator_mapping[node.op]
+        error = self.error
+        lineno = node.lineno
+
+        if node.op == '/':
+            def run():
+                r1 = left()
+                r2 = right()
+                if r2 == 0:
+                    error('ArithmeticError: Division by zero', lineno)
+                try:
+                    return op(r1, r2)
+                except Exception as e:
+                    error(e, lineno)
+        else:
+            def run():
+                r1 = left()
+                r2 = right()
+                try:
+                    return op(r1, r2)
+                except Exception as e:
+                    error(e, lineno)
+        return run
+
+    @when(AST.Assignment)
+    def compile(self, node):
+        expr = self.compile(node.expr)
+        idf = node.identifier
+        var_name = idf.name
+        depth, slot = idf.address
+        stack = self.memory_stack.stack
+        lineno = node.lineno
+        error = self.error
+        op_name = node.assignment_type[:-1]
+        op = None if node.assignment_type == '=' else self.operator_mapping[op_name]
+        inplace = op_name in inplace_mapping  # element-wise, on a tensor
+
+        if idf.index is None:  # working with simple variable
+            if op is None:
+                def run():
+                    value = expr()
+                    stack[depth][slot] = value
+            elif inplace:
+                def run():
+                    r = expr()
+                    left = stack[depth][slot]
+                    if left is None:
+                        error(f'NameError: name {var_name} used before assignment', lineno)
+                    stack[depth][slot] = compound(op_name, left, r)
+            else:
+                def run():
+                    r = expr()
+                    left = stack[depth][slot]
+                    if left is None:
+                        error(f'NameError: name {var_name} used before assignment', lineno)
+                    value = op(left, r)
+                    stack[depth][slot] = value
+            return run
+
+        index = self.compile(idf.index)
+
+        def run():  # variable with indexes
+            r = expr()
+            idx = index()
+            var_value = stack[depth][slot]
+            if var_value is None:
+                error(f'{var_name} does not declared in this scope', lineno)
+
+            if not in_bounds(idx, var_value.shape):
+                error(f'{index_text(idx)} index out of {var_name} shape {var_value.shape}', lineno)
+
+            if inplace:
+                try:
+                    compound_item(op_name, var_value, idx, r)
+                except Exception as e:
+                    error(f'InternalInterpreterError: {e}', lineno)
+                return
+            if op is None:
+                value = r
+            else:
+                try:
+                    value = op(var_value[idx], r)
+                except Exception as e:
+                    error(f'InternalInterpreterError: {e}', lineno)
+            try:
+                var_value[idx] = value
+            except ValueError as e:  # e.g. into a tensor loaded read-only
+                error(f'InternalInterpreterError: {e}', lineno)
+        return run
+
+    @when(AST.Index)
+    def compile(self, node):
+        constant = constant_index(node)
+        if constant is not None:  # e.g. D[1:3, 2:4], built once
+            return lambda: constant
+        elements = [self.compile(el) for el in node.index]
+        error = self.error
+        lineno = node.lineno
+
+        def run():
+            idx = []
+            for el in elements:
+                ev_el = el()
+                if not (isinstance(ev_el, int) or isinstance(ev_el, range)):
+                    error('index element is not of int or range type', lineno)
+                idx.append(index_element(ev_el))
+            return tuple(idx)
+        return run
+
+    @when(AST.Variable)
+    def compile(self, node):
+        name = node.name
+        depth, slot = node.address
+        stack = self.memory_stack.stack
+        lineno = node.lineno
+        error = self.error
+
+        if not node.index:
+            def run():
+                value = stack[depth][slot]
+                if value is None:
+                    error(f'{name} does not declared in this scope', lineno)
+                return value
+            return run
+
+        index = self.compile(node.index)
+
+        def run():
+            var_value = stack[depth][slot]
+            if var_value is None:
+                error(f'{name} does not declared in this scope', lineno)
+
+            idx = index()
+            if not in_bounds(idx, var_value.shape):
+                error(f'{index_text(idx)} index out of {name} shape {var_value.shape}', lineno)
+            return var_value[idx]
+        return run
+
+    @when(AST.Transpose)
+    def compile(self, node):
+        import numpy as np
+        expr = self.compile(node.expr)
+        transpose = np.transpose
+        return lambda: transpose(expr())
+
+    @when(AST.Negation)
+    def compile(self, node):
+        expr = self.compile(node.expr)
+        return lambda: -expr()
+
+    @when(AST.FusedExpr)
+    def compile(self, node):
+        operands = [self.compile(operand) for operand in node.operands]
+        program = node.program
+        error = self.error
+        lineno = node.lineno
+
+        def run():
+            values = [operand() for operand in operands]
+            try:
+                return fused(program, values)
+            except Exception as e:
+                error(e, lineno)
+        return run
+
+    @when(AST.Tuple)
+    def compile(self, node):
+        args = [self.compile(arg) for arg in node.args]
+        return lambda: tuple([arg() for arg in args])
+
+    @when(AST.Function)
+    def compile(self, node):
+        args = self.compile(node.args)
+        name = node.function_name
+        function = functions[name].function
+        error = self.error
+        lineno = node.lineno
+
+        def call():
+            try:
+                return function(*args())
+            except Exception as e:
+                error(f'{name}: {e}', lineno)
+        return call
+
+    @when(AST.Call)
+    def compile(self, node):
+        function = self.compile(node.function)
+
+        def run():
+            function()
+        return run
+
+    @when(AST.While)
+    def compile(self, node):
+        condition = self.compile(node.condition)
+        instructions = self.compile(node.instructions)
+        frame_size = node.frame_size
+        push = self.memory_stack.push
+        pop = self.memory_stack.pop
+
+        def run():
+            push(Memory('while', frame_size))
+            try:
+                while condition():
+                    signal = instructions()
+                    if signal is not None and signal is not CONTINUE:
+                        if signal is BREAK:
+                            break
+                        return signal
+            finally:
+                pop()
+        return run
+
+    @when(AST.Range)
+    def compile(self, node):
+        if isinstance(node.start, AST.IntNum) and isinstance(node.end, AST.IntNum):  # e.g. bounds folded by ConstantFolder
+            r = range(node.start.value, node.end.value)
+            return lambda: r
+        start = self.compile(node.start)
+        end = self.compile(node.end)
+        error = self.error
+        lineno = node.lineno
+
+        def run():
+            s = start()
+            e = end()
+            if not (isinstance(s, int) and isinstance(e, int)):
+                error('range only support int values', lineno)
+            return range(s, e)
+        return run
+
+    @when(AST.ForLoop)
+    def compile(self, node):
+        rng = self.compile(node.range)
+        instructions = self.compile(node.instructions)
+        depth, slot = node.identifier.address
+        frame_size = node.frame_size
+        stack = self.memory_stack.stack
+        push = self.memory_stack.push
+        pop = self.memory_stack.pop
+
+        def run():
+            r = rng()
+            push(Memory('for', frame_size))
+            try:
+                for i in r:
+                    stack[depth][slot] = i
+                    signal = instructions()
+                    if signal is not None and signal is not CONTINUE:
+                        if signal is BREAK:
+                            break
+                        return signal
+            finally:
+                pop()
+        return run
+
+    @when(AST.IfElse)
+    def compile(self, node):
+        condition = self.compile(node.condition)
+        then_instructions = self.compile(node.then_instructions)
+        else_instructions = self.compile(node.else_instructions) if node.else_instructions else None
+        then_frame_size = node.then_frame_size
+        else_frame_size = node.else_frame_size
+        push = self.memory_stack.push
+        pop = self.memory_stack.pop
+
+        def run():
+            if condition():
+                push(Memory('then', then_frame_size))
+                try:
+                    return then_instructions()
+                finally:
+                    pop()
+            elif else_instructions:
+                push(Memory('else', else_frame_size))
+                try:
+                    return else_instructions()
+                finally:
+                    pop()
+        return run
+
+    @when(AST.Instructions)
+    def compile(self, node):
+        instructions = [self.compile(instruction) for instruction in node.instructions]
+        if node.frame_size is not None:  # the program, its variables live in the global memory
+            self.memory_stack.stack[0].reserve(node.frame_size)
+
+        def run():
+            for instruction in instructions:
+                signal = instruction()
+                if signal is not None:  # break and continue end the block, return ends the program
+                    if isinstance(signal, ReturnValue):
+                        print(f'Returned value: {signal.value}')
+                        sys.exit(-1)
+                    return signal
+        return run
+
+    @when(AST.Scope)
+    def compile(self, node):
+        instructions = self.compile(node.instructions)
+        frame_size = node.frame_size
+        push = self.memory_stack.push
+        pop = self.memory_stack.pop
+
+        def run():
+            push(Memory('scope', frame_size))
+            try:
+                return instructions()
+            finally:
+                pop()
+        return run
+
+    @when(AST.Print)
+    def compile(self, node):
+        args = self.compile(node.args)
+
+        def run():
+            print(' '.join([str(arg) for arg in args()]))
+        return run
+
+    @when(AST.Controlflow)
+    def compile(self, node):
+        if node.command == 'break':
+            return lambda: BREAK
+        elif node.command == 'continue':
+            return lambda: CONTINUE
+        ret_val = self.compile(node.ret_val) if node.ret_val else None
+        return lambda: ReturnValue(ret_val() if ret_val else None)
+
+    @when(AST.IntNum)
+    def compile(self, node):
+        value = node.value
+        return lambda: value
+
+    @when(AST.FloatNum)
+    def compile(self, node):
+        value = node.value
+        return lambda: value
+
+    @when(AST.StringLiteral)
+    def compile(self, node):
+        value = node.value
+        return lambda: value
+
+    @when(AST.Array)
+    def compile(self, node):
+        return node.value.copy
+
+    @when(AST.Tensor)
+    def compile(self, node):
+        import numpy as np
+        elements = [self.compile(el) for el in node.value]
+        array = np.array
+        return lambda: array([el() for el in elements])
@@ -0,0 +1,307 @@
+import AST
+import os
+import math
+import keyword
+import builtins
+import Runtime
+from visit import *
+from Interpreter import constant_index, inplace_mapping
+
+
+class CodeGenerator(object):
+    """Translates a checked AST into a Python module and runs it natively.
+
+    Loops become real Python for/while loops over function locals, so CPython's
+    own bytecode runs the hot paths.  Every .m frame (program, loop, branch and
+    block) is resolved statically the way MemoryStack resolves it at run time,
+    and each (frame, name) pair gets its own Python identifier.
+    """
+    binary_operators = {
+        '+': '+',
+        '-': '-',
+        '*': '*',
+        '/': '/',
+        '.+': '+',
+        '.-': '-',
+        '.*': '*',
+        './': '/',
+        '==': '==',
+        '!=': '!=',
+        '>': '>',
+        '<': '<',
+        '>=': '>=',
+        '<=': '<=',
+    }
+
+    helpers = ['div', 'make_range', 'index', 'get_item', 'set_item', 'compound', 'fused', 'call', 'undeclared', 'exit_with']
+
+    reserved = set(dir(builtins)) | {'np', 'Runtime', 'main', 'linenos'} | {'_' + h for h in helpers}
+
+    def __init__(self, output=None):  # output: path of the generated module, kept on disk for inspection
+        self.output = output
+        self.lines = []
+        self.linenos = {}
+        self.indent = 1
+        self.frames = [{}]  # one {name: identifier} dict per run-time frame
+        self.identifiers = set()
+        self.arrays = []  # module-level definitions of the materialized tensor literals
+        self.indexes = []  # module-level definitions of the literal indexes, e.g. D[1:3, 2:4]
+        self.numpy = False  # numpy is imported only by modules that use tensors
+
+    @staticmethod
+    def module_path(filename):  # lab5/pi.m -> lab5/__mgen__/pi.py
+        directory, name = os.path.split(filename)
+        return os.path.join(directory, '__mgen__', os.path.splitext(name)[0] + '.py')
+
+    def visit(self, node):  # so that ast.accept(CodeGenerator()) generates and runs the program
+        filename = self.output or '<generated>'
+        source = self.generate_module(node)
+
+        if self.output:
+            os.makedirs(os.path.dirname(self.output) or '.', exist_ok=True)
+            with open(self.output, 'w') as file:
+                file.write(source)
+
+        namespace = {'__name__': '__mgen__'}
+        exec(compile(source, filename, 'exec'), namespace)
+        Runtime.run(namespace['main'], namespace['linenos'], filename)
+
+    def generate_module(self, node):
+        self.generate(node)
+        if len(self.lines) == 0:
+            self.emit('pass')
+
+        header = [
+            '# Generated by CodeGenerator -- do not edit.',
+        ] + ['import numpy as np'] * self.numpy + [
+            'import Runtime',
+            '',
+        ] + self.arrays + self.indexes + [
+            '',
+            'def main():',
+        ] + [f'    _{h} = Runtime.{h}' for h in self.helpers]
+
+        offset = len(header)
+        linenos = {offset + i + 1: lineno for i, lineno in self.linenos.items()}
+        footer = [
+            '',
+            '',
+            f'linenos = {linenos!r}',
+            '',
+            "if __name__ == '__main__':",
+            '    Runtime.run(main, linenos, __file__)',
+        ]
+        return '\n'.join(header + self.lines + footer) + '\n'
+
+    def emit(self, line, lineno=None):
+        if lineno is not None:
+            self.linenos[len(self.lines)] = lineno
+        self.lines.append('    ' * self.indent + line)
+
+    def block(self, node):  # emits <node> as an indented Python suite
+        self.indent += 1
+        size = len(self.lines)
+        self.generate(node)
+        if len(self.lines) == size:
+            self.emit('pass')
+        self.indent -= 1
+
+    def push_frame(self):
+        self.frames.append({})
+
+    def pop_frame(self):
+        self.frames.pop()
+
+    def lookup(self, name):  # identifier of <name> as MemoryStack.get would find it
+        for frame in reversed(self.frames):
+            if name in frame:
+                return frame[name]
+        return None
+
+    def declare(self, name):  # identifier of <name> as MemoryStack.set would bind it
+        identifier = self.lookup(name)
+        if identifier is None:
+            identifier = name
+            suffix = 0
+            while identifier in self.reserved or keyword.iskeyword(identifier) or identifier in self.identifiers:
+                suffix += 1
+                identifier = f'{name}_{suffix}'
+            self.identifiers.add(identifier)
+            self.frames[-1][name] = identifier
+        return identifier
+
+    def reference(self, name):
+        identifier = self.lookup(name)
+        return identifier if identifier is not None else f'_undeclared({name!r})'
+
+    @on('node')
+    def generate(self, node):
+        pass
+
+    @when(AST.Node)
+    def generate(self, node):
+        raise RuntimeError(f'CodeGeneratorError: can\'t generate code for {node.__class__.__name__}, line {node.lineno}')
+
+    @when(AST.BinExpr)
+    def generate(self, node):
+        left = self.generate(node.left)
+        right = self.generate(node.right)
+        op = self.binary_operators[node.op]
+
+        if node.op == '/' and not (isinstance(node.right, (AST.IntNum, AST.FloatNum)) and node.right.value != 0):
+            return f'_div({left}, {right})'
+        return f'({left} {op} {right})'
+
+    @when(AST.Assignment)
+    def generate(self, node):
+        expr = self.generate(node.expr)
+        idf = node.identifier
+
+        if idf.index is None:  # working with simple variable
+            if node.assignment_type == '=':
+                self.emit(f'{self.declare(idf.name)} = {expr}', node.lineno)
+            elif node.assignment_type[:-1] in inplace_mapping:  # element-wise, on a tensor
+                left = self.reference(idf.name)
+                self.emit(f'{self.declare(idf.name)} = _compound({node.assignment_type[:-1]!r}, {left}, {expr})', node.lineno)
+            else:
+                op = self.binary_operators[node.assignment_type[:-1]]
+                left = self.reference(idf.name)
+                self.emit(f'{self.declare(idf.name)} = {left} {op} {expr}', node.lineno)
+        else:  # variable with indexes
+            index = self.generate(idf.index)
+            op = None if node.assignment_type == '=' else node.assignment_type[:-1]
+            self.emit(f'_set_item({expr}, {index}, {self.reference(idf.name)}, {idf.name!r}, {op!r})', node.lineno)
+
+    @when(AST.Index)
+    def generate(self, node):
+        constant = constant_index(node)
+        if constant is not None:
+            identifier = f'_index{len(self.indexes)}'
+            self.indexes.append(f'{identifier} = {constant!r}')
+            return identifier
+        return f'_index({", ".join([self.generate(el) for el in node.index])})'
+
+    @when(AST.Variable)
+    def generate(self, node):
+        if node.index:
+            return f'_get_item({self.reference(node.name)}, {self.generate(node.index)}, {node.name!r})'
+        return self.reference(node.name)
+
+    @when(AST.Transpose)
+    def generate(self, node):
+        self.numpy = True
+        return f'np.transpose({self.generate(node.expr)})'
+
+    @when(AST.Negation)
+    def generate(self, node):
+        return f'(-{self.generate(node.expr)})'
+
+    @when(AST.FusedExpr)
+    def generate(self, node):
+        operands = ''.join([self.generate(operand) + ', ' for operand in node.operands])
+        return f'_fused({node.program!r}, ({operands}))'
+
+    @when(AST.Tuple)
+    def generate(self, node):
+        return f'({"".join([self.generate(arg) + ", " for arg in node.args])})'
+
+    @when(AST.Function)
+    def generate(self, node):
+        args = self.generate(node.args)
+        return f'_call({node.function_name!r}, {args})'
+
+    @when(AST.Call)
+    def generate(self, node):
+        self.emit(self.generate(node.function), node.lineno)
+
+    @when(AST.While)
+    def generate(self, node):
+        self.push_frame()
+        self.emit(f'while {self.generate(node.condition)}:', node.lineno)
+        self.block(node.instructions)
+        self.pop_frame()
+
+    @when(AST.Range)
+    def generate(self, node):
+        start = self.generate(node.start)
+        end = self.generate(node.end)
+        if isinstance(node.start, AST.IntNum) and isinstance(node.end, AST.IntNum):
+            return f'range({start}, {end})'
+        return f'_make_range({start}, {end})'
+
+    @when(AST.ForLoop)
+    def generate(self, node):
+        r = self.generate(node.range)
+        self.push_frame()
+        self.emit(f'for {self.declare(node.identifier.name)} in {r}:', node.lineno)
+        self.block(node.instructions)
+        self.pop_frame()
+
+    @when(AST.IfElse)
+    def generate(self, node):
+        self.emit(f'if {self.generate(node.condition)}:', node.lineno)
+        self.push_frame()
+        self.block(node.then_instructions)
+        self.pop_frame()
+        if node.else_instructions:
+            self.emit('else:')
+            self.push_frame()
+            self.block(node.else_instructions)
+            self.pop_frame()
+
+    @when(AST.Instructions)
+    def generate(self, node):
+        for instruction in node.instructions:
+            self.generate(instruction)
+
+    @when(AST.Scope)
+    def generate(self, node):
+        self.push_frame()
+        self.generate(node.instructions)
+        self.pop_frame()
+
+    @when(AST.Print)
+    def generate(self, node):
+        args = ''.join([f'str({self.generate(arg)}), ' for arg in node.args.args])
+        self.emit(f'print(\' \'.join(({args})))', node.lineno)
+
+    @when(AST.Controlflow)
+    def generate(self, node):
+        if node.command == 'return':
+            value = self.generate(node.ret_val) if node.ret_val else 'None'
+            self.emit(f'_exit_with({value})', node.lineno)
+        else:
+            self.emit(node.command, node.lineno)
+
+    @when(AST.IntNum)
+    def generate(self, node):
+        return repr(node.value)
+
+    @when(AST.FloatNum)
+    def generate(self, node):
+        return repr(node.value) if math.isfinite(node.value) else f'float({str(node.value)!r})'
+
+    @when(AST.StringLiteral)
+    def generate(self, node):
+        return repr(node.value)
+
+    @when(AST.Array)
+    def generate(self, node):  # built once when the module loads, every evaluation gets a fresh copy
+        self.numpy = True
+        value = node.value
+        identifier = f'_array{len(self.arrays)}'
+        while identifier in self.reserved or identifier in self.identifiers:
+            identifier += '_'
+        self.identifiers.add(identifier)
+        self.arrays.append(f'{identifier} = np.array({value.tolist()!r}, dtype={value.dtype.str!r})')
+        return f'{identifier}.copy()'
+
+    @when(AST.Tensor)
+    def generate(self, node):
+        self.numpy = True
+        return f'np.array({self.tensor_literal(node)})'
+
+    def tensor_literal(self, node):  # nested list literal, so np.array sees the same values Interpreter builds
+        if isinstance(node, AST.Tensor):
+            return f'[{", ".join([self.tensor_literal(el) for el in node.value])}]'
+        return self.generate(node)
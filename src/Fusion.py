@@ -0,0 +1,89 @@
+# Blockwise evaluation of the element-wise tensor expressions fused by
+# TensorFuser.  A program is the postfix form of the expression: an int pushes
+# that operand, '.+', '.-', '.*' and './' replace the two values on top of the
+# stack with their result and 'neg' negates the top one.  The operands are
+# cut into blocks along their first axis, so the values of one block stay in
+# cache while the whole program runs over it.  Every step writes into a
+# scratch buffer reused from block to block, the last one straight into the
+# output: one tensor is allocated, where step-by-step evaluation allocates one
+# per operation.  Operands NumPy would have to broadcast, non-numeric ones and
+# tensors of a single block are evaluated step by step, as before fusion.
+# Given a BufferPool, the output is taken from it.
+
+import operator
+
+BLOCK = 1 << 14  # elements of an operand per block
+
+operator_mapping = {'.+': operator.add, '.-': operator.sub, '.*': operator.mul, './': operator.truediv}
+ufunc_names = {'.+': 'add', '.-': 'subtract', '.*': 'multiply', './': 'true_divide', 'neg': 'negative'}
+
+
+def unfused(program, operands):  # value of <program>, one whole tensor per step
+    stack = []
+    for step in program:
+        if step.__class__ is int:
+            stack.append(operands[step])
+        elif step == 'neg':
+            stack.append(-stack.pop())
+        else:
+            right = stack.pop()
+            stack.append(operator_mapping[step](stack.pop(), right))
+    return stack[0]
+
+
+def steps(program, operands):  # (step, ufunc, dtype of its result) of every step, None if NumPy can't resolve one
+    import numpy as np
+    dtypes = []
+    result = []
+    for step in program:
+        if step.__class__ is int:
+            dtypes.append(operands[step].dtype)
+            result.append((step, None, None))
+            continue
+        ufunc = getattr(np, ufunc_names[step])
+        arity = 1 if step == 'neg' else 2
+        try:
+            dtype = ufunc.resolve_dtypes(tuple(dtypes[-arity:]) + (None,))[-1]
+        except (TypeError, ValueError):  # e.g. the negation of a bool tensor, step by step evaluation raises
+            return None
+        del dtypes[-arity:]
+        dtypes.append(dtype)
+        result.append((step, ufunc, dtype))
+    return result
+
+
+def fused(program, operands, pool=None):  # value of <program> on <operands>, blockwise when they are same-shaped tensors
+    import numpy as np
+    shape = getattr(operands[0], 'shape', ())
+    if not shape or shape[0] == 0 or operands[0].size <= BLOCK:
+        return unfused(program, operands)
+    for value in operands:
+        if not (isinstance(value, np.ndarray) and value.shape == shape and value.dtype.kind in 'biufc'):
+            return unfused(program, operands)
+    plan = steps(program, operands)
+    if plan is None:
+        return unfused(program, operands)
+
+    rows = max(1, BLOCK * shape[0] // operands[0].size)  # first-axis rows per block
+    out = np.empty(shape, dtype=plan[-1][2]) if pool is None else pool.take(shape, plan[-1][2])
+    scratch = {}  # (stack position, dtype) -> buffer of one block
+    last = len(plan) - 1
+    for start in range(0, shape[0], rows):
+        stop = min(start + rows, shape[0])
+        stack = []
+        for i, (step, ufunc, dtype) in enumerate(plan):
+            if ufunc is None:
+                stack.append(operands[step][start:stop])
+                continue
+            position = len(stack) - (1 if step == 'neg' else 2)
+            if i == last:
+                target = out[start:stop]
+            else:
+                buffer = scratch.get((position, dtype))
+                if buffer is None:
+                    buffer = scratch[position, dtype] = np.empty((rows,) + shape[1:], dtype=dtype)
+                target = buffer[:stop - start]
+            ufunc(*stack[position:], out=target)
+            del stack[position:]
+            stack.append(target)
+    return out
@@ -1,15 +1,88 @@
 import AST
 import SymbolTable
 from Memory import *
-from Exceptions import  *
+from Signals import *
 from visit import *
+from Fusion import fused
+from BufferPool import BufferPool
+from Library import functions
 import sys
 import operator
-import numpy as np
 
 sys.setrecursionlimit(10000)
 
 
+# A range index element is a slice for NumPy: a:b reads a view of the tensor
+# and writes to the block a:b, where a range object would be fancy indexing,
+# copying on read and pairing up the elements of several ranges.
+
+def index_element(el):  # NumPy index element of .m index element <el>, an int or a range
+    return slice(el.start, el.stop) if el.__class__ is range else el
+
+
+def constant_index(node):  # NumPy index of AST.Index <node> if its elements are literals, None otherwise
+    index = []
+    for el in node.index:
+        if isinstance(el, AST.IntNum):
+            index.append(el.value)
+        elif isinstance(el, AST.Range) and isinstance(el.start, AST.IntNum) and isinstance(el.end, AST.IntNum):
+            index.append(slice(el.start.value, el.end.value))
+        else:
+            return None
+    return tuple(index)
+
+
+def in_bounds(index, shape):  # does every element of NumPy index <index> stay inside its axis of <shape>?
+    if len(index) > len(shape):
+        return False
+    for el, size in zip(index, shape):
+        if el.__class__ is slice:
+            if not (0 <= el.start and 0 <= el.stop <= size):  # NumPy would clip, or count from the end
+                return False
+        elif not -size <= el < size:
+            return False
+    return True
+
+
+def index_text(index):  # NumPy index <index> the way it is written in .m, e.g. [1:3, 2]
+    return '[' + ', '.join([f'{el.start}:{el.stop}' if el.__class__ is slice else str(el) for el in index]) + ']'
+
+
+# Compound assignments on tensors, which TypeChecker marks element-wise
+# (A += B becomes A .+= B), update the tensor in place.  A variable keeps its
+# array when the result has the array's dtype and shape, and gets the new
+# array of the promoted result otherwise, e.g. an int tensor .+= a float one
+# becomes a float tensor, or a tensor loaded read-only a tensor of its own.
+# A sub-tensor can't change the dtype of its tensor: the result is cast to
+# it, as assigning it would be.
+
+inplace_mapping = {'.+': operator.iadd, '.-': operator.isub, '.*': operator.imul, './': operator.itruediv}
+ufunc_names = {'.+': 'add', '.-': 'subtract', '.*': 'multiply', './': 'true_divide'}
+
+
+def compound(op, left, right):  # left <op> right, computed into tensor <left> when it holds the result
+    if getattr(left, 'ndim', 0) and left.dtype.kind in 'biufc' and left.flags.writeable:
+        import numpy as np
+        dtype = np.result_type(left, right, 1.0) if op == './' else np.result_type(left, right)
+        try:
+            shape = np.broadcast_shapes(left.shape, np.shape(right))
+        except ValueError:
+            shape = None  # the operator raises NumPy's own error
+        if dtype == left.dtype and shape == left.shape:
+            return inplace_mapping[op](left, right)
+    return Interpreter.operator_mapping[op](left, right)
+
+
+def compound_item(op, var_value, index, right):  # var_value[index] <op>= right, into the view of a sub-tensor
+    item = var_value[index]
+    if getattr(item, 'ndim', 0) and item.dtype.kind in 'biufc':
+        import numpy as np
+        return getattr(np, ufunc_names[op])(item, right, out=item, casting='unsafe')
+    value = Interpreter.operator_mapping[op](item, right)
+    var_value[index] = value
+    return value
+
+
 class Interpreter(object):
     operator_mapping = {
         '+': operator.add,
@@ -36,6 +109,7 @@ class Interpreter(object):
 
     def __init__(self):
         self.memory_stack = MemoryStack()
+        self.pool = BufferPool()  # tensors of zeros/ones/eye and element-wise operations, reused once dead
 
     @on('node')
     def visit(self, node):
@@ -57,6 +131,36 @@ class Interpreter(object):
         except Exception as e:
             self.error(e, node.lineno)
 
+    @when(AST.TypedBinExpr)
+    def visit(self, node):
+        r1 = node.left.accept(self)
+        r2 = node.right.accept(self)
+        try:
+            return node.operator(r1, r2)
+        except Exception as e:
+            self.error(e, node.lineno)
+
+    @when(AST.TensorBinExpr)
+    def visit(self, node):
+        r1 = node.left.accept(self)
+        r2 = node.right.accept(self)
+        try:
+            value = self.pool.elementwise(node.op, r1, r2)
+            return node.operator(r1, r2) if value is None else value
+        except Exception as e:
+            self.error(e, node.lineno)
+
+    @when(AST.ScalarDivision)
+    def visit(self, node):
+        r1 = node.left.accept(self)
+        r2 = node.right.accept(self)
+        if r2 == 0:
+            self.error('ArithmeticError: Division by zero', node.lineno)
+        try:
+            return r1 / r2
+        except Exception as e:
+            self.error(e, node.lineno)
+
     @when(AST.Assignment)
     def visit(self, node):
         r = node.expr.accept(self)
@@ -67,33 +171,43 @@ class Interpreter(object):
                 value = r
             else:
                 try:
-                    left = self.memory_stack.get(idf.name)
+                    left = self.memory_stack.get(idf.address)
                 except KeyError:
                     self.error(f'NameError: name {idf.name} used before assignment', node.lineno)
-                value = self.eval_expr(node.assignment_type[:-1], left, r)
+                op = node.assignment_type[:-1]
+                value = compound(op, left, r) if op in inplace_mapping else self.eval_expr(op, left, r)
 
-            self.memory_stack.set(idf.name, value)
-            return value
+            self.memory_stack.set(idf.address, value)
         else:  # variable with indexes
             index = idf.index.accept(self)
             var_name = idf.name
             try:
-                var_value = self.memory_stack.get(var_name)
+                var_value = self.memory_stack.get(idf.address)
             except KeyError:
                 self.error(f'{var_name} does not declared in this scope', node.lineno)
 
-            if all([isinstance(i, int) for i in index]) and index > var_value.shape:
-                self.error(f'{index} index is greater than {var_name} shape {var_value.shape}', node.lineno)
+            if not in_bounds(index, var_value.shape):
+                self.error(f'{index_text(index)} index out of {var_name} shape {var_value.shape}', node.lineno)
+
+            op = node.assignment_type[:-1]
+            if op in inplace_mapping:
+                try:
+                    compound_item(op, var_value, index, r)
+                except Exception as e:
+                    self.error(f'InternalInterpreterError: {e}', node.lineno)
+                return
 
             if node.assignment_type == '=':
                 value = r
             else:
                 try:
-                    value = self.eval_expr(node.assignment_type[:-1], var_value[index], r)
+                    value = self.eval_expr(op, var_value[index], r)
                 except Exception as e:
                     self.error(f'InternalInterpreterError: {e}', node.lineno)
-            var_value[index] = value
-            return value
+            try:
+                var_value[index] = value
+            except ValueError as e:  # e.g. into a tensor loaded read-only
+                self.error(f'InternalInterpreterError: {e}', node.lineno)
 
     @when(AST.Index)
     def visit(self, node):
@@ -102,21 +216,21 @@ class Interpreter(object):
             ev_el = el.accept(self)
             if not (isinstance(ev_el, int) or isinstance(ev_el, range)):
                 self.error('index element is not of int or range type', node.lineno)
-            idx.append(ev_el)
+            idx.append(index_element(ev_el))
         return tuple(idx)
 
     @when(AST.Variable)
     def visit(self, node):
         try:
-            var_value = self.memory_stack.get(node.name)
+            var_value = self.memory_stack.get(node.address)
         except KeyError:
             self.error(f'{node.name} does not declared in this scope', node.lineno)
 
         if node.index:
             index = node.index.accept(self)
 
-            if all([isinstance(i, int) for i in index]) and index > var_value.shape:
-                self.error(f'{index} index is greater than {node.name} shape {var_value.shape}', node.lineno)
+            if not in_bounds(index, var_value.shape):
+                self.error(f'{index_text(index)} index out of {node.name} shape {var_value.shape}', node.lineno)
 
             return var_value[index]
         return var_value
@@ -124,6 +238,7 @@ class Interpreter(object):
     @when(AST.Transpose)
     def visit(self, node):
         #TODO: check for scalars??
+        import numpy as np
         expr = node.expr.accept(self)
         return np.transpose(expr)
 
@@ -132,6 +247,14 @@ class Interpreter(object):
         expr = node.expr.accept(self)
         return -expr
 
+    @when(AST.FusedExpr)
+    def visit(self, node):
+        operands = [operand.accept(self) for operand in node.operands]
+        try:
+            return fused(node.program, operands, self.pool)
+        except Exception as e:
+            self.error(e, node.lineno)
+
     @when(AST.Tuple)
     def visit(self, node):
         t = []
@@ -142,28 +265,34 @@ class Interpreter(object):
     @when(AST.Function)
     def visit(self, node):
         args = node.args.accept(self)
-        if node.function_name == 'eye':
-            return np.eye(args[0])
-        return {
-            'ones': np.ones,
-            'zeros': np.zeros
-        }[node.function_name](args)
+        name = node.function_name
+        try:
+            if name == 'zeros':
+                return self.pool.zeros(args)
+            if name == 'ones':
+                return self.pool.ones(args)
+            if name == 'eye':
+                return self.pool.eye(args[0])
+            return functions[name].function(*args)
+        except Exception as e:
+            self.error(f'{name}: {e}', node.lineno)
+
+    @when(AST.Call)
+    def visit(self, node):
+        node.function.accept(self)
 
     @when(AST.While)
     def visit(self, node):
-        r = None
-        self.memory_stack.push(Memory('while'))
+        self.memory_stack.push(Memory('while', node.frame_size))
         try:
             while node.condition.accept(self):
-                try:
-                    r = node.instructions.accept(self)
-                except ContinueException:
-                    pass
-        except BreakException:
-            pass
+                signal = node.instructions.accept(self)
+                if signal is not None and signal is not CONTINUE:
+                    if signal is BREAK:
+                        break
+                    return signal
         finally:
             self.memory_stack.pop()
-        return r
 
     @when(AST.Range)
     def visit(self, node):
@@ -177,77 +306,70 @@ class Interpreter(object):
 
     @when(AST.ForLoop)
     def visit(self, node):
-        ret = None
         r = node.range.accept(self)
-        iterator_name = node.identifier.name
-        self.memory_stack.push(Memory('for'))
+        iterator = node.identifier.address
+        self.memory_stack.push(Memory('for', node.frame_size))
         try:
             for i in r:
-                self.memory_stack.set(iterator_name, i)
-                try:
-                    ret = node.instructions.accept(self)
-                except ContinueException:
-                    pass
-        except BreakException:
-            pass
+                self.memory_stack.set(iterator, i)
+                signal = node.instructions.accept(self)
+                if signal is not None and signal is not CONTINUE:
+                    if signal is BREAK:
+                        break
+                    return signal
         finally:
             self.memory_stack.pop()
-        return ret
 
     @when(AST.IfElse)
     def visit(self, node):
         cond = node.condition.accept(self)
         if cond:
-            self.memory_stack.push(Memory('then'))
+            self.memory_stack.push(Memory('then', node.then_frame_size))
             try:
-                node.then_instructions.accept(self)
+                return node.then_instructions.accept(self)
             finally:
                 self.memory_stack.pop()
         elif node.else_instructions:
-            self.memory_stack.push(Memory('else'))
+            self.memory_stack.push(Memory('else', node.else_frame_size))
             try:
-                node.else_instructions.accept(self)
+                return node.else_instructions.accept(self)
             finally:
                 self.memory_stack.pop()
 
     @when(AST.Instructions)
     def visit(self, node):
+        if node.frame_size is not None:  # the program, its variables live in the global memory
+            self.memory_stack.stack[0].reserve(node.frame_size)
         for instruction in node.instructions:
-            try:
-                instruction.accept(self)
-            except ReturnValueException as e:
-                value = e
-                if e is None or e == 0:
-                    exit_code = 0
-                elif not isinstance(value, int):
-                    print(f'Returned value: {value}')
-                    exit_code = -1
-                else:
-                    exit_code = value
-                sys.exit(exit_code)
+            signal = instruction.accept(self)
+            if signal is not None:  # break and continue end the block, return ends the program
+                if isinstance(signal, ReturnValue):
+                    print(f'Returned value: {signal.value}')
+                    sys.exit(-1)
+                return signal
 
     @when(AST.Scope)
     def visit(self, node):
-        self.memory_stack.push(Memory('scope'))
+        self.memory_stack.push(Memory('scope', node.frame_size))
         try:
-            node.instructions.accept(self)
+            return node.instructions.accept(self)
         finally:
             self.memory_stack.pop()
 
     @when(AST.Print)
     def visit(self, node):
         args = node.args.accept(self)
-        return print(' '.join([str(arg) for arg in args]))
+        print(' '.join([str(arg) for arg in args]))
 
     @when(AST.Controlflow)
     def visit(self, node):
         if node.command == 'break':
-            raise BreakException()
+            return BREAK
         elif node.command == 'continue':
-            raise ContinueException()
+            return CONTINUE
         elif node.command == 'return':
             value = node.ret_val.accept(self) if node.ret_val else None
-            raise ReturnValueException(value)
+            return ReturnValue(value)
 
     @when(AST.IntNum)
     def visit(self, node):
@@ -261,9 +383,14 @@ class Interpreter(object):
     def visit(self, node):
         return node.value
 
+    @when(AST.Array)
+    def visit(self, node):
+        return node.value.copy()  # the literal itself must not change when the copy does
+
     @when(AST.Tensor)
     def visit(self, node):
         v = []
         for el in node.value:
             v.append(el.accept(self))
+        import numpy as np
         return np.array(v)
@@ -0,0 +1,311 @@
+# Built-in functions of the language, the registry the parser, TypeChecker
+# and every backend look names up in.  The grammar parses any name(args) as a
+# call, so a function is added here alone: functions[name] = Builtin(...).
+#
+# A signature checks the argument types and shapes (the values of constant int
+# arguments, None for other scalars, the shape of tensors), reports problems
+# through error(message) and returns the (type, shape) of the result.  The
+# function gets the evaluated arguments and returns the result, backed by
+# NumPy and so BLAS/LAPACK for dot, matmul, inv and solve; scalar results are
+# plain Python numbers.  safe marks functions that can't fail once their
+# signature accepted the call, the ones LoopInvariantMotion may hoist (not
+# zeros, ones and eye, which raise on a negative size); reads those whose
+# signature reads the header of the data file named by their first argument,
+# which ProgramCache checks before reusing a checked program.
+#
+# load maps a .npy file into memory (np.memmap) instead of reading it: pages
+# are read as the program touches them, slices are views of the mapping and
+# element-wise operations and fused expressions stream over it.  The default
+# mapping is copy-on-write, writes stay private to the program; load(f, "r")
+# maps it read-only.
+
+numeric_types = ['int', 'float']
+
+
+class Builtin(object):
+    __slots__ = ('name', 'signature', 'function', 'safe', 'reads')
+
+    def __init__(self, name, signature, function, safe=False, reads=False):
+        self.name = name
+        self.signature = signature
+        self.function = function
+        self.safe = safe
+        self.reads = reads
+
+
+def scalar(value):  # Python number of a 0-d NumPy result, other values as they are
+    return value.item() if getattr(value, 'ndim', None) == 0 else value
+
+
+def promoted(left, right):  # element type of an arithmetic result of <left> and <right> elements
+    return 'int' if left == right == 'int' else 'float'
+
+
+def count(error, types, *counts):  # True if there are <counts> arguments
+    if len(types) not in counts:
+        error(f'expected {" or ".join([str(c) for c in counts])} arguments, got {len(types)}')
+        return False
+    return True
+
+
+def tensors(error, types, shapes, indices):  # True if the arguments at <indices> are numeric tensors
+    ok = True
+    for i in indices:
+        if not isinstance(shapes[i], tuple) or types[i] not in numeric_types:
+            error(f'expected a numeric tensor as argument {i + 1}, got {types[i]}{" tensor" if isinstance(shapes[i], tuple) else ""}')
+            ok = False
+    return ok
+
+
+def ints(error, types, shapes, indices):  # True if the arguments at <indices> are int scalars
+    ok = True
+    for i in indices:
+        if isinstance(shapes[i], tuple) or types[i] != 'int':
+            error(f'expected an int as argument {i + 1}, got {types[i]}{" tensor" if isinstance(shapes[i], tuple) else ""}')
+            ok = False
+    return ok
+
+
+def known(*sizes):  # True if no size is None
+    return all([size is not None for size in sizes])
+
+
+# signatures
+
+def dimensions(error, types, shapes):  # zeros(n, m, ...) and ones: int arguments, the shape are their values
+    if not ints(error, types, shapes, range(len(types))):
+        return 'unknown', None
+    return 'float', tuple(shapes)  # NumPy's default float64 elements
+
+
+def identity(error, types, shapes):  # eye(n): the n by n identity matrix
+    if not count(error, types, 1) or not ints(error, types, shapes, [0]):
+        return 'unknown', None
+    return 'float', (shapes[0], shapes[0])
+
+
+def reduction(error, types, shapes):  # sum(A), sum(A, axis): scalar of the whole tensor, or the tensor without <axis>
+    if not count(error, types, 1, 2) or not tensors(error, types, shapes, [0]):
+        return 'unknown', None
+    if len(types) == 1:
+        return types[0], None
+    if not ints(error, types, shapes, [1]):
+        return 'unknown', None
+    shape, axis = shapes
+    if axis is None:
+        return types[0], (None,) * (len(shape) - 1) or None
+    if not 0 <= axis < len(shape):
+        error(f'axis {axis} out of a tensor of {len(shape)} dimensions')
+        return 'unknown', None
+    return types[0], shape[:axis] + shape[axis + 1:] or None
+
+
+def norm(error, types, shapes):  # norm(A): Euclidean norm of a vector, Frobenius of a matrix
+    if not count(error, types, 1) or not tensors(error, types, shapes, [0]):
+        return 'unknown', None
+    return 'float', None
+
+
+def dot(error, types, shapes):  # dot(u, v): inner product of two vectors of the same size
+    if not count(error, types, 2) or not tensors(error, types, shapes, [0, 1]):
+        return 'unknown', None
+    u, v = shapes
+    if len(u) != 1 or len(v) != 1:
+        error(f'expected two vectors, got shapes {u} and {v}')
+        return 'unknown', None
+    if known(u[0], v[0]) and u[0] != v[0]:
+        error(f'vectors of different sizes {u[0]} and {v[0]}')
+    return promoted(*types), None
+
+
+def matmul(error, types, shapes):  # matmul(A, B): matrix product of (n, k) and (k, m) matrices, or by a (k,) vector
+    if not count(error, types, 2) or not tensors(error, types, shapes, [0, 1]):
+        return 'unknown', None
+    a, b = shapes
+    if len(a) != 2 or len(b) not in (1, 2):
+        error(f'expected a matrix and a matrix or vector, got shapes {a} and {b}')
+        return 'unknown', None
+    if known(a[1], b[0]) and a[1] != b[0]:
+        error(f'inner sizes differ in shapes {a} and {b}')
+    return promoted(*types), (a[0],) + b[1:]
+
+
+def square(error, shape):  # True if <shape> can be a square matrix
+    if len(shape) != 2:
+        error(f'expected a square matrix, got shape {shape}')
+        return False
+    if known(*shape) and shape[0] != shape[1]:
+        error(f'expected a square matrix, got shape {shape}')
+    return True
+
+
+def inv(error, types, shapes):  # inv(A): inverse of a square matrix
+    if not count(error, types, 1) or not tensors(error, types, shapes, [0]) or not square(error, shapes[0]):
+        return 'unknown', None
+    return 'float', shapes[0]
+
+
+def solve(error, types, shapes):  # solve(A, b): x of A x = b, A square, b a vector or matrix of as many rows
+    if not count(error, types, 2) or not tensors(error, types, shapes, [0, 1]) or not square(error, shapes[0]):
+        return 'unknown', None
+    a, b = shapes
+    if len(b) not in (1, 2):
+        error(f'expected a vector or matrix right-hand side, got shape {b}')
+        return 'unknown', None
+    if known(a[0], b[0]) and a[0] != b[0]:
+        error(f'{b[0]} right-hand side rows for a matrix of shape {a}')
+    return 'float', b
+
+
+def reshape(error, types, shapes):  # reshape(A, n, m, ...): the elements of A in a tensor of shape (n, m, ...)
+    if len(types) < 2:
+        error(f'expected a tensor and its new dimensions, got {len(types)} arguments')
+        return 'unknown', None
+    if not tensors(error, types, shapes, [0]) or not ints(error, types, shapes, range(1, len(types))):
+        return 'unknown', None
+    shape = tuple(shapes[1:])
+    if known(*shapes[0]) and known(*shape) and size(shapes[0]) != size(shape):
+        error(f'{size(shapes[0])} elements of shape {shapes[0]} reshaped to {shape}')
+    return types[0], shape
+
+
+def load(error, types, shapes):  # load("a.npy"), load("a.npy", "r"): the tensor of a .npy file, typed from its header
+    if not count(error, types, 1, 2):
+        return 'unknown', None
+    path = shapes[0]
+    if types[0] != 'str' or not isinstance(path, str):
+        error('expected a file name literal as argument 1, the tensor is typed from the file header')
+        return 'unknown', None
+    if len(types) == 2 and (types[1] != 'str' or shapes[1] not in modes):
+        error(f'expected a mapping mode literal as argument 2, one of {", ".join(modes)}')
+    try:
+        element, shape = header(path)
+    except (OSError, ValueError) as e:
+        error(f'can\'t read the header of {path}: {e}')
+        return 'unknown', None
+    if element not in numeric_types or not shape:
+        error(f'{path} holds {element} data of shape {shape}, not a numeric tensor')
+        return 'unknown', None
+    return element, shape
+
+
+def save(error, types, shapes):  # save(A, "a.npy"): writes A to a .npy file, evaluates to A
+    if not count(error, types, 2) or not tensors(error, types, shapes, [0]):
+        return 'unknown', None
+    if types[1] != 'str' or isinstance(shapes[1], tuple):
+        error(f'expected a file name as argument 2, got {types[1]}')
+    return types[0], shapes[0]
+
+
+modes = {'c': 'copy-on-write', 'r': 'read-only'}
+
+
+def header(path):  # (element type, shape) of the .npy file <path>, from its header alone
+    import numpy as np
+    with open(path, 'rb') as file:
+        version = np.lib.format.read_magic(file)
+        read = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, _, dtype = read(file)
+    return {'i': 'int', 'u': 'int', 'f': 'float'}.get(dtype.kind, dtype.name), shape
+
+
+def size(shape):
+    elements = 1
+    for n in shape:
+        elements *= n
+    return elements
+
+
+# functions
+
+def zeros_(*dims):
+    import numpy as np
+    return np.zeros(dims)
+
+
+def ones_(*dims):
+    import numpy as np
+    return np.ones(dims)
+
+
+def eye_(n):
+    import numpy as np
+    return np.eye(n)
+
+
+def sum_(tensor, axis=None):
+    import numpy as np
+    return scalar(np.sum(tensor, axis=axis))
+
+
+def max_(tensor, axis=None):
+    import numpy as np
+    return scalar(np.max(tensor, axis=axis))
+
+
+def min_(tensor, axis=None):
+    import numpy as np
+    return scalar(np.min(tensor, axis=axis))
+
+
+def norm_(tensor):
+    import numpy as np
+    return scalar(np.linalg.norm(tensor))
+
+
+def dot_(u, v):
+    import numpy as np
+    return scalar(np.dot(u, v))
+
+
+def matmul_(a, b):
+    import numpy as np
+    return np.matmul(a, b)
+
+
+def inv_(a):
+    import numpy as np
+    return np.linalg.inv(a)
+
+
+def solve_(a, b):
+    import numpy as np
+    return np.linalg.solve(a, b)
+
+
+def reshape_(tensor, *dims):
+    import numpy as np
+    return np.reshape(tensor, dims).copy()  # a tensor of its own, as assignments of it must not write into <tensor>
+
+
+def load_(path, mode='c'):
+    import numpy as np
+    return np.load(path, mmap_mode=mode)
+
+
+def save_(tensor, path):
+    import os
+    import numpy as np
+    temporary = f'{path}.{os.getpid()}.npy'
+    with open(temporary, 'wb') as file:  # streamed from a mapped tensor, chunk by chunk when it isn't contiguous
+        np.save(file, tensor)
+    os.replace(temporary, path)  # a tensor mapped from <path> keeps the old file, never a truncated one
+    return tensor
+
+
+functions = {builtin.name: builtin for builtin in [
+    Builtin('zeros', dimensions, zeros_),
+    Builtin('ones', dimensions, ones_),
+    Builtin('eye', identity, eye_),
+    Builtin('sum', reduction, sum_),
+    Builtin('max', reduction, max_),
+    Builtin('min', reduction, min_),
+    Builtin('norm', norm, norm_, safe=True),
+    Builtin('dot', dot, dot_),
+    Builtin('matmul', matmul, matmul_),
+    Builtin('inv', inv, inv_),
+    Builtin('solve', solve, solve_),
+    Builtin('reshape', reshape, reshape_),
+    Builtin('load', load, load_, reads=True),
+    Builtin('save', save, save_),
+]}
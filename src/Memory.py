@@ -1,17 +1,12 @@
-class Memory:
+class Memory(list):  # variable slots of one frame, addressed by TypeChecker
 
-    def __init__(self, name, symbols=None):  # memory name
+    def __init__(self, name, size=0):  # memory name and number of slots
+        super().__init__([None] * size)
         self.name = name
-        self.symbols = symbols if symbols else {}
 
-    def has_key(self, name):  # variable name
-        return name in self.symbols
-
-    def get(self, name):  # gets from memory current value of variable <name>
-        return self.symbols[name]
-
-    def put(self, name, value):  # puts into memory current value of variable <name>
-        self.symbols[name] = value
+    def reserve(self, size):  # grows memory to at least <size> slots
+        if len(self) < size:
+            self.extend([None] * (size - len(self)))
 
 
 class MemoryStack:
@@ -19,22 +14,16 @@ class MemoryStack:
     def __init__(self, memory=None):  # initialize memory stack with memory <memory>
         self.stack = [memory if memory else Memory('global')]
 
-    def get(self, name):  # gets from memory stack current value of variable <name>
-        for memory in reversed(self.stack):
-            if memory.has_key(name):
-                return memory.get(name)
-        raise KeyError(f'{name} doesn\'t declared in this scope')
-
-    def insert(self, name, value):  # inserts into memory stack variable <name> with value <value>
-        self.stack[-1].put(name, value)
-
-    def set(self, name, value):  # sets variable <name> to value <value>
-        for memory in reversed(self.stack):
-            if memory.has_key(name):
-                memory.put(name, value)
-                break
-        else:
-            self.insert(name, value)
+    def get(self, address):  # gets from memory stack current value of variable at (depth, slot) <address>
+        depth, slot = address
+        value = self.stack[depth][slot]
+        if value is None:
+            raise KeyError(f'{address} doesn\'t declared in this scope')
+        return value
+
+    def set(self, address, value):  # sets variable at (depth, slot) <address> to value <value>
+        depth, slot = address
+        self.stack[depth][slot] = value
 
     def push(self, memory):  # pushes memory <memory> onto the stack
         self.stack.append(memory)
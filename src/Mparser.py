@@ -41,8 +41,9 @@ def p_instructions(p):
                     | instruction"""
     if len(p) == 2:
         p[0] = [p[1]]
-    else:
-        p[0] = p[1] + [p[2]]
+    else:  # extends the list in place, so building a block stays linear
+        p[1].append(p[2])
+        p[0] = p[1]
 
 
 def p_instruction(p):
@@ -55,6 +56,12 @@ def p_instruction(p):
     p[0] = p[1]
 
 
+def p_call(p):
+    """instruction : functioncall ';'"""
+    p[0] = AST.Call(p[1])
+    p[0].lineno = p[1].lineno
+
+
 def p_print(p):
     """print : PRINT tuple"""
     p[0] = AST.Print(AST.Tuple(p[2]))
@@ -62,12 +69,13 @@ def p_print(p):
 
 
 def p_tuple(p):
-    """tuple : expr ',' tuple
+    """tuple : tuple ',' expr
              | expr"""
     if len(p) == 2:
         p[0] = [p[1]]
-    else:
-        p[0] = [p[1]] + p[3]
+    else:  # left recursive, the parser stack doesn't grow with the tuple
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 def p_codeblock(p):
@@ -167,9 +175,7 @@ def p_transpose_expr(p):
 
 
 def p_functioncall(p):
-    """functioncall : ZEROS '(' tuple ')'
-                    | EYE '(' tuple ')'
-                    | ONES '(' tuple ')'"""
+    """functioncall : ID '(' tuple ')'"""  # any name, TypeChecker looks it up in Library.functions
     p[0] = AST.Function(p[1], AST.Tuple(p[3]))
     p[0].lineno = p.lineno(1)
 
@@ -186,10 +192,26 @@ def p_constant(p):
         p[0] = AST.FloatNum(p[1])
         p[0].lineno = p.lineno(1)
     else:
-        p[0] = AST.Tensor(p[1])
+        p[0] = tensor_literal(p[1])
         p[0].lineno = p.lineno(1)
 
 
+def tensor_literal(elements):  # the literal as one ndarray, or a Tensor of nodes when TypeChecker has to reject it
+    import numpy as np
+    values = [el.value for el in elements]
+    if all([isinstance(el, (AST.IntNum, AST.FloatNum)) for el in elements]) or \
+            all([isinstance(el, AST.StringLiteral) for el in elements]) or \
+            all([isinstance(el, AST.Array) for el in elements]) and \
+            len({(v.shape, v.dtype.kind == 'U') for v in values}) == 1:
+        try:
+            array = np.array(values)
+        except (ValueError, OverflowError):
+            array = None
+        if array is not None and array.dtype.kind in 'ifU':  # e.g. ints beyond int64 stay python objects
+            return AST.Array(array)
+    return AST.Tensor(elements)
+
+
 def p_constant_str(p):
     """constant : STRING"""
     p[0] = AST.StringLiteral(p[1])
@@ -207,7 +229,8 @@ def p_tensorelem(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 def p_assignment(p):
@@ -233,13 +256,17 @@ def p_id(p):
 def p_index(p):
     """index : range
              | expr
-             | expr ',' index
-             | range ',' index"""
-    p[0] = [p[1]]
-    if len(p) == 4:
-        p[0] += p[3]
+             | index ',' expr
+             | index ',' range"""
+    if len(p) == 2:
+        p[0] = [p[1]]
+    else:
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
-parser = yacc.yacc()
+# optimize: the tables come from the shipped parsetab.py without checking them against the grammar,
+# delete it to regenerate after changing the grammar; debug=False, parser.out is never written
+parser = yacc.yacc(optimize=True, debug=False, tabmodule='parsetab')
 scanner = scanner.lexer
 
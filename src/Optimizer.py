@@ -0,0 +1,714 @@
+import AST
+import copy
+import math
+from visit import *
+from Interpreter import Interpreter
+from Library import functions
+
+
+class ConstantFolder(object):
+    """AST-to-AST pass run between TypeChecker and the execution backends.
+
+    Folds BinExpr, Negation and Transpose subtrees whose operands are literals
+    (range bounds included), drops if/else branches and while loops with
+    constant conditions, and statements that follow break, continue or return.
+    A statement visit returns its replacement node, or None if it was removed.
+    Only values the backends would compute exactly the same way are folded:
+    division by zero, failing operations and comparisons (bool results) are
+    left for run time.
+    """
+    operator_mapping = Interpreter.operator_mapping
+    literals = {int: AST.IntNum, float: AST.FloatNum, str: AST.StringLiteral}
+
+    def visit(self, node):  # so that ast = ast.accept(ConstantFolder()) optimizes the program
+        return self.optimize(node)
+
+    def literal(self, value, node):  # literal node holding <value> in place of <node>, None if it has no literal form
+        cls = self.literals.get(type(value))
+        if cls is None or (cls is AST.FloatNum and not math.isfinite(value)):
+            return None
+        literal = cls(value)
+        literal.lineno = node.lineno
+        return literal
+
+    def value(self, node):  # (True, value) if <node> is a constant, (False, None) otherwise
+        if isinstance(node, (AST.IntNum, AST.FloatNum, AST.StringLiteral)):
+            return True, node.value
+        if isinstance(node, AST.BinExpr):  # a comparison of literals, kept as BinExpr since it yields a bool
+            left_constant, left = self.value(node.left)
+            right_constant, right = self.value(node.right)
+            if left_constant and right_constant:
+                return self.evaluate(node.op, left, right)
+        return False, None
+
+    def evaluate(self, op, left, right):
+        if op in ['/', './'] and right == 0:
+            return False, None
+        try:
+            return True, self.operator_mapping[op](left, right)
+        except Exception:
+            return False, None
+
+    def body(self, node):  # loop and branch bodies can't be removed, only emptied
+        optimized = self.optimize(node)
+        return optimized if optimized is not None else AST.Instructions([])
+
+    @on('node')
+    def optimize(self, node):
+        pass
+
+    @when(AST.Node)
+    def optimize(self, node):
+        return node
+
+    @when(AST.BinExpr)
+    def optimize(self, node):
+        node.left = self.optimize(node.left)
+        node.right = self.optimize(node.right)
+        constant, value = self.value(node)
+        if constant:
+            return self.literal(value, node) or node
+        return node
+
+    @when(AST.Negation)
+    def optimize(self, node):
+        node.expr = self.optimize(node.expr)
+        if isinstance(node.expr, (AST.IntNum, AST.FloatNum)):
+            return self.literal(-node.expr.value, node) or node
+        return node
+
+    @when(AST.Transpose)
+    def optimize(self, node):
+        node.expr = self.optimize(node.expr)
+        if isinstance(node.expr, AST.Array) and node.expr.value.dtype.kind in 'if':
+            import numpy as np
+            array = AST.Array(np.transpose(node.expr.value).copy())
+            array.lineno = node.lineno
+            return array
+        return node
+
+    @when(AST.Tensor)
+    def optimize(self, node):
+        node.value = [self.optimize(el) for el in node.value]
+        return node
+
+    @when(AST.Index)
+    def optimize(self, node):
+        node.index = [self.optimize(el) for el in node.index]
+        return node
+
+    @when(AST.Variable)
+    def optimize(self, node):
+        if node.index:
+            node.index = self.optimize(node.index)
+        return node
+
+    @when(AST.Tuple)
+    def optimize(self, node):
+        node.args = [self.optimize(arg) for arg in node.args]
+        return node
+
+    @when(AST.Function)
+    def optimize(self, node):
+        node.args = self.optimize(node.args)
+        return node
+
+    @when(AST.Call)
+    def optimize(self, node):
+        node.function = self.optimize(node.function)
+        return node
+
+    @when(AST.Assignment)
+    def optimize(self, node):
+        node.identifier = self.optimize(node.identifier)
+        node.expr = self.optimize(node.expr)
+        return node
+
+    @when(AST.Range)
+    def optimize(self, node):
+        node.start = self.optimize(node.start)
+        node.end = self.optimize(node.end)
+        return node
+
+    @when(AST.ForLoop)
+    def optimize(self, node):
+        node.range = self.optimize(node.range)
+        start, end = node.range.start, node.range.end
+        if isinstance(start, AST.IntNum) and isinstance(end, AST.IntNum) and start.value >= end.value:
+            return None  # the loop never runs, so not even its iterator is assigned
+        node.instructions = self.body(node.instructions)
+        return node
+
+    @when(AST.While)
+    def optimize(self, node):
+        node.condition = self.optimize(node.condition)
+        constant, value = self.value(node.condition)
+        if constant and not value:
+            return None
+        node.instructions = self.body(node.instructions)
+        return node
+
+    @when(AST.IfElse)
+    def optimize(self, node):
+        node.condition = self.optimize(node.condition)
+        constant, value = self.value(node.condition)
+        if constant:  # the branch taken keeps its own frame, as a block
+            if value:
+                instructions, frame_size = node.then_instructions, node.then_frame_size
+            elif node.else_instructions:
+                instructions, frame_size = node.else_instructions, node.else_frame_size
+            else:
+                return None
+            scope = AST.Scope(instructions)
+            scope.lineno = node.lineno
+            scope.frame_size = frame_size
+            return self.optimize(scope)
+
+        node.then_instructions = self.body(node.then_instructions)
+        if node.else_instructions:
+            node.else_instructions = self.optimize(node.else_instructions)
+        return node
+
+    @when(AST.Instructions)
+    def optimize(self, node):
+        instructions = []
+        for instruction in node.instructions:
+            instruction = self.optimize(instruction)
+            if instruction is not None:
+                instructions.append(instruction)
+                if isinstance(instruction, AST.Controlflow):
+                    break  # the rest of the block is unreachable
+        node.instructions = instructions
+        return node
+
+    @when(AST.Scope)
+    def optimize(self, node):
+        instructions = self.optimize(node.instructions)
+        if instructions is None or isinstance(instructions, AST.Instructions) and not instructions.instructions:
+            return None  # an empty block has no effect
+        node.instructions = instructions
+        return node
+
+    @when(AST.Print)
+    def optimize(self, node):
+        node.args = self.optimize(node.args)
+        return node
+
+    @when(AST.Controlflow)
+    def optimize(self, node):
+        if node.ret_val:
+            node.ret_val = self.optimize(node.ret_val)
+        return node
+
+
+
+class LoopInvariantMotion(object):
+    """AST-to-AST pass that hoists loop-invariant expressions out of for/while loops.
+
+    An expression is invariant when every variable it reads lives in a frame
+    outside the loop and is not assigned anywhere in the loop (iterators of
+    nested for loops included).  Each maximal invariant expression is computed
+    once into a temporary, assigned right before the loop in the enclosing
+    frame, which gets one more slot.  Only expressions that can't fail are
+    moved, so hoisting an expression out of a branch or a loop that never runs
+    changes nothing: no division by anything but a nonzero literal, only the
+    functions the Library marks safe, and element-wise operations only on two
+    tensors of the same fully known shape, as TypeChecker lets through sizes it
+    doesn't know, which may not match at run time.  A loop that writes into
+    tensors (A[i] = ..., or A += B in place) keeps whole assignment right-hand
+    sides, as hoisting them would share one array between iterations, and
+    keeps every expression reading a tensor variable: B = A and B = A[0:2]
+    make B share A's array, so a write to B changes what A reads.
+    """
+    hoistable = (AST.BinExpr, AST.Negation, AST.Transpose, AST.Array, AST.Tensor, AST.Function)
+    pure = hoistable + (AST.IntNum, AST.FloatNum, AST.StringLiteral, AST.Variable, AST.Tuple)
+
+    def __init__(self):
+        self.frames = []  # (node, attribute) holding the size of every enclosing run-time frame
+        self.names = set()
+        self.temps = 0
+
+    def visit(self, node):  # so that ast = ast.accept(LoopInvariantMotion()) optimizes the program
+        self.names = {n.name for n in node.nodes() if isinstance(n, AST.Variable)}
+        self.frames.append((node, 'frame_size'))
+        try:
+            return self.optimize(node)
+        finally:
+            self.frames.pop()
+
+    def temporary(self, expr):  # assignment of <expr> to a new variable of the innermost frame
+        name = f'_t{self.temps}'
+        while name in self.names:
+            self.temps += 1
+            name = f'_t{self.temps}'
+        self.temps += 1
+
+        owner, attribute = self.frames[-1]
+        size = getattr(owner, attribute)
+        setattr(owner, attribute, size + 1)
+
+        identifier = AST.Variable(name)
+        identifier.lineno = expr.lineno
+        identifier.address = len(self.frames) - 1, size
+        assignment = AST.Assignment(identifier, '=', expr)
+        assignment.lineno = expr.lineno
+        return assignment
+
+    def reference(self, assignment):
+        variable = AST.Variable(assignment.identifier.name)
+        variable.lineno = assignment.lineno
+        variable.address = assignment.identifier.address
+        return variable
+
+    def invariant(self, node, assigned, writes_tensors):
+        depth = len(self.frames) - 1
+        for n in node.nodes():
+            if not isinstance(n, self.pure):
+                return False
+            if isinstance(n, AST.Variable) and (n.index or n.address[0] > depth or n.address in assigned):
+                return False
+            if isinstance(n, AST.Variable) and writes_tensors and n.shape is not None:
+                return False  # the loop may write into its tensor through another variable, e.g. a view of it
+            if isinstance(n, AST.BinExpr) and n.op == '/':  # may raise ArithmeticError
+                if not (isinstance(n.right, (AST.IntNum, AST.FloatNum)) and n.right.value != 0):
+                    return False
+            if isinstance(n, AST.Function) and not functions[n.function_name].safe:  # may raise, e.g. inv of a singular matrix
+                return False
+            if isinstance(n, AST.BinExpr) and n.shape is not None:  # may raise on operands of different shapes
+                left, right = self.shape(n.left), self.shape(n.right)
+                if left is None or None in left or left != right:
+                    return False
+        return True
+
+    def shape(self, node):  # shape of tensor expression <node> as TypeChecker knows it, None if it isn't at hand
+        if isinstance(node, (AST.Variable, AST.BinExpr)):
+            return node.shape
+        if isinstance(node, AST.Negation):
+            return self.shape(node.expr)
+        if isinstance(node, AST.Transpose):
+            shape = self.shape(node.expr)
+            return shape[::-1] if shape is not None else None
+        if isinstance(node, AST.Array):
+            return node.value.shape
+        return None
+
+    def hoist(self, node, assigned, writes_tensors, temps):  # moves invariant expressions below <node> to <temps>
+        for attribute, value in node.fields():
+            if isinstance(value, list):
+                setattr(node, attribute, [self.hoisted(child, assigned, writes_tensors, temps) for child in value])
+            else:
+                setattr(node, attribute, self.hoisted(value, assigned, writes_tensors, temps))
+
+    def hoisted(self, node, assigned, writes_tensors, temps):  # <node> or the temporary that replaces it
+        if not isinstance(node, AST.Node):
+            return node
+        if isinstance(node, AST.Assignment) and writes_tensors and node.assignment_type == '=':
+            node.identifier = self.hoisted(node.identifier, assigned, writes_tensors, temps)
+            self.hoist(node.expr, assigned, writes_tensors, temps)  # the value assigned stays, its operands may move
+            return node
+        if isinstance(node, self.hoistable) and self.invariant(node, assigned, writes_tensors):
+            temps.append(self.temporary(node))
+            return self.reference(temps[-1])
+        self.hoist(node, assigned, writes_tensors, temps)
+        return node
+
+    def loop(self, node):  # hoists out of loop <node>, then handles the loops nested in it
+        assigned = set()
+        writes_tensors = False
+        for n in node.nodes():
+            if isinstance(n, AST.Assignment):
+                assigned.add(n.identifier.address)
+                writes_tensors = writes_tensors or n.identifier.index is not None or n.assignment_type[0] == '.'
+            elif isinstance(n, AST.ForLoop):
+                assigned.add(n.identifier.address)
+
+        temps = []
+        if isinstance(node, AST.While):
+            node.condition = self.hoisted(node.condition, assigned, writes_tensors, temps)
+        node.instructions = self.hoisted(node.instructions, assigned, writes_tensors, temps)
+
+        self.frames.append((node, 'frame_size'))
+        try:
+            node.instructions = self.optimize(node.instructions)
+        finally:
+            self.frames.pop()
+
+        if temps:
+            instructions = AST.Instructions(temps + [node])
+            instructions.lineno = node.lineno
+            return instructions
+        return node
+
+    @on('node')
+    def optimize(self, node):
+        pass
+
+    @when(AST.Node)
+    def optimize(self, node):
+        return node
+
+    @when(AST.ForLoop)
+    def optimize(self, node):
+        return self.loop(node)
+
+    @when(AST.While)
+    def optimize(self, node):
+        return self.loop(node)
+
+    @when(AST.IfElse)
+    def optimize(self, node):
+        self.frames.append((node, 'then_frame_size'))
+        try:
+            node.then_instructions = self.optimize(node.then_instructions)
+        finally:
+            self.frames.pop()
+        if node.else_instructions:
+            self.frames.append((node, 'else_frame_size'))
+            try:
+                node.else_instructions = self.optimize(node.else_instructions)
+            finally:
+                self.frames.pop()
+        return node
+
+    @when(AST.Scope)
+    def optimize(self, node):
+        self.frames.append((node, 'frame_size'))
+        try:
+            node.instructions = self.optimize(node.instructions)
+        finally:
+            self.frames.pop()
+        return node
+
+    @when(AST.Instructions)
+    def optimize(self, node):
+        instructions = []
+        for instruction in node.instructions:
+            instruction = self.optimize(instruction)
+            if isinstance(instruction, AST.Instructions):  # a loop preceded by its temporaries
+                instructions.extend(instruction.instructions)
+            else:
+                instructions.append(instruction)
+        node.instructions = instructions
+        return node
+
+
+class LoopVectorizer(object):
+    """AST-to-AST pass that turns element-wise for loops into whole-tensor assignments.
+
+    A loop qualifies when its body only assigns tensor elements, and every
+    indexed variable in it is indexed by the bare loop iterator at one common
+    position, next to index elements (ranges included) that don't change in
+    the loop.  Iteration i then only touches elements with coordinate i on
+    that axis, so the iterations are independent.  That holds for variables
+    that share a whole array (B = A) too, not for a view of another array at
+    an offset or transposed: after B = A[1:5], B[i] is A[i + 1].  Loops that
+    read or write a variable that may hold such a view (one ever assigned an
+    indexed variable, a transpose or the result of save) stay loops, and so do
+    loops whose range isn't two literals 0 <= start <= end.  Each assignment is
+    replaced by one that indexes with the loop range itself, e.g.
+    for i = 0:3 C[i] = A[i] + B[i];  becomes  C[0:3] = A[0:3] + B[0:3];
+    and runs as a single NumPy operation.  The range adds an axis to every
+    variable it indexes, so each of them must have the rank of the target
+    element and the iterator axis at the same place, and the other operands at
+    most the rank of the target element: NumPy then lines the new axis up
+    across all of them, as broadcasting lines up trailing axes, where
+    C[i] = A[i] with a row C[i] and a scalar A[i] would broadcast A along the
+    row.  Nested loops are vectorized from the innermost one out: once
+    for j = 0:2 C[i, j] = A[i, j];  is  C[i, 0:2] = A[i, 0:2];  the loop over
+    i qualifies in turn.
+    """
+    elementwise = (AST.BinExpr, AST.Negation, AST.IntNum, AST.FloatNum, AST.Array, AST.Tensor, AST.Variable)
+    invariant = (AST.BinExpr, AST.Negation, AST.IntNum, AST.FloatNum, AST.Variable)
+
+    def __init__(self):
+        self.depth = 0  # depth of the innermost enclosing run-time frame
+        self.iterator = None  # address of the iterator of the loop being checked
+        self.targets = set()  # addresses of the tensors it assigns to
+        self.position = None  # index position of the iterator
+        self.target = None  # (rank, iterator axis) of the element assigned by the assignment being checked
+        self.views = set()  # addresses of the variables that may hold a view of another array
+
+    def visit(self, node):  # so that ast = ast.accept(LoopVectorizer()) optimizes the program
+        self.views = self.shared(node)
+        return self.optimize(node)
+
+    def shared(self, node):  # addresses of the variables of program <node> that may hold a view of another array
+        views = set()
+        copies = []  # (target, source) of the assignments B = A, B shares A's array whole
+        for n in node.nodes():
+            if not isinstance(n, AST.Assignment) or n.identifier.index or n.assignment_type != '=':
+                continue
+            expr = n.expr
+            if isinstance(expr, AST.Variable) and not expr.index:
+                copies.append((n.identifier.address, expr.address))
+            elif isinstance(expr, AST.Variable) and expr.shape is not None or isinstance(expr, AST.Transpose) \
+                    or isinstance(expr, AST.Function) and expr.function_name == 'save':
+                views.add(n.identifier.address)  # a slice, row or transpose of an array, or save's own argument
+        changed = True
+        while changed:
+            changed = False
+            for target, source in copies:
+                if source in views and target not in views:
+                    views.add(target)
+                    changed = True
+        return views
+
+    def assignments(self, node):  # the assignments of loop body <node>, None if it holds anything else
+        if isinstance(node, AST.Scope):
+            node = node.instructions
+        instructions = node.instructions if isinstance(node, AST.Instructions) else [node]
+        if instructions and all([isinstance(i, AST.Assignment) and i.identifier.index for i in instructions]):
+            return instructions
+        return None
+
+    def elementwise_expr(self, node):
+        if not isinstance(node, self.elementwise):
+            return False
+        if isinstance(node, AST.Variable):
+            if node.index:
+                return self.element(node) and self.axes(node) == self.target
+            return node.address != self.iterator and node.address not in self.targets and self.rank(node) <= self.target[0]
+        if isinstance(node, AST.BinExpr):
+            if node.op == '/' and not (isinstance(node.right, (AST.IntNum, AST.FloatNum)) and node.right.value != 0):
+                return False  # Interpreter raises on division by zero, NumPy would not
+            return self.elementwise_expr(node.left) and self.elementwise_expr(node.right)
+        if isinstance(node, AST.Negation):
+            return self.elementwise_expr(node.expr)
+        return self.rank(node) <= self.target[0]
+
+    def element(self, node):  # is <node> indexed by the iterator, at the loop's position, and nothing else varying?
+        position = None
+        for i, el in enumerate(node.index.index):
+            if isinstance(el, AST.Variable) and el.index is None and el.address == self.iterator:
+                if position is not None:
+                    return False
+                position = i
+            elif isinstance(el, AST.Range):
+                if not (self.invariant_expr(el.start) and self.invariant_expr(el.end)):
+                    return False
+            elif not self.invariant_expr(el):
+                return False
+        if position is None or self.position not in (None, position):
+            return False
+        self.position = position
+        return True
+
+    def rank(self, node):  # dimensions of the value of <node> in one iteration
+        if isinstance(node, AST.Variable):
+            return len(node.shape) if node.shape else 0
+        if isinstance(node, AST.Array):
+            return node.value.ndim
+        if isinstance(node, AST.Tensor):
+            return 1 + (self.rank(node.value[0]) if node.value else 0)
+        return 0
+
+    def axes(self, node):  # (rank, axis the iterator becomes) of iterator-indexed variable <node>
+        return self.rank(node), len([el for el in node.index.index[:self.position] if isinstance(el, AST.Range)])
+
+    def varies(self, node):  # does <node> read the iterator?
+        return any([isinstance(n, AST.Variable) and n.address == self.iterator for n in node.nodes()])
+
+    def invariant_expr(self, node):
+        for n in node.nodes():
+            if not isinstance(n, self.invariant):
+                return False
+            if isinstance(n, AST.Variable) and (n.index or n.address == self.iterator or n.address in self.targets):
+                return False
+            if isinstance(n, AST.BinExpr) and n.op == '/':
+                return False
+        return True
+
+    def vectorize(self, node):  # whole-tensor assignments replacing loop <node>, None if it doesn't qualify
+        if node.identifier.address[0] != self.depth + 1:
+            return None  # the iterator is an outer variable, which keeps its last value after the loop
+        assignments = self.assignments(node.instructions)
+        if assignments is None:
+            return None
+
+        start, end = node.range.start, node.range.end
+        if not (isinstance(start, AST.IntNum) and isinstance(end, AST.IntNum) and 0 <= start.value <= end.value):
+            return None  # negative indexes could reach one element from two iterations, or not be indexes at all
+        if [n for a in assignments for n in a.nodes() if isinstance(n, AST.Variable) and n.address in self.views]:
+            return None
+
+        self.iterator = node.identifier.address
+        self.targets = {a.identifier.address for a in assignments}
+        self.position = None
+        for assignment in assignments:
+            if not self.element(assignment.identifier):
+                return None
+            self.target = self.axes(assignment.identifier)
+            if not self.elementwise_expr(assignment.expr):
+                return None
+
+        axis = self.target[1]
+        for assignment in assignments:
+            for n in assignment.nodes():  # their elements now make a tensor, with the iterator axis added
+                if isinstance(n, AST.BinExpr) and self.varies(n) or isinstance(n, AST.Variable) and n.index and self.varies(n.index):
+                    shape = n.shape or ()
+                    n.shape = shape[:axis] + (None,) + shape[axis:]
+            for n in assignment.nodes():
+                if isinstance(n, AST.Index):
+                    n.index = [copy.deepcopy(node.range) if isinstance(el, AST.Variable) and el.address == self.iterator
+                               else el for el in n.index]
+            if assignment.assignment_type != '=':  # the elements it updates now make a sub-tensor
+                assignment.assignment_type = '.' + assignment.assignment_type.lstrip('.')
+        return assignments
+
+    @on('node')
+    def optimize(self, node):
+        pass
+
+    @when(AST.Node)
+    def optimize(self, node):
+        return node
+
+    @when(AST.ForLoop)
+    def optimize(self, node):
+        self.depth += 1
+        try:
+            node.instructions = self.optimize(node.instructions)
+        finally:
+            self.depth -= 1
+
+        assignments = self.vectorize(node)
+        if assignments is None:
+            return node
+        instructions = AST.Instructions(assignments)
+        instructions.lineno = node.lineno
+        return instructions
+
+    @when(AST.While)
+    def optimize(self, node):
+        self.depth += 1
+        try:
+            node.instructions = self.optimize(node.instructions)
+        finally:
+            self.depth -= 1
+        return node
+
+    @when(AST.IfElse)
+    def optimize(self, node):
+        self.depth += 1
+        try:
+            node.then_instructions = self.optimize(node.then_instructions)
+            if node.else_instructions:
+                node.else_instructions = self.optimize(node.else_instructions)
+        finally:
+            self.depth -= 1
+        return node
+
+    @when(AST.Scope)
+    def optimize(self, node):
+        self.depth += 1
+        try:
+            node.instructions = self.optimize(node.instructions)
+        finally:
+            self.depth -= 1
+        return node
+
+    @when(AST.Instructions)
+    def optimize(self, node):
+        instructions = []
+        for instruction in node.instructions:
+            instruction = self.optimize(instruction)
+            if isinstance(instruction, AST.Instructions):  # a vectorized loop
+                instructions.extend(instruction.instructions)
+            else:
+                instructions.append(instruction)
+        node.instructions = instructions
+        return node
+
+
+class TypeSpecializer(object):
+    """AST-to-AST pass that replaces BinExpr nodes with typed ones, from TypeChecker's annotations.
+
+    Operations on two int/float scalars become ScalarBinExpr (ScalarDivision
+    for '/', the only one that needs a zero check) and element-wise operations
+    on two tensors become TensorBinExpr.  Both carry their operator function,
+    so Interpreter skips the operator lookup and the generic checks.  str and
+    mixed operations stay plain BinExpr.
+    """
+    operator_mapping = Interpreter.operator_mapping
+    numeric_types = ['int', 'float']
+    tensor_ops = ['.+', '.-', '.*', './']
+
+    def visit(self, node):  # so that ast = ast.accept(TypeSpecializer()) optimizes the program
+        return self.specialized(node)
+
+    def specialized(self, node):  # <node>, or its typed replacement, with all the nodes below it specialized
+        if not isinstance(node, AST.Node):
+            return node
+        for attribute, value in node.fields():
+            if isinstance(value, list):
+                setattr(node, attribute, [self.specialized(child) for child in value])
+            else:
+                setattr(node, attribute, self.specialized(value))
+        if isinstance(node, AST.BinExpr) and not isinstance(node, AST.TypedBinExpr) and node.type in self.numeric_types:
+            return self.typed(node)
+        return node
+
+    def typed(self, node):
+        if node.shape is None:
+            cls = AST.ScalarDivision if node.op == '/' else AST.ScalarBinExpr
+        elif node.op in self.tensor_ops:
+            cls = AST.TensorBinExpr
+        else:
+            return node
+        typed = cls(node.op, node.left, node.right, self.operator_mapping[node.op])
+        typed.lineno = node.lineno
+        typed.type = node.type
+        typed.shape = node.shape
+        return typed
+
+
+class TensorFuser(object):
+    """AST-to-AST pass that fuses trees of element-wise tensor operations, run after TypeSpecializer.
+
+    A maximal tree of TensorBinExpr nodes (.+ .- .* ./ on two tensors) and the
+    negations in it becomes one FusedExpr: the subtrees below the tree are its
+    operands, the operations its postfix program.  Fusion.fused evaluates it
+    blockwise into a single output tensor, e.g. A .+ B .* C ./ D allocates one
+    tensor instead of three.  Lone operations stay as they are.
+    """
+
+    def visit(self, node):  # so that ast = ast.accept(TensorFuser()) optimizes the program
+        return self.fused(node)
+
+    def fusible(self, node):  # root of a tree of element-wise tensor operations?
+        return isinstance(node, AST.TensorBinExpr) or (isinstance(node, AST.Negation) and self.fusible(node.expr))
+
+    def operations(self, node):  # number of operations of the tree rooted at <node>
+        if isinstance(node, AST.TensorBinExpr):
+            return 1 + self.operations(node.left) + self.operations(node.right)
+        if isinstance(node, AST.Negation):
+            return 1 + self.operations(node.expr)
+        return 0
+
+    def flatten(self, node, operands, program):  # appends the postfix form of the tree at <node> to <program>
+        if isinstance(node, AST.TensorBinExpr):
+            self.flatten(node.left, operands, program)
+            self.flatten(node.right, operands, program)
+            program.append(node.op)
+        elif isinstance(node, AST.Negation):  # of a tensor, as the operand of a tensor operation
+            self.flatten(node.expr, operands, program)
+            program.append('neg')
+        else:
+            program.append(len(operands))
+            operands.append(self.fused(node))
+
+    def fused(self, node):  # <node>, or the FusedExpr replacing it, with the trees below it fused
+        if not isinstance(node, AST.Node):
+            return node
+        if self.fusible(node) and self.operations(node) > 1:
+            operands, program = [], []
+            self.flatten(node, operands, program)
+            fused = AST.FusedExpr(operands, tuple(program))
+            fused.lineno = node.lineno
+            return fused
+        for attribute, value in node.fields():
+            if isinstance(value, list):
+                setattr(node, attribute, [self.fused(child) for child in value])
+            else:
+                setattr(node, attribute, self.fused(value))
+        return node
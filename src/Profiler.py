@@ -0,0 +1,180 @@
+import sys
+import time
+import weakref
+from Interpreter import Interpreter
+from BufferPool import BufferPool
+
+
+class Profiler(Interpreter):
+    """Interpreter that times every node it evaluates.
+
+    Only visit is overridden: every node still runs through Interpreter's own
+    handlers, which evaluate their children with child.accept(self) and so come
+    back here.  Per source line and per node class it counts evaluations and
+    adds up inclusive time (outermost evaluation of a line or class only, so
+    nested ones aren't counted twice) and exclusive time (minus the time of the
+    children).  Stacks of (class, line) frames collect exclusive time for
+    collapsed-stack output.  Interpreter itself is left untouched, a program
+    run without profiling pays nothing for it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.clock = time.perf_counter
+        self.lines = {}    # lineno -> [count, inclusive, exclusive]
+        self.classes = {}  # class name -> [count, inclusive, exclusive]
+        self.active = {}   # lineno or class name -> number of its evaluations in progress
+        self.stacks = {}   # (frame labels, ...) -> exclusive time
+        self.frames = [[(), 0.0, None]]  # [stack, time of the children, line] of every evaluation in progress
+        self.total = 0.0
+
+    def visit(self, node):
+        parent = self.frames[-1]
+        line = node.lineno if node.lineno is not None else parent[2]  # e.g. blocks, they count for their statement
+        name = node.__class__.__name__
+        active = self.active
+        active[line] = active.get(line, 0) + 1
+        active[name] = active.get(name, 0) + 1
+        frame = [parent[0] + (f'{name}:{line if line is not None else "-"}',), 0.0, line]
+        self.frames.append(frame)
+        start = self.clock()
+        try:
+            return Interpreter.visit(self, node)
+        finally:
+            elapsed = self.clock() - start
+            self.frames.pop()
+            parent[1] += elapsed
+            exclusive = elapsed - frame[1]
+            self.stacks[frame[0]] = self.stacks.get(frame[0], 0.0) + exclusive
+            self.record(self.lines, line, elapsed, exclusive)
+            self.record(self.classes, name, elapsed, exclusive)
+            if len(self.frames) == 1:
+                self.total += elapsed
+
+    def record(self, table, key, elapsed, exclusive):
+        self.active[key] -= 1
+        entry = table.get(key)
+        if entry is None:
+            entry = table[key] = [0, 0.0, 0.0]
+        entry[0] += 1
+        if self.active[key] == 0:
+            entry[1] += elapsed
+        entry[2] += exclusive
+
+    def report(self, source=None, limit=20, file=sys.stderr):  # hottest lines and node classes, by exclusive time
+        source_lines = source.splitlines() if source is not None else []
+        total = self.total or 1.0
+
+        print(f'\nprofile: {self.total:.4f}s', file=file)
+        print(f'{"line":>6}{"count":>10}{"inclusive":>11}{"exclusive":>11}{"%":>7}  source', file=file)
+        for line, (count, inclusive, exclusive) in self.hottest(self.lines)[:limit]:
+            text = source_lines[line - 1].strip() if line is not None and 0 < line <= len(source_lines) else ''
+            print(f'{line if line is not None else "-":>6}{count:>10}{inclusive:>10.4f}s{exclusive:>10.4f}s'
+                  f'{100 * exclusive / total:>6.1f}%  {text}', file=file)
+
+        print(f'\n{"node":<16}{"count":>10}{"inclusive":>11}{"exclusive":>11}{"%":>7}', file=file)
+        for name, (count, inclusive, exclusive) in self.hottest(self.classes)[:limit]:
+            print(f'{name:<16}{count:>10}{inclusive:>10.4f}s{exclusive:>10.4f}s{100 * exclusive / total:>6.1f}%', file=file)
+
+    @staticmethod
+    def hottest(table):
+        return sorted(table.items(), key=lambda item: item[1][2], reverse=True)
+
+    def collapsed_stacks(self, file):  # one 'frame;frame;... microseconds' line per stack, the input of flamegraph.pl
+        for stack, exclusive in sorted(self.stacks.items()):
+            microseconds = round(exclusive * 1e6)
+            if microseconds > 0:
+                print(f'{";".join(stack)} {microseconds}', file=file)
+
+
+class TensorProfiler(Interpreter):
+    """Interpreter that accounts for the memory of the tensors a program allocates.
+
+    A node evaluating to an ndarray that owns its data and isn't tracked yet
+    (results of zeros/ones/eye, element-wise operations, literals, negation)
+    has allocated it: its bytes are added to the node's line, and to the live
+    bytes until the array is freed.  Views, e.g. transposes and slices, share
+    the data of their base and allocate nothing.  When the live bytes reach a
+    new peak, the bytes held by every MemoryStack frame are recorded.  The
+    buffer pool retains nothing here: a tensor it kept for reuse would never
+    be freed, and a reused one not allocated, hiding what the program needs.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.pool = BufferPool(capacity=0)
+        import numpy as np
+        self.ndarray = np.ndarray
+        self.lines = {}  # lineno -> [allocations, bytes, largest]
+        self.live = {}   # id of every tracked array still alive -> bytes
+        self.live_bytes = 0
+        self.peak = 0
+        self.peak_line = None
+        self.peak_frames = []  # (frame name, bytes) when the peak was reached, unowned bytes as 'temporaries'
+
+    def visit(self, node):
+        value = Interpreter.visit(self, node)
+        if isinstance(value, self.ndarray) and value.base is None and id(value) not in self.live:
+            self.allocated(value, node.lineno)
+        return value
+
+    def allocated(self, array, line):
+        nbytes = array.nbytes
+        entry = self.lines.get(line)
+        if entry is None:
+            entry = self.lines[line] = [0, 0, 0]
+        entry[0] += 1
+        entry[1] += nbytes
+        entry[2] = max(entry[2], nbytes)
+
+        key = id(array)
+        self.live[key] = nbytes
+        self.live_bytes += nbytes
+        weakref.finalize(array, self.freed, key)
+        if self.live_bytes > self.peak:
+            self.peak = self.live_bytes
+            self.peak_line = line
+            self.peak_frames = self.frame_bytes()
+
+    def freed(self, key):
+        self.live_bytes -= self.live.pop(key)
+
+    def frame_bytes(self):  # bytes of the tracked arrays every frame refers to, views counted as their base
+        frames = []
+        counted = set()
+        for memory in self.memory_stack.stack:
+            nbytes = 0
+            for value in memory:
+                if isinstance(value, self.ndarray):
+                    owner = value if value.base is None else value.base
+                    if id(owner) in self.live and id(owner) not in counted:
+                        counted.add(id(owner))
+                        nbytes += self.live[id(owner)]
+            frames.append((memory.name, nbytes))
+        frames.append(('temporaries', self.live_bytes - sum([nbytes for _, nbytes in frames])))
+        return frames
+
+    def report(self, source=None, limit=20, file=sys.stderr):  # lines allocating the most, and the peak
+        source_lines = source.splitlines() if source is not None else []
+        total = sum([entry[1] for entry in self.lines.values()])
+
+        print(f'\ntensor memory: {size(total)} allocated, peak {size(self.peak)} live', file=file)
+        print(f'{"line":>6}{"arrays":>10}{"allocated":>12}{"largest":>12}{"%":>7}  source', file=file)
+        for line, (count, nbytes, largest) in sorted(self.lines.items(), key=lambda item: item[1][1], reverse=True)[:limit]:
+            text = source_lines[line - 1].strip() if line is not None and 0 < line <= len(source_lines) else ''
+            print(f'{line if line is not None else "-":>6}{count:>10}{size(nbytes):>12}{size(largest):>12}'
+                  f'{100 * nbytes / max(total, 1):>6.1f}%  {text}', file=file)
+
+        if self.peak:
+            print(f'\npeak {size(self.peak)} live, reached on line {self.peak_line}', file=file)
+            for depth, (name, nbytes) in enumerate(self.peak_frames):
+                label = name if name == 'temporaries' else f'{depth}: {name}'
+                print(f'{label:>16}{size(nbytes):>12}', file=file)
+
+
+def size(nbytes):
+    for unit in ['B', 'KB', 'MB']:
+        if abs(nbytes) < 1024:
+            return f'{nbytes:.0f}{unit}' if unit == 'B' else f'{nbytes:.1f}{unit}'
+        nbytes /= 1024
+    return f'{nbytes:.1f}GB'
@@ -0,0 +1,85 @@
+import os
+import sys
+import pickle
+import hashlib
+
+# Checked and optimized programs, stored next to their sources in __mcache__
+# the way Python keeps compiled modules in __pycache__.  An entry starts with
+# the key it was stored under: the hash of the source text, the optimization
+# setting and the front end that produced it.  Any change to one of them makes
+# the key differ, and the entry is rebuilt and overwritten on the next run.
+# A program that loads data files was typed from their headers, so the key is
+# followed by the size and modification time of each of them: the entry is
+# rebuilt too once one of the files changes.
+
+front_end = ['AST.py', 'scanner.py', 'Mparser.py', 'SymbolTable.py', 'TypeChecker.py', 'Library.py', 'Optimizer.py', 'Interpreter.py']
+
+
+def version():  # hash of the python version and of the modules that build the tree
+    digest = hashlib.sha256(sys.version.encode())
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in front_end:
+        with open(os.path.join(directory, name), 'rb') as file:
+            digest.update(file.read())
+    return digest.digest()
+
+
+def inputs(ast):  # data files whose headers TypeChecker read to type <ast>, the literal paths of load("a.npy")
+    import AST
+    from Library import functions
+    paths = set()
+    for node in ast.nodes():
+        if isinstance(node, AST.Function) and functions[node.function_name].reads:
+            path = node.args.args[0]
+            if isinstance(path, AST.StringLiteral):
+                paths.add(path.value)
+    return sorted(paths)
+
+
+def stamps(paths):  # (path, (size, modification time)) of every file of <paths>, None for one that is gone
+    result = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            result.append((path, (stat.st_size, stat.st_mtime_ns)))
+        except OSError:
+            result.append((path, None))
+    return result
+
+
+class ProgramCache(object):
+
+    def __init__(self, filename, optimize=True):  # entry of the .m file <filename>, lab5/pi.m -> lab5/__mcache__/pi.pickle
+        directory, name = os.path.split(filename)
+        self.path = os.path.join(directory, '__mcache__', os.path.splitext(name)[0] + '.pickle')
+        self.optimize = optimize
+
+    def key(self, text):
+        digest = hashlib.sha256(version())
+        digest.update(b'optimize' if self.optimize else b'no-optimize')
+        digest.update(text.encode())
+        return digest.digest()
+
+    def load(self, text):  # program tree stored for source <text>, None on a miss
+        try:
+            with open(self.path, 'rb') as file:
+                if file.read(32) != self.key(text):
+                    return None
+                files = pickle.load(file)
+                if files and stamps([path for path, _ in files]) != files:
+                    return None
+                return pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def store(self, text, ast):  # a cache that can't be written just stays empty
+        try:
+            files = pickle.dumps(stamps(inputs(ast)), pickle.HIGHEST_PROTOCOL)
+            data = self.key(text) + files + pickle.dumps(ast, pickle.HIGHEST_PROTOCOL)
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            temporary = f'{self.path}.{os.getpid()}'
+            with open(temporary, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, self.path)  # readers see the old entry or the new one, never a partial file
+        except (OSError, RecursionError, pickle.PicklingError):
+            pass
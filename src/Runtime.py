@@ -0,0 +1,95 @@
+import sys
+from Interpreter import Interpreter, index_element, in_bounds, index_text, inplace_mapping, compound, compound_item
+from Fusion import fused
+from Library import functions
+
+# Helpers called from the Python modules emitted by CodeGenerator.
+# They raise plain exceptions; run() attaches the .m line number.
+# numpy is imported by the tensor helpers, so programs without tensors never load it.
+
+operator_mapping = Interpreter.operator_mapping
+
+
+def div(left, right):
+    if right == 0:
+        raise ZeroDivisionError('ArithmeticError: Division by zero')
+    return left / right
+
+
+def make_range(start, end):
+    if not (isinstance(start, int) and isinstance(end, int)):
+        raise TypeError('range only support int values')
+    return range(start, end)
+
+
+def index(*elements):
+    for el in elements:
+        if not (isinstance(el, int) or isinstance(el, range)):
+            raise TypeError('index element is not of int or range type')
+    return tuple([index_element(el) for el in elements])
+
+
+def get_item(var_value, idx, var_name):
+    if not in_bounds(idx, var_value.shape):
+        raise IndexError(f'{index_text(idx)} index out of {var_name} shape {var_value.shape}')
+    return var_value[idx]
+
+
+def set_item(value, idx, var_value, var_name, op=None):
+    if not in_bounds(idx, var_value.shape):
+        raise IndexError(f'{index_text(idx)} index out of {var_name} shape {var_value.shape}')
+    if op in inplace_mapping:  # element-wise, on a sub-tensor
+        try:
+            return compound_item(op, var_value, idx, value)
+        except Exception as e:
+            raise RuntimeError(f'InternalInterpreterError: {e}')
+    if op is not None:
+        try:
+            value = operator_mapping[op](var_value[idx], value)
+        except Exception as e:
+            raise RuntimeError(f'InternalInterpreterError: {e}')
+    var_value[idx] = value
+    return value
+
+
+def call(function_name, args):
+    try:
+        return functions[function_name].function(*args)
+    except Exception as e:
+        raise RuntimeError(f'{function_name}: {e}')
+
+
+def transpose(value):
+    import numpy as np
+    return np.transpose(value)
+
+
+def tensor(elements):
+    import numpy as np
+    return np.array(elements)
+
+
+def undeclared(var_name):
+    raise NameError(f'{var_name} does not declared in this scope')
+
+
+def exit_with(value):
+    print(f'Returned value: {value}')
+    sys.exit(-1)
+
+
+def source_line(tb, filename, linenos):  # .m line of the innermost generated frame in traceback <tb>
+    lineno = None
+    while tb is not None:
+        if tb.tb_frame.f_code.co_filename == filename:
+            lineno = linenos.get(tb.tb_lineno, lineno)
+        tb = tb.tb_next
+    return lineno
+
+
+def run(main, linenos, filename):
+    try:
+        main()
+    except Exception as e:
+        lineno = source_line(e.__traceback__, filename, linenos)
+        raise RuntimeError(f'{e}, line {lineno}') from None
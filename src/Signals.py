@@ -0,0 +1,15 @@
+class Signal(object):  # returned by a statement that leaves the normal flow of execution
+
+    def __init__(self, command):
+        self.command = command
+
+
+class ReturnValue(Signal):
+
+    def __init__(self, value):
+        super().__init__('return')
+        self.value = value
+
+
+BREAK = Signal('break')
+CONTINUE = Signal('continue')
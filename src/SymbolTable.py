@@ -3,9 +3,10 @@ class Symbol:
 
 class VariableSymbol(Symbol):
 
-    def __init__(self, name, type):
+    def __init__(self, name, type, address=None):
         self.name = name
         self.type = type
+        self.address = address  # (depth, slot) of the run-time frame holding the variable
 
 
 class SymbolTable(object):
@@ -14,6 +15,8 @@ class SymbolTable(object):
         self.parent_scope = parent
         self.scope_name = name
         self.symbols = {}
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.size = 0  # number of slots of the run-time frame of this scope
 
     def put(self, name, symbol): # put variable symbol or fundef under <name> entry
         self.symbols[name] = symbol
@@ -28,6 +31,11 @@ class SymbolTable(object):
             return None
     #
 
+    def allocate(self): # reserve a slot in the run-time frame of this scope, returns its address
+        self.size += 1
+        return self.depth, self.size - 1
+    #
+
     def getParentScope(self):
         return self.parent_scope
     #
@@ -38,4 +46,4 @@ class SymbolTable(object):
 
     def popScope(self):
         return self.getParentScope()
-    #
\ No newline at end of file
+    #
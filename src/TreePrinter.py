@@ -41,6 +41,18 @@ class TreePrinter:
         for idx, row in enumerate(self.value):
             row.printTree(indent=indent+1)
 
+    @addToClass(AST.Array)
+    def printTree(self, indent=0, rows=None):
+        print(self.lineno)
+        prefix = '|  ' * indent
+
+        print(prefix + 'VECTOR')
+        for row in self.value.tolist() if rows is None else rows:
+            if isinstance(row, list):
+                self.printTree(indent=indent+1, rows=row)
+            else:
+                print(f'{prefix}|  {row}')
+
     @addToClass(AST.Index)
     def printTree(self, indent=0):
         for i in self.index:
@@ -75,12 +87,42 @@ class TreePrinter:
         print(prefix + 'NEGATION')
         self.expr.printTree(indent=indent+1)
 
+    @addToClass(AST.FusedExpr)
+    def printTree(self, indent=0, end=None):  # the operations it fuses, as the tree they came from
+        prefix = '|  ' * indent
+        if end is None:
+            print(prefix + 'FUSED')
+            self.printTree(indent=indent+1, end=len(self.program) - 1)
+            return
+
+        step = self.program[end]
+        if step.__class__ is int:
+            self.operands[step].printTree(indent=indent)
+        elif step == 'neg':
+            print(prefix + 'NEGATION')
+            self.printTree(indent=indent+1, end=end - 1)
+        else:
+            start, pending = end - 1, 1  # first step of the right operand
+            while True:
+                s = self.program[start]
+                pending += (0 if s.__class__ is int else 1 if s == 'neg' else 2) - 1
+                if pending == 0:
+                    break
+                start -= 1
+            print(prefix + step)
+            self.printTree(indent=indent+1, end=start - 1)
+            self.printTree(indent=indent+1, end=end - 1)
+
     @addToClass(AST.Function)
     def printTree(self, indent=0):
         prefix = '|  ' * indent
         print(prefix + self.function_name)
         self.args.printTree(indent=indent+1)
 
+    @addToClass(AST.Call)
+    def printTree(self, indent=0):
+        self.function.printTree(indent=indent)
+
     @addToClass(AST.Assignment)
     def printTree(self, indent=0):
         prefix = '|  ' * indent
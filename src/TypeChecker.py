@@ -1,6 +1,7 @@
 import AST
+import itertools
 import SymbolTable
-from termcolor import colored
+import Library
 
 
 class NodeVisitor(object):
@@ -26,6 +27,7 @@ class NodeVisitor(object):
                     self.visit(child)
 
     def print_error(self, lineno, msg):
+        from termcolor import colored
         self.error_count += 1
         print(colored(f'Error on line {lineno}: {msg}', 'red'))
 
@@ -39,6 +41,7 @@ class TypeChecker(NodeVisitor):
     tensor_ops = ['.+', '.-', '.*', './']
     scalar_ops = ['+', '-', '*', '/', '<', '>', '==', '>=', '<=']
     numeric_types = ['int', 'float']
+    array_types = {'i': 'int', 'f': 'float', 'U': 'str'}
 
     ops_with_ret_type = {
         '+': {
@@ -150,34 +153,42 @@ class TypeChecker(NodeVisitor):
             elif is_tensor2 and not is_tensor1:
                 self.print_error(node.lineno, "Can't add scalar to tensor")
             else:  # working on tensors
-                if (None not in shape_or_val1 and
-                    None not in shape_or_val2 and
-                    shape_or_val1 != shape_or_val2) or \
-                        (len(shape_or_val1) != len(shape_or_val2)):
+                shape = self.broadcast(shape_or_val1, shape_or_val2)
+                if shape is None:
                     self.print_error(node.lineno, "tensors of incompatible shapes")
-                elif None in shape_or_val1 or None in shape_or_val2:
-                    for i, j in zip(shape_or_val1, shape_or_val2):
-                        if i and j:
-                            if i != j:
-                                self.print_error(node.lineno, "tensors of incompatible shapes")
-                                break
+                    shape = shape_or_val1
 
                 if op not in self.tensor_ops:
                     self.print_error(node.lineno, f"{op} does not support tensor operations")
                 elif (type1, type2) not in self.ops_with_ret_type[op]:
                     self.print_error(node.lineno, f"Can't perform {op} on {(type1, type2)}, incompatible types")
                 else:
-                    return self.ops_with_ret_type[op][(type1, type2)], shape_or_val1
+                    node.type, node.shape = self.ops_with_ret_type[op][(type1, type2)], shape
+                    return node.type, shape
         else:  # working with scalars
             if op not in self.scalar_ops:
                 self.print_error(node.lineno, f"{op} does not support scalar operations")
             elif (type1, type2) not in self.ops_with_ret_type[op]:
                 self.print_error(node.lineno, f"Can't perform {op} on {(type1, type2)}, incompatible types")
             else:
-                return self.ops_with_ret_type[op][(type1, type2)], shape_or_val1
+                node.type, node.shape = self.ops_with_ret_type[op][(type1, type2)], None
+                return node.type, shape_or_val1
 
         return type1, shape_or_val1
 
+    def broadcast(self, shape1, shape2):  # shape of an element-wise result on tensors of <shape1> and <shape2>, None if they don't broadcast
+        shape = []
+        for i, j in itertools.zip_longest(reversed(shape1), reversed(shape2), fillvalue=1):  # NumPy lines up trailing axes
+            if i == 1 or i == j:
+                shape.append(j)
+            elif j == 1:
+                shape.append(i)
+            elif i is None or j is None:  # an unknown size has to be the known one, or 1
+                shape.append(i if j is None else j)
+            else:
+                return None
+        return tuple(reversed(shape))
+
     def visit_Variable(self, node):
         name = node.name
         index = node.index
@@ -187,6 +198,7 @@ class TypeChecker(NodeVisitor):
             self.print_error(node.lineno, "Variable referenced before assignment")
             return "unknown", None
 
+        node.address = var.address
         var_type, var_shape_or_val = var.type
 
         if index is not None:  # TODO: refactor? (use wrapped Tuple in visit_index)
@@ -195,6 +207,7 @@ class TypeChecker(NodeVisitor):
             elif len(index.index) > len(var_shape_or_val):
                 self.print_error(node.lineno, f"Index is bigger than {name} shape")
             else:
+                shape = []  # a range keeps its axis, as a slice of the tensor
                 for i, idx in enumerate(index.index):
                     t, value = self.visit(idx)
                     if t != 'int':
@@ -202,20 +215,34 @@ class TypeChecker(NodeVisitor):
                     if isinstance(value, tuple):
                         self.print_error(node.lineno, "Vector or matrix can't be used as index")  # TODO: Or do it?
 
+                    size = var_shape_or_val[i]
                     if isinstance(idx, AST.IntNum):
-                        if var_shape_or_val[i] <= idx.value:
+                        if size is not None and size <= idx.value:
                             self.print_error(node.lineno, f"{idx.value} index out of {node.name} shape "
                               f"{'' if None in var_shape_or_val else var_shape_or_val}")
-
-                if len(index.index) == len(var_shape_or_val):
+                    elif isinstance(idx, AST.Range):
+                        start, end = idx.start, idx.end
+                        if isinstance(start, AST.IntNum) and isinstance(end, AST.IntNum):
+                            if start.value < 0 or (size is not None and size < end.value):
+                                self.print_error(node.lineno, f"{start.value}:{end.value} index out of {node.name} shape "
+                                  f"{'' if None in var_shape_or_val else var_shape_or_val}")
+                            shape.append(max(end.value - start.value, 0))
+                        else:
+                            shape.append(None)
+
+                shape = tuple(shape) + var_shape_or_val[len(index.index):]
+                if not shape:
                     return var_type, None  # it's a scalar
                 else:  # it's tensor of lower dimension
-                    return var_type, var_shape_or_val[len(index.index):]
+                    node.shape = shape
+                    return var_type, shape
 
+        if index is None and isinstance(var_shape_or_val, tuple):
+            node.shape = var_shape_or_val
         return var_type, var_shape_or_val
 
     def visit_Transpose(self, node):
-        t, shape = self.visit(node)
+        t, shape = self.visit(node.expr)
 
         if not isinstance(shape, tuple):
             self.print_error(node.lineno, f"Can transpose Tensor, got: {node.__class__.__name__}")
@@ -229,7 +256,7 @@ class TypeChecker(NodeVisitor):
         return t, new_shape
 
     def visit_Negation(self, node):
-        t, shape_or_val = self.visit(node)
+        t, shape_or_val = self.visit(node.expr)
 
         if isinstance(shape_or_val, tuple):
             self.print_error(node.lineno, "Negation does not support tensors")
@@ -252,47 +279,62 @@ class TypeChecker(NodeVisitor):
     def visit_Function(self, node):
         types, shapes = self.visit(node.args)
 
-        if len(set(types)) > 1:
-            self.print_error(node.lineno, f"expected int numbers or variables in arguments got {[t for t in types]}")
+        builtin = Library.functions.get(node.function_name)
+        if builtin is None:
+            self.print_error(node.lineno, f"unknown function {node.function_name}")
+            return 'unknown', None
+        if 'unknown' in types:
+            return 'unknown', None
 
-        shape = []
-        for val in shapes:
-            if isinstance(val, tuple):
-                self.print_error(node.lineno, f"expected int numbers or variables in arguments got tensor")
-                shape.append(None)
-            else:
-                shape.append(val)
+        return builtin.signature(lambda msg: self.print_error(node.lineno, f'{node.function_name}: {msg}'), types, shapes)
 
-        return "int", tuple(shape)
+    def visit_Call(self, node):
+        self.visit(node.function)
 
     def visit_Assignment(self, node):
         identifier = node.identifier
         assignment_type = node.assignment_type
         expr = node.expr
 
-        if identifier.index is not None:
+        if identifier.index is not None and assignment_type == '=':
             self.visit(identifier)
 
         if assignment_type != '=':
-            additional_expression = AST.BinExpr(assignment_type[0], identifier, expr)
-            self.visit(additional_expression)
+            op = assignment_type[:-1].lstrip('.')
+            t, shape_or_val = self.visit(identifier)
+            if isinstance(shape_or_val, tuple):  # on a tensor, A += B adds element-wise, in place
+                op = '.' + op
+                node.assignment_type = op + '='
+            if t != 'unknown':
+                additional_expression = AST.BinExpr(op, identifier, expr)
+                additional_expression.lineno = node.lineno
+                _, shape = self.visit(additional_expression)
+                if isinstance(shape_or_val, tuple) and isinstance(shape, tuple) and (len(shape) != len(shape_or_val) or not all(
+                        [i is None or j is None or i == j for i, j in zip(shape, shape_or_val)])):  # the result is broadcast
+                    self.print_error(node.lineno, f"{assignment_type} can't change the shape {shape_or_val} it assigns to")
         else:
             t, shape_or_val = self.visit(expr)
             if not isinstance(shape_or_val, tuple):
                 shape_or_val = None
 
-            if self.current_scope.get(identifier.name) is None or identifier.index is None:
-                symbol = SymbolTable.VariableSymbol(identifier.name, (t, shape_or_val))
+            var = self.current_scope.get(identifier.name)
+            if var is None or identifier.index is None:
+                # an outer variable keeps its frame slot, as MemoryStack.set writes to the outer frame
+                identifier.address = var.address if var is not None else self.current_scope.allocate()
+                symbol = SymbolTable.VariableSymbol(identifier.name, (t, shape_or_val), identifier.address)
                 self.current_scope.put(identifier.name, symbol)
 
     def visit_ForLoop(self, node):
         self.current_scope = self.current_scope.pushScope('for')
         self.visit(node.range)
 
-        symbol = SymbolTable.VariableSymbol(node.identifier.name, ('int', None))
+        var = self.current_scope.get(node.identifier.name)
+        node.identifier.address = var.address if var is not None else self.current_scope.allocate()
+        symbol = SymbolTable.VariableSymbol(node.identifier.name, ('int', None), node.identifier.address)
         self.current_scope.put(node.identifier.name, symbol)
         self.visit(node.instructions)
 
+        node.frame_size = self.current_scope.size
         self.current_scope = self.current_scope.popScope()
 
     def visit_Range(self, node):
@@ -324,6 +366,7 @@ class TypeChecker(NodeVisitor):
         self.check_condition(node)
         self.visit(node.instructions)
 
+        node.frame_size = self.current_scope.size
         self.current_scope = self.current_scope.popScope()
 
     def visit_IfElse(self, node):
@@ -332,22 +375,28 @@ class TypeChecker(NodeVisitor):
         self.check_condition(node)
         self.visit(node.then_instructions)
 
+        node.then_frame_size = self.current_scope.size
         self.current_scope = self.current_scope.popScope()
 
         if node.else_instructions:
             self.current_scope = self.current_scope.pushScope('else')
             self.visit(node.else_instructions)
+            node.else_frame_size = self.current_scope.size
             self.current_scope = self.current_scope.popScope()
 
     def visit_Instructions(self, node):
         for instruction in node.instructions:
             self.visit(instruction)
 
+        if self.current_scope.parent_scope is None:  # the program itself
+            node.frame_size = self.current_scope.size
+
     def visit_Scope(self, node):
         self.current_scope = self.current_scope.pushScope('block')
 
         self.visit(node.instructions)
 
+        node.frame_size = self.current_scope.size
         self.current_scope = self.current_scope.popScope()
 
     def visit_Print(self, node):
@@ -375,6 +424,9 @@ class TypeChecker(NodeVisitor):
     def visit_StringLiteral(self, node):
         return 'str', node.value
 
+    def visit_Array(self, node):  # materialized literal, its dtype and shape are known already
+        return self.array_types[node.value.dtype.kind], node.value.shape
+
     def visit_Tensor(self, node):
         sizes = set()
         dtype = set()
@@ -0,0 +1,134 @@
+import Runtime
+from Bytecode import *
+
+
+class VirtualMachine(object):
+    """Dispatch loop executing a Program produced by BytecodeCompiler.
+
+    Checks that need Interpreter's messages (division by zero, index and range
+    types, returns) reuse the helpers of Runtime; any error is reported with
+    the .m line of the failing instruction.
+    """
+    def __init__(self, program):
+        self.program = program
+        self.registers = [None] * len(program.variables) + list(program.consts) + [None] * program.temps
+
+    def visit(self, node):  # so that ast.accept(VirtualMachine(...)) runs the program
+        return self.run()
+
+    def run(self):
+        program = self.program
+        code = program.code
+        regs = self.registers
+        names = program.names
+        pc = 0
+        try:
+            while True:
+                op = code[pc]
+                a = code[pc + 1]
+                b = code[pc + 2]
+                c = code[pc + 3]
+                pc += 4
+
+                if op == FORLOOP:
+                    i = regs[b] + 1
+                    if i < regs[b + 1]:
+                        regs[b] = i
+                        regs[c] = i
+                        pc = a
+                elif op == JMP:
+                    pc = a
+                elif op == ADD:
+                    regs[a] = regs[b] + regs[c]
+                elif op == SUB:
+                    regs[a] = regs[b] - regs[c]
+                elif op == MUL:
+                    regs[a] = regs[b] * regs[c]
+                elif op == DIV:
+                    right = regs[c]
+                    if right == 0:
+                        raise ZeroDivisionError('ArithmeticError: Division by zero')
+                    regs[a] = regs[b] / right
+                elif op == MOVE:
+                    regs[a] = regs[b]
+                elif op == JNLT:
+                    if not regs[b] < regs[c]:
+                        pc = a
+                elif op == JNGT:
+                    if not regs[b] > regs[c]:
+                        pc = a
+                elif op == JNLE:
+                    if not regs[b] <= regs[c]:
+                        pc = a
+                elif op == JNGE:
+                    if not regs[b] >= regs[c]:
+                        pc = a
+                elif op == JNEQ:
+                    if not regs[b] == regs[c]:
+                        pc = a
+                elif op == JNNE:
+                    if not regs[b] != regs[c]:
+                        pc = a
+                elif op == JMPF:
+                    if not regs[b]:
+                        pc = a
+                elif op == TRUEDIV:
+                    regs[a] = regs[b] / regs[c]
+                elif op == LT:
+                    regs[a] = regs[b] < regs[c]
+                elif op == GT:
+                    regs[a] = regs[b] > regs[c]
+                elif op == LE:
+                    regs[a] = regs[b] <= regs[c]
+                elif op == GE:
+                    regs[a] = regs[b] >= regs[c]
+                elif op == EQ:
+                    regs[a] = regs[b] == regs[c]
+                elif op == NE:
+                    regs[a] = regs[b] != regs[c]
+                elif op == FORPREP:
+                    start = regs[b]
+                    if not (isinstance(start, int) and isinstance(regs[b + 1], int)):
+                        raise TypeError('range only support int values')
+                    if start < regs[b + 1]:
+                        regs[c] = start
+                    else:
+                        pc = a
+                elif op == NEG:
+                    regs[a] = -regs[b]
+                elif op == TRANSPOSE:
+                    regs[a] = Runtime.transpose(regs[b])
+                elif op == INDEX:
+                    regs[a] = Runtime.index(*regs[b:b + c])
+                elif op == GETITEM:
+                    regs[a] = Runtime.get_item(regs[b], regs[c], program.register_name(b))
+                elif op == SETITEM:
+                    Runtime.set_item(regs[c], regs[b], regs[a], program.register_name(a))
+                elif op == INPLACE:
+                    regs[a] = Runtime.compound(inplace_ops[c], regs[a], regs[b])
+                elif op == INPLACEITEM:
+                    Runtime.set_item(regs[b + 1], regs[b], regs[a], program.register_name(a), inplace_ops[c])
+                elif op == RANGE:
+                    regs[a] = Runtime.make_range(regs[b], regs[c])
+                elif op == TUPLE:
+                    regs[a] = tuple(regs[b:b + c])
+                elif op == TENSOR:
+                    regs[a] = Runtime.tensor(regs[b:b + c])
+                elif op == FUSED:
+                    regs[a] = Runtime.fused(regs[b], regs[b + 1:b + c])
+                elif op == COPY:
+                    regs[a] = regs[b].copy()
+                elif op == CALL:
+                    regs[a] = Runtime.call(names[b], regs[c])
+                elif op == PRINT:
+                    print(' '.join([str(arg) for arg in regs[a:a + b]]))
+                elif op == RETURN:
+                    Runtime.exit_with(regs[a])
+                elif op == RETURNNONE:
+                    Runtime.exit_with(None)
+                elif op == UNDECLARED:
+                    Runtime.undeclared(names[a])
+                elif op == HALT:
+                    return
+        except Exception as e:
+            raise RuntimeError(f'{e}, line {program.lines[pc // 4 - 1]}') from None
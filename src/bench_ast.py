@@ -0,0 +1,63 @@
+import io
+import sys
+import time
+import tracemalloc
+import contextlib
+import Mparser
+from Arena import Arena
+from TreePrinter import TreePrinter
+from TypeChecker import TypeChecker
+from Interpreter import Interpreter
+
+# Memory of a large parsed program as a tree of nodes and as an Arena, and
+# the time TreePrinter, TypeChecker and Interpreter take to walk each form.
+# usage: python bench_ast.py [statements]   (defaults to 100000)
+
+
+def program(statements):
+    lines = ['x = 0;', 'y = 1.5;', 's = "a";']
+    for i in range(statements // 4):
+        lines.append(f'x = x + {i} * 2 - x / 3;')
+        lines.append(f'if (x > {i}) {{ y = y * 0.5 + {i}; }} else {{ y = -y; }}')
+        lines.append(f'z = [{i}, {i + 1}, {i + 2}];')
+        lines.append(f's = "b";')
+    return '\n'.join(lines) + '\n'
+
+
+def parse(text):
+    ast = Mparser.parser.parse(text, lexer=Mparser.scanner.clone(), tracking=True)
+    Mparser.parser.symstack.clear()  # the parser keeps its last stack, and so the tree, until the next parse
+    return ast
+
+
+def retained(build):  # object built by <build> and the memory it holds on to
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return obj, size
+
+
+def timed(fn):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    text = program(statements)
+
+    tree, tree_size = retained(lambda: parse(text))
+    arena, arena_size = retained(lambda: Arena(parse(text)))
+    nodes = len(arena)
+
+    print(f'{len(text.splitlines())} statements, {nodes} nodes')
+    print(f'{"form":<8}{"memory":>10}{"per node":>10}{"print":>9}{"check":>9}{"run":>9}')
+    for name, root, size in [('tree', tree, tree_size), ('arena', arena.root, arena_size)]:
+        printing = timed(lambda: root.printTree())
+        checking = timed(lambda: TypeChecker().visit(root))
+        running = timed(lambda: root.accept(Interpreter()))
+        print(f'{name:<8}{size / 2 ** 20:>8.1f}MB{size / nodes:>9.0f}B{printing:>8.2f}s{checking:>8.2f}s{running:>8.2f}s')
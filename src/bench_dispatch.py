@@ -0,0 +1,42 @@
+import timeit
+import AST
+from Interpreter import Interpreter
+
+# Cost of one Interpreter.visit dispatch per node type: time of node.accept(interpreter)
+# minus time of calling the registered handler directly.
+# usage: python bench_dispatch.py
+
+
+class SubclassedBinExpr(AST.BinExpr):  # resolved through the MRO on first use, then cached
+    pass
+
+
+def sample_nodes():
+    variable = AST.Variable('x')
+    variable.address = (0, 0)
+    return [
+        AST.IntNum(1),
+        AST.FloatNum(1.0),
+        AST.StringLiteral('s'),
+        variable,
+        AST.BinExpr('+', AST.IntNum(1), AST.IntNum(2)),
+        SubclassedBinExpr('+', AST.IntNum(1), AST.IntNum(2)),
+        AST.Negation(AST.IntNum(1)),
+        AST.Range(AST.IntNum(0), AST.IntNum(3)),
+    ]
+
+
+if __name__ == '__main__':
+    interpreter = Interpreter()
+    interpreter.memory_stack.stack[0].reserve(1)
+    interpreter.memory_stack.set((0, 0), 1)
+    number = 200000
+    cache = Interpreter.visit.dispatcher.cache
+
+    print(f'{"node type":<20}{"accept":>12}{"handler":>12}{"dispatch":>12}')
+    for node in sample_nodes():
+        handler = cache[node.__class__]
+        accept = min(timeit.repeat(lambda: node.accept(interpreter), number=number, repeat=5)) / number
+        direct = min(timeit.repeat(lambda: handler(interpreter, node), number=number, repeat=5)) / number
+        print(f'{node.__class__.__name__:<20}{accept * 1e9:>10.0f}ns{direct * 1e9:>10.0f}ns'
+              f'{(accept - direct) * 1e9:>10.0f}ns')
@@ -0,0 +1,58 @@
+import sys
+import time
+import Mparser
+
+# Parse throughput on synthetic sources: many statements, one huge tensor
+# literal, and long print/index tuples.  Time per MB should stay flat as the
+# sources grow, i.e. parsing is linear in the input.
+# usage: python bench_parser.py [megabytes]   (defaults to 1)
+
+
+def statements(size):
+    lines = []
+    length = 0
+    i = 0
+    while length < size:
+        line = f'x{i % 100} = x{(i + 1) % 100} * 2 + {i} - y / 3;\n'
+        lines.append(line)
+        length += len(line)
+        i += 1
+    return 'y = 1;\n' + ''.join([f'x{i} = 0;\n' for i in range(100)]) + ''.join(lines)
+
+
+def tensor(size):
+    count = size // 8
+    return 'A = [' + ', '.join([f'{i % 1000}.{i % 7}' for i in range(count)]) + '];\n'
+
+
+def tuples(size):
+    count = size // 6
+    return 'a = 1;\nprint ' + ', '.join(['a + 1'] * count) + ';\n'
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def parse(text):
+    ast = Mparser.parser.parse(text, lexer=Mparser.scanner.clone(), tracking=True)
+    assert Mparser.parser.errorok
+    return ast
+
+
+if __name__ == '__main__':
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+    repeat = 3
+
+    print(f'{"source":<12}{"size":>10}{"parse":>11}{"per MB":>11}')
+    for name, generate in [('statements', statements), ('tensor', tensor), ('tuple', tuples)]:
+        for fraction in [0.25, 0.5, 1]:
+            text = generate(int(megabytes * fraction * 2 ** 20))
+            seconds = best_of(lambda: parse(text), repeat)
+            size = len(text) / 2 ** 20
+            print(f'{name:<12}{size:>8.2f}MB{seconds:>10.2f}s{seconds / size:>10.2f}s')
@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+import scanner
+
+# Tokenizer throughput and memory on synthetic sources read from disk: many
+# short statements, and one machine-generated tensor literal on a single line.
+# Time per MB and peak memory should stay flat as the sources grow.
+# usage: python bench_scanner.py [megabytes]   (defaults to 4)
+
+
+def statements(size):
+    line = 'x = x * 2 + 17 - y / 3;  # update x\n'
+    return line * (size // len(line))
+
+
+def tensor(size):
+    return 'A = [' + ', '.join([f'{i % 1000}.{i % 7}' for i in range(size // 7)]) + '];\n'
+
+
+def tokenize(filename):
+    count = 0
+    with open(filename) as file:
+        for _ in scanner.tokenize(file):
+            count += 1
+    return count
+
+
+def peak_memory(filename):
+    tracemalloc.start()
+    tokenize(filename)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+if __name__ == '__main__':
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+    print(f'{"source":<12}{"size":>10}{"tokens":>10}{"time":>9}{"per MB":>9}{"peak":>10}')
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'source.m')
+        for name, generate in [('statements', statements), ('tensor', tensor)]:
+            for fraction in [0.25, 0.5, 1]:
+                with open(filename, 'w') as file:
+                    file.write(generate(int(megabytes * fraction * 2 ** 20)))
+                size = os.path.getsize(filename) / 2 ** 20
+
+                start = time.perf_counter()
+                count = tokenize(filename)
+                seconds = time.perf_counter() - start
+                peak = peak_memory(filename) / 2 ** 20
+                print(f'{name:<12}{size:>8.2f}MB{count:>10}{seconds:>8.2f}s{seconds / size:>8.2f}s{peak:>8.2f}MB')
@@ -0,0 +1,45 @@
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+# Cold start of main_lab5.py: wall time of a whole process running a one-line
+# program, against a bare interpreter start.  Every backend should stay under
+# the target; a tensor program shows what loading numpy adds on top.
+# usage: python bench_startup.py [target ms]   (defaults to 50)
+
+programs = {
+    'scalar': 'a = 1;\nprint a + 2;\n',
+    'tensor': 'A = ones(3);\nprint A;\n',
+}
+
+
+def best_of(command, repeat, env):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, env=env, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+    target = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.05
+    repeat = 10
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)  # measure the usual start, with the modules' .pyc files cached
+
+    print(f'{"program":<10}{"backend":<14}{"start":>9}{"target":>9}')
+    print(f'{"-":<10}{"python -c":<14}{best_of([sys.executable, "-c", "pass"], repeat, env) * 1000:>7.1f}ms')
+    with tempfile.TemporaryDirectory() as directory:
+        for name, text in programs.items():
+            filename = os.path.join(directory, name + '.m')
+            with open(filename, 'w') as file:
+                file.write(text)
+            for backend in ['interpreter', 'closure', 'python', 'vm']:
+                command = [sys.executable, 'main_lab5.py', filename, '--backend', backend]
+                subprocess.run(command, stdout=subprocess.DEVNULL, env=env, check=True)  # writes the .pyc files
+                seconds = best_of(command, repeat, env)
+                verdict = ('ok' if seconds <= target else 'SLOW') if name == 'scalar' else ''
+                print(f'{name:<10}{backend:<14}{seconds * 1000:>7.1f}ms{target * 1000:>7.0f}ms  {verdict}'.rstrip())
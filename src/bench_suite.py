@@ -0,0 +1,234 @@
+import io
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import contextlib
+import subprocess
+import Mparser
+from TypeChecker import TypeChecker
+from main_lab5 import optimized
+
+# Scaled versions of the lab5 programs, with lex, parse, check, optimize and
+# run timed separately.  Results are written as JSON; --compare flags the
+# phases that got slower between two result files.
+# usage: python bench_suite.py [--scale 1] [--backend interpreter] [--output results.json] [workload ...]
+#        python bench_suite.py --compare old.json new.json [--threshold 0.1]
+
+# template and default parameters of every workload, --scale multiplies the parameters (range ends, so at least 2)
+workloads = {
+    'pi': ("""
+pi = 0.0;
+n = 1;
+for i = 1:{iterations} {{
+    pi += 4.0 / n - 4.0 / (n + 2);
+    n += 4;
+}}
+print pi;
+""", {'iterations': 100000}),
+    'primes': ("""
+for n = 2:{limit} {{
+    p = 1;
+    for d = 2:n-1 {{
+        nc = n;
+        while (nc > 0) nc -= d;
+        if (nc == 0) {{
+            p = 0;
+            break;
+        }}
+    }}
+    if (p == 1) {{
+        print n;
+    }}
+}}
+""", {'limit': 200}),
+    'sqrt': ("""
+for x = 1:{numbers} {{
+    sqrt_x = 1.0;
+    for i = 1:{iterations} sqrt_x = (sqrt_x + x / sqrt_x) / 2;
+    print x, sqrt_x;
+}}
+""", {'numbers': 10, 'iterations': 10000}),
+    'fibonacci': ("""
+for r = 0:{repeat} {{
+    a = 0;
+    b = 1;
+    while (b < 1000000000) {{
+        print b;
+        b += a;
+        a = b - a;
+    }}
+}}
+""", {'repeat': 1000}),
+    'matrix': ("""
+for r = 0:{repeat} {{
+    A = eye({size});
+    B = ones({size});
+    C = A .+ B;
+    E = C .* A;
+    D = zeros({size}, {columns});
+    D[0, 0] = 42;
+    D[1:{size}, 2:{columns}] = 7;
+    print D[{size} - 1, {size} - 1];
+}}
+""", {'repeat': 2000, 'size': 50, 'columns': 60}),
+    'triangle': ("""
+n = {rows};
+for i = 1:n print "*" * i;
+""", {'rows': 2000}),
+}
+
+phases = ['lex', 'parse', 'check', 'optimize', 'run']
+
+
+def source(name, scale):
+    template, parameters = workloads[name]
+    return template.format(**{key: max(2, int(value * scale)) for key, value in parameters.items()})
+
+
+def lex(text):
+    lexer = Mparser.scanner.clone()
+    lexer.input(text)
+    for _ in iter(lexer.token, None):
+        pass
+
+
+def parse(text):
+    ast = Mparser.parser.parse(text, lexer=Mparser.scanner.clone(), tracking=True)
+    if not Mparser.parser.errorok:
+        raise SyntaxError('the workload does not parse')
+    return ast
+
+
+def check(ast):
+    type_checker = TypeChecker()
+    type_checker.visit(ast)
+    if type_checker.error_count:
+        raise TypeError('the workload does not type-check')
+
+
+def run(ast, backend):
+    if backend == 'python':
+        from CodeGenerator import CodeGenerator
+        ast.accept(CodeGenerator())
+    elif backend == 'vm':
+        from Bytecode import BytecodeCompiler
+        from VirtualMachine import VirtualMachine
+        VirtualMachine(BytecodeCompiler().compile_program(ast)).run()
+    elif backend == 'closure':
+        from ClosureCompiler import ClosureCompiler
+        ast.accept(ClosureCompiler())
+    else:
+        from Interpreter import Interpreter
+        ast.accept(Interpreter())
+
+
+def measure(text, backend, optimizing):  # seconds of every phase, one run of the whole pipeline
+    times = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        lex(text)
+        times['lex'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ast = parse(text)
+        times['parse'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        check(ast)
+        times['check'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if optimizing:
+            ast = optimized(ast)  # the passes of main_lab5.front_end, timed apart from the check
+        times['optimize'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        run(ast, backend)
+        times['run'] = time.perf_counter() - start
+    return times
+
+
+def benchmark(names, scale, backend, optimizing, warmup, repeat):
+    results = {}
+    for name in names:
+        text = source(name, scale)
+        for _ in range(warmup):
+            measure(text, backend, optimizing)
+        samples = [measure(text, backend, optimizing) for _ in range(repeat)]
+        results[name] = {}
+        for phase in phases:
+            values = [sample[phase] for sample in samples]
+            results[name][phase] = {
+                'min': min(values),
+                'median': statistics.median(values),
+                'mean': statistics.mean(values),
+                'samples': values,
+            }
+        print(f'{name:<11}' + ''.join([f'{results[name][phase]["median"]:>10.4f}' for phase in phases]), file=sys.stderr)
+    return results
+
+
+def revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(old, new, threshold):  # prints both medians of every phase, True if a phase got slower than <threshold>
+    regressed = False
+    print(f'{"workload":<11}{"phase":<10}{"old":>10}{"new":>10}{"ratio":>8}')
+    for name in [name for name in new['results'] if name in old['results']]:
+        for phase in phases:
+            before = old['results'][name][phase]['median']
+            after = new['results'][name][phase]['median']
+            ratio = after / before if before else 1.0
+            slower = ratio > 1 + threshold and after - before > 1e-4  # phases of a few microseconds are all noise
+            regressed = regressed or slower
+            flag = '  REGRESSION' if slower else '  faster' if ratio < 1 - threshold else ''
+            print(f'{name:<11}{phase:<10}{before:>10.4f}{after:>10.4f}{ratio:>8.2f}{flag}')
+    return regressed
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument('workloads', nargs='*', help=f'workloads to run, all by default: {", ".join(workloads)}')
+    argparser.add_argument('--scale', type=float, default=1.0, help='multiplies iteration counts and tensor sizes')
+    argparser.add_argument('--backend', choices=['interpreter', 'closure', 'python', 'vm'], default='interpreter')
+    argparser.add_argument('--no-optimize', action='store_true', help='run the programs without optimization passes')
+    argparser.add_argument('--warmup', type=int, default=1, help='untimed runs before the timed ones')
+    argparser.add_argument('--repeat', type=int, default=5, help='timed runs of every workload')
+    argparser.add_argument('--output', help='file the JSON results are written to, stdout by default')
+    argparser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two result files instead of running')
+    argparser.add_argument('--threshold', type=float, default=0.1, help='slowdown of a median flagged as a regression')
+    args = argparser.parse_args()
+    for name in args.workloads:
+        if name not in workloads:
+            argparser.error(f'unknown workload {name}')
+
+    if args.compare:
+        with open(args.compare[0]) as old_file, open(args.compare[1]) as new_file:
+            regressed = compare(json.load(old_file), json.load(new_file), args.threshold)
+        sys.exit(1 if regressed else 0)
+
+    print(f'{"workload":<11}' + ''.join([f'{phase:>10}' for phase in phases]), file=sys.stderr)
+    results = {
+        'revision': revision(),
+        'python': platform.python_version(),
+        'scale': args.scale,
+        'backend': args.backend,
+        'optimize': not args.no_optimize,
+        'warmup': args.warmup,
+        'repeat': args.repeat,
+        'results': benchmark(args.workloads or list(workloads), args.scale, args.backend, not args.no_optimize,
+                             args.warmup, args.repeat),
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
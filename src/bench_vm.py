@@ -0,0 +1,42 @@
+import io
+import sys
+import glob
+import time
+import contextlib
+import Mparser
+from TypeChecker import TypeChecker
+from Interpreter import Interpreter
+from Bytecode import BytecodeCompiler
+from VirtualMachine import VirtualMachine
+
+# Execution time of the tree-walking Interpreter against the bytecode VM.
+# usage: python bench_vm.py [program.m ...]   (defaults to lab5/*.m)
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+    filenames = sys.argv[1:] or sorted(glob.glob('lab5/*.m'))
+    repeat = 3
+
+    print(f'{"program":<22}{"instructions":>13}{"compile":>10}{"interpreter":>13}{"vm":>10}{"speedup":>9}')
+    for filename in filenames:
+        with open(filename) as file:
+            ast = Mparser.parser.parse(file.read(), lexer=Mparser.scanner.clone(), tracking=True)
+        TypeChecker().visit(ast)
+
+        compile_time = best_of(lambda: BytecodeCompiler().compile_program(ast), repeat)
+        program = BytecodeCompiler().compile_program(ast)
+        interpreter = best_of(lambda: Interpreter().visit(ast), repeat)
+        vm = best_of(lambda: VirtualMachine(program).run(), repeat)
+
+        print(f'{filename:<22}{len(program.code) // 4:>13}{compile_time * 1e3:>8.2f}ms'
+              f'{interpreter * 1e3:>11.1f}ms{vm * 1e3:>8.1f}ms{interpreter / vm:>8.1f}x')
@@ -0,0 +1,27 @@
+x = 2 * 3 + 4 * (5 - 1);
+y = 7.0 / 2 - 0.5;
+s = "con" + "stant";
+print x, y, s;
+
+if (1 < 2) {
+    print "taken";
+} else {
+    print "dropped";
+}
+
+if (2 > 3) print "never";
+
+while (0 > 1) {
+    print "never";
+}
+
+n = 10 - 3 * 2;
+for i = 0:n - 1 + 1 {
+    x += i * (2 - 1);
+}
+print x;
+
+v = [1, 2, 3] .* [2, 2, 2];
+print v, v[1 + 1];
+
+print -0.0, 0.0;
@@ -0,0 +1,46 @@
+n = 3;
+s = 0;
+for i = 0:4 {
+    s += n * n + 1;
+}
+print s;
+
+A = zeros(2, 2);
+B = ones(2, 2);
+C = A;
+for i = 1:4 {
+    C[0, 0] = i;
+    x = (A .* B) .+ B;
+    print x[0, 0];
+}
+
+A = [[0.0, 1.0], [2.0, 3.0]];
+V = A[0:2, 0:2];
+for i = 0:3 {
+    V[0, 0] = i;
+    y = (A .+ A) .* A;
+    print y[0, 0];
+}
+
+D = ones(2, 2);
+E = D;
+k = 0;
+while (k < 3) {
+    E += D;
+    z = D .+ D;
+    print z[1, 1];
+    k += 1;
+}
+
+p = 2;
+q = 3;
+F = zeros(p);
+G = zeros(q);
+k = 0;
+r = 0 - 1;
+while (k < 0) {
+    H = F .+ G;
+    I = zeros(r);
+    k += 1;
+}
+print k;
@@ -0,0 +1,62 @@
+A = [1, 2, 3];
+B = [10, 20, 30];
+C = zeros(3);
+for i = 0:3 C[i] = A[i] + B[i] * 2;
+print C;
+
+R = zeros(3, 3);
+for i = 0:3 R[i] = A[i];
+print R;
+
+S = zeros(3, 2);
+for i = 0:3 S[i] = A[i] + 1;
+print S;
+
+M = [[1, 2], [3, 4], [5, 6]];
+T = zeros(3, 2);
+for i = 0:3 T[i] = M[i] .* M[i];
+print T;
+
+row = [100, 200];
+for i = 0:3 T[i] = M[i] .+ row;
+print T;
+
+N = zeros(3, 2);
+for i = 0:3 {
+    for j = 0:2 {
+        N[i, j] = M[i, j] * 10 + A[i];
+    }
+}
+print N;
+
+K = zeros(3, 2);
+for i = 0:3 {
+    for j = 0:2 {
+        K[i, j] = M[i, j] * 10 - M[i, j];
+    }
+}
+print K;
+
+P = zeros(2, 3);
+for j = 0:3 {
+    for i = 0:2 P[i, j] = M[j, i];
+}
+print P;
+
+Q = zeros(3, 2);
+for j = 0:2 Q[0:3, j] = M[0:3, j] .* M[0:3, j];
+print Q;
+
+D = [1.0, 2.0, 3.0];
+for i = 0:3 D[i] += A[i];
+print D;
+
+E = zeros(5);
+V = E[1:5];
+E[0] = 1;
+for i = 0:4 V[i] = E[i] + 1;
+print E;
+
+n = 0 - 1;
+for i = 0:n E[i] = 5;
+print E;
@@ -0,0 +1,23 @@
+A = [1, 2, 3];
+B = [4, 5, 6];
+F = [0.5, 1.5, 2.5];
+print A .+ B .* B, (A .- B) ./ F, A .* B .+ F .* F;
+
+M = [[1, 2], [3, 4]];
+print (M .+ M) .* (M .- M') .+ M;
+
+X = ones(200, 100);
+Y = zeros(200, 100);
+Y[10:20, 5:50] = 3;
+Z = (X .+ Y) .* (Y .- X) ./ (X .+ X);
+print Z[0, 0], Z[15, 10], Z[199, 99];
+
+W = X;
+for i = 0:3 {
+    W = W .* Y .+ X .- Y;
+}
+print W[15, 10], W[0, 0];
+
+I = [[1, 2], [3, 4]];
+J = [[5, 6], [7, 8]];
+print I .* J .+ I ./ J;
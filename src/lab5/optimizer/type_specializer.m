@@ -0,0 +1,23 @@
+a = 7;
+b = 2;
+f = 2.5;
+print a + b, a - b, a * b, a / b;
+print a + f, f * b, a / f, f - a;
+print a < b, a >= b, f == 2.5;
+
+s = 0;
+t = 0.0;
+for i = 1:10 {
+    s = s + i * i;
+    t = t + i / 4;
+}
+print s, t;
+
+A = [1, 2, 3];
+B = [4, 5, 6];
+F = [0.5, 1.5, 2.5];
+print A .+ B, A .- B, A .* B, A ./ B;
+print A .+ F, F .* B;
+
+M = [[1, 2], [3, 4]];
+print M .* M, M' .- M;
@@ -0,0 +1,10 @@
+# lextab.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('ADDASSIGN', 'BREAK', 'CONTINUE', 'DIVASSIGN', 'DOTADD', 'DOTDIV', 'DOTMULT', 'DOTSUB', 'ELSE', 'EQ', 'FLOATNUM', 'FOR', 'GE', 'ID', 'IF', 'INTNUM', 'LE', 'MULASSIGN', 'NOTEQ', 'PRINT', 'RETURN', 'STRING', 'SUBASSIGN', 'WHILE'))
+_lexreflags   = 64
+_lexliterals  = "+-*/=()[]{}';,><:"
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_ID>[a-zA-Z_]\\w*)|(?P<t_FLOATNUM>(([1-9][0-9]*|0)\\.[0-9]*|\\.[0-9]+)(E[0-9]+)?)|(?P<t_INTNUM>(0|[1-9][0-9]*)(E[0-9]+)?)|(?P<t_STRING>"[^"]*")|(?P<t_newline>\\n+)|(?P<t_COMMENT>\\#.*)|(?P<t_DOTMULT>\\.\\*)|(?P<t_DOTADD>\\.\\+)|(?P<t_DOTDIV>\\./)|(?P<t_DOTSUB>\\.-)|(?P<t_ADDASSIGN>\\+=)|(?P<t_MULASSIGN>\\*=)|(?P<t_LE><=)|(?P<t_GE>>=)|(?P<t_EQ>==)|(?P<t_NOTEQ>!=)|(?P<t_SUBASSIGN>-=)|(?P<t_DIVASSIGN>/=)', [None, ('t_ID', 'ID'), ('t_FLOATNUM', 'FLOATNUM'), None, None, None, ('t_INTNUM', 'INTNUM'), None, None, ('t_STRING', 'STRING'), ('t_newline', 'newline'), ('t_COMMENT', 'COMMENT'), (None, 'DOTMULT'), (None, 'DOTADD'), (None, 'DOTDIV'), (None, 'DOTSUB'), (None, 'ADDASSIGN'), (None, 'MULASSIGN'), (None, 'LE'), (None, 'GE'), (None, 'EQ'), (None, 'NOTEQ'), (None, 'SUBASSIGN'), (None, 'DIVASSIGN')])]}
+_lexstateignore = {'INITIAL': ' \t'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
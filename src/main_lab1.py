@@ -12,14 +12,6 @@ if __name__ == '__main__':
         print("Cannot open {0} file".format(filename))
         sys.exit(0)
 
-    text = file.read()
-    lexer = scanner.lexer
-    lexer.input(text) # Give the lexer some input
-
-    # Tokenize
-    while True:
-        tok = lexer.token()
-        if not tok:
-            break    # No more input
-        column = scanner.find_column(text, tok)
-        print("(%d,%d): %s(%s)" % (tok.lineno, column, tok.type, tok.value))
+    # Tokenize, the file is read in chunks
+    for type, value, lineno, column in scanner.tokenize(file):
+        print("(%d,%d): %s(%s)" % (lineno, column, type, value))
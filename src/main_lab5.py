@@ -1,26 +1,23 @@
 import sys
-import ply.yacc as yacc
-import Mparser
-from TreePrinter import TreePrinter
-from TypeChecker import TypeChecker
-from Interpreter import Interpreter
+import argparse
+from ProgramCache import ProgramCache
 
 
-if __name__ == '__main__':
+# backends are imported when selected, a run loads only the one it uses
+backends = ['interpreter', 'closure', 'python', 'vm']
 
-    try:
-        filename = sys.argv[1] if len(sys.argv) > 1 else "lab5/triangle.m"
-        file = open(filename, "r")
-    except IOError:
-        print("Cannot open {0} file".format(filename))
-        sys.exit(0)
 
-    parser = Mparser.parser
-    text = file.read()
+def front_end(text, optimize, arena=False):  # checked and optimized tree of the program <text>, None if it has errors
+    import Mparser
+    from TypeChecker import TypeChecker
 
+    parser = Mparser.parser
     ast = parser.parse(text, lexer=Mparser.scanner, tracking=True)
     if not parser.errorok:
         sys.exit()
+    if arena:
+        from Arena import Arena
+        ast = Arena(ast).root  # the passes and the backend walk views of the arena
 
     #ast.printTree()
 
@@ -28,10 +25,92 @@ if __name__ == '__main__':
     typeChecker = TypeChecker()
     typeChecker.visit(ast)   # or alternatively ast.accept(typeChecker)
 
-    if typeChecker.error_count == 0:
-        ast.accept(Interpreter())
+    if typeChecker.error_count != 0:
+        return None
+    if optimize:
+        ast = optimized(ast)
+    return ast
+
+
+def optimized(ast):  # checked tree <ast> after the optimization passes
+    from Optimizer import ConstantFolder, LoopVectorizer, LoopInvariantMotion, TypeSpecializer, TensorFuser
+    for optimization in [ConstantFolder, LoopVectorizer, LoopInvariantMotion, TypeSpecializer, TensorFuser]:
+        ast = ast.accept(optimization())
+    return ast
+
+
+if __name__ == '__main__':
+
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument('filename', nargs='?', default="lab5/triangle.m")
+    argparser.add_argument('--backend', choices=backends, default='interpreter')
+    argparser.add_argument('--disassemble', action='store_true', help='print the bytecode of the vm backend')
+    argparser.add_argument('--no-optimize', action='store_true', help='run the program without optimization passes')
+    argparser.add_argument('--print-tree', action='store_true', help='print the tree the backend runs, after optimization')
+    argparser.add_argument('--no-cache', action='store_true', help='neither use nor update the __mcache__ entry of the program')
+    argparser.add_argument('--arena', action='store_true', help='keep the tree in a flat Arena, implies --no-cache')
+    argparser.add_argument('--profile', action='store_true', help='time the interpreter per line and node class, report on stderr')
+    argparser.add_argument('--profile-output', help='file the collapsed stacks of --profile are written to, for flame graphs')
+    argparser.add_argument('--profile-memory', action='store_true', help='account tensor allocations per line and the peak, report on stderr')
+    argparser.add_argument('--pool-stats', action='store_true', help='report the reuse of tensors by the interpreter on stderr')
+    args = argparser.parse_args()
+    if (args.profile or args.profile_output or args.profile_memory or args.pool_stats) and args.backend != 'interpreter':
+        argparser.error('--profile, --profile-memory and --pool-stats need the interpreter backend')
+    if (args.profile or args.profile_output) and args.profile_memory:
+        argparser.error('--profile and --profile-memory can\'t be combined, timing would include the accounting')
+
+    try:
+        filename = args.filename
+        file = open(filename, "r")
+    except IOError:
+        print("Cannot open {0} file".format(filename))
+        sys.exit(0)
+
+    text = file.read()
+
+    cache = ProgramCache(filename, optimize=not args.no_optimize)
+    use_cache = not (args.no_cache or args.arena)
+    ast = cache.load(text) if use_cache else None  # a hit skips parsing, checking and optimization
+    if ast is None:
+        ast = front_end(text, optimize=not args.no_optimize, arena=args.arena)
+        if ast is not None and use_cache:
+            cache.store(text, ast)
+
+    if ast is not None:
+        if args.print_tree:
+            from TreePrinter import TreePrinter
+            ast.printTree()
+
+        if args.backend == 'python':
+            from CodeGenerator import CodeGenerator
+            backend = CodeGenerator(CodeGenerator.module_path(filename))  # generated module stays on disk
+        elif args.backend == 'vm':
+            from Bytecode import BytecodeCompiler, disassemble
+            from VirtualMachine import VirtualMachine
+            program = BytecodeCompiler().compile_program(ast)
+            if args.disassemble:
+                disassemble(program)
+            backend = VirtualMachine(program)
+        elif args.backend == 'closure':
+            from ClosureCompiler import ClosureCompiler
+            backend = ClosureCompiler()
+        elif args.profile or args.profile_output:
+            from Profiler import Profiler  # instrumented only on request, Interpreter itself stays as it is
+            backend = Profiler()
+        elif args.profile_memory:
+            from Profiler import TensorProfiler
+            backend = TensorProfiler()
+        else:
+            from Interpreter import Interpreter
+            backend = Interpreter()
 
-    # in future
-    # ast.accept(OptimizationPass1())
-    # ast.accept(OptimizationPass2())
-    # ast.accept(CodeGenerator())
\ No newline at end of file
+        try:
+            ast.accept(backend)
+        finally:  # return ends the program with sys.exit
+            if args.profile or args.profile_memory:
+                backend.report(text)
+            if args.pool_stats:
+                backend.pool.report()
+            if args.profile_output:
+                with open(args.profile_output, 'w') as stacks:
+                    backend.collapsed_stacks(stacks)
@@ -0,0 +1,97 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'nonassocIFXnonassocELSEnonassoc<>LEGEEQNOTEQleft+-DOTADDDOTSUBleft*/DOTDIVDOTMULTrightUMINUSleft\'ADDASSIGN BREAK CONTINUE DIVASSIGN DOTADD DOTDIV DOTMULT DOTSUB ELSE EQ FLOATNUM FOR GE ID IF INTNUM LE MULASSIGN NOTEQ PRINT RETURN STRING SUBASSIGN WHILEprogram : instructions_optinstructions_opt : instructions\n                        | emptyempty :instructions : instructions instruction\n                    | instructioninstruction : loop\n                   | ifelse\n                   | controlflow \';\'\n                   | assignment \';\'\n                   | codeblock\n                   | print \';\'instruction : functioncall \';\'print : PRINT tupletuple : tuple \',\' expr\n             | exprcodeblock : \'{\' instructions_opt \'}\'controlflow : BREAK\n                   | CONTINUE\n                   | RETURN expr\n                   | RETURNloop : forloop\n            | whileloopforloop : FOR ID \'=\' range instructionrange : expr \':\' exprwhileloop : WHILE \'(\' expr \')\' instructionifelse : IF \'(\' expr \')\' instruction %prec IFX\n              | IF \'(\' expr \')\' instruction ELSE instructionexpr : expr \'+\' expr\n            | expr \'-\' expr\n            | expr \'*\' expr\n            | expr \'/\' expr\n            | expr \'>\' expr\n            | expr \'<\' expr\n            | expr EQ expr\n            | expr LE expr\n            | expr GE expr\n            | expr NOTEQ expr\n            | expr DOTDIV expr\n            | expr DOTADD expr\n            | expr DOTMULT expr\n            | expr DOTSUB exprexpr : \'-\' expr %prec UMINUSexpr : \'(\' expr \')\'\n            | functioncall\n            | constant\n            | idexpr : expr "\'" functioncall : ID \'(\' tuple \')\'constant : INTNUM\n             | FLOATNUM\n             | tensorconstant : STRINGtensor : \'[\' tensorelem \']\'tensorelem : constant\n                  | tensorelem \',\' constantassignment : id \'=\' expr\n                  | id ADDASSIGN expr\n                  | id SUBASSIGN expr\n                  | id MULASSIGN expr\n                  | id DIVASSIGN exprid    : ID\n             | ID \'[\' index \']\'index : range\n             | expr\n             | index \',\' expr\n             | index \',\' range'
+    
+_lr_action_items = {'$end':([0,1,2,3,4,5,6,7,10,13,14,25,26,27,28,29,79,113,118,119,121,],[-4,0,-1,-2,-3,-6,-7,-8,-11,-22,-23,-5,-9,-10,-12,-13,-17,-27,-24,-26,-28,]),'IF':([0,3,5,6,7,10,13,14,20,22,25,26,27,28,29,34,35,36,37,38,39,40,69,70,79,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,106,107,110,112,113,117,118,119,120,121,],[15,15,-6,-7,-8,-11,-22,-23,15,-62,-5,-9,-10,-12,-13,-45,-46,-47,-50,-51,-52,-53,-48,-43,-17,15,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-41,-42,-44,-54,-49,-63,15,15,-27,-25,-24,-26,15,-28,]),'BREAK':([0,3,5,6,7,10,13,14,20,22,25,26,27,28,29,34,35,36,37,38,39,40,69,70,79,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,106,107,110,112,113,117,118,119,120,121,],[16,16,-6,-7,-8,-11,-22,-23,16,-62,-5,-9,-10,-12,-13,-45,-46,-47,-50,-51,-52,-53,-48,-43,-17,16,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-41,-42,-44,-54,-49,-63,16,16,-27,-25,-24,-26,16,-28,]),'CONTINUE':([0,3,5,6,7,10,13,14,20,22,25,26,27,28,29,34,35,36,37,38,39,40,69,70,79,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,106,107,110,112,113,117,118,119,120,121,],[17,17,-6,-7,-8,-11,-22,-23,17,-62,-5,-9,-10,-12,-13,-45,-46,-47,-50,-51,-52,-53,-48,-43,-17,17,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-41,-42,-44,-54,-49,-63,17,17,-27,-25,-24,-26,17,-28,]),'RETURN':([0,3,5,6,7,10,13,14,20,22,25,26,27,28,29,34,35,36,37,38,39,40,69,70,79,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,106,107,110,112,113,117,118,119,120,121,],[18,18,-6,-7,-8,-11,-22,-23,18,-62,-5,-9,-10,-12,-13,-45,-46,-47,-50,-51,-52,-53,-48,-43,-17,18,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-41,-42,-44,-54,-49,-63,18,18,-27,-25,-24,-26,18,-28,]),'{':([0,3,5,6,7,10,13,14,20,22,25,26,27,28,29,34,35,36,37,38,39,40,69,70,79,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,106,107,110,112,113,117,118,119,120,121,],[20,20,-6,-7,-8,-11,-22,-23,20,-62,-5,-9,-10,-12,-13,-45,-46,-47,-50,-51,-52,-53,-48,-43,-17,20,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-41,-42,-44,-54,-49,-63,20,20,-27,-25,-24,-26,20,-28,]),'PRINT':([0,3,5,6,7,10,13,14,20,22,25,26,27,28,29,34,35,36,37,38,39,40,69,70,79,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,106,107,110,112,113,117,118,119,120,121,],[21,21,-6,-7,-8,-11,-22,-23,21,-62,-5,-9,-10,-12,-13,-45,-46,-47,-50,-51,-52,-53,-48,-43,-17,21,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-41,-42,-44,-54,-49,-63,21,21,-27,-25,-24,-26,21,-28,]),'ID':([0,3,5,6,7,10,13,14,18,20,21,22,23,25,26,27,28,29,30,32,33,34,35,36,37,38,39,40,42,43,44,45,46,50,51,53,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,79,80,85,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,106,107,108,109,110,112,113,117,118,119,120,121,],[22,22,-6,-7,-8,-11,-22,-23,22,22,22,-62,52,-5,-9,-10,-12,-13,22,22,22,-45,-46,-47,-50,-51,-52,-53,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,-48,-43,-17,22,22,22,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-41,-42,-44,-54,-49,-63,22,22,22,22,-27,-25,-24,-26,22,-28,]),'FOR':([0,3,5,6,7,10,13,14,20,22,25,26,27,28,29,34,35,36,37,38,39,40,69,70,79,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,106,107,110,112,113,117,118,119,120,121,],[23,23,-6,-7,-8,-11,-22,-23,23,-62,-5,-9,-10,-12,-13,-45,-46,-47,-50,-51,-52,-53,-48,-43,-17,23,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-41,-42,-44,-54,-49,-63,23,23,-27,-25,-24,-26,23,-28,]),'WHILE':([0,3,5,6,7,10,13,14,20,22,25,26,27,28,29,34,35,36,37,38,39,40,69,70,79,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,106,107,110,112,113,117,118,119,120,121,],[24,24,-6,-7,-8,-11,-22,-23,24,-62,-5,-9,-10,-12,-13,-45,-46,-47,-50,-51,-52,-53,-48,-43,-17,24,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-41,-42,-44,-54,-49,-63,24,24,-27,-25,-24,-26,24,-28,]),'}':([3,4,5,6,7,10,13,14,20,25,26,27,28,29,47,79,113,118,119,121,],[-2,-3,-6,-7,-8,-11,-22,-23,-4,-5,-9,-10,-12,-13,79,-17,-27,-24,-26,-28,]),'ELSE':([6,7,10,13,14,26,27,28,29,79,113,118,119,121,],[-7,-8,-11,-22,-23,-9,-10,-12,-13,-17,120,-24,-26,-28,]),';':([8,9,11,12,16,17,18,22,31,34,35,36,37,38,39,40,48,49,69,70,74,75,76,77,78,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,],[26,27,28,29,-18,-19,-21,-62,-20,-45,-46,-47,-50,-51,-52,-53,-14,-16,-48,-43,-57,-58,-59,-60,-61,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-41,-42,-44,-54,-15,-49,-63,]),'(':([15,18,21,22,24,30,32,33,42,43,44,45,46,50,51,53,55,56,57,58,59,60,61,62,63,64,65,66,67,68,80,85,108,109,],[30,33,33,50,53,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,]),'-':([18,21,22,30,31,32,33,34,35,36,37,38,39,40,42,43,44,45,46,49,50,51,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,74,75,76,77,78,80,84,85,86,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,108,109,111,115,117,],[32,32,-62,32,56,32,32,-45,-46,-47,-50,-51,-52,-53,32,32,32,32,32,56,32,32,32,56,32,32,32,32,32,32,32,32,32,32,32,32,32,32,-48,-43,56,56,56,56,56,56,32,56,32,56,-29,-30,-31,-32,56,56,56,56,56,56,-39,-40,-41,-42,-44,-54,56,-49,-63,32,32,56,56,56,]),'INTNUM':([18,21,30,32,33,41,42,43,44,45,46,50,51,53,55,56,57,58,59,60,61,62,63,64,65,66,67,68,80,85,104,108,109,],[37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,]),'FLOATNUM':([18,21,30,32,33,41,42,43,44,45,46,50,51,53,55,56,57,58,59,60,61,62,63,64,65,66,67,68,80,85,104,108,109,],[38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,]),'STRING':([18,21,30,32,33,41,42,43,44,45,46,50,51,53,55,56,57,58,59,60,61,62,63,64,65,66,67,68,80,85,104,108,109,],[40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,]),'[':([18,21,22,30,32,33,41,42,43,44,45,46,50,51,53,55,56,57,58,59,60,61,62,63,64,65,66,67,68,80,85,104,108,109,],[41,41,51,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,]),'=':([19,22,52,107,],[42,-62,85,-63,]),'ADDASSIGN':([19,22,107,],[43,-62,-63,]),'SUBASSIGN':([19,22,107,],[44,-62,-63,]),'MULASSIGN':([19,22,107,],[45,-62,-63,]),'DIVASSIGN':([19,22,107,],[46,-62,-63,]),'+':([22,31,34,35,36,37,38,39,40,49,54,69,70,71,74,75,76,77,78,84,86,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,111,115,117,],[-62,55,-45,-46,-47,-50,-51,-52,-53,55,55,-48,-43,55,55,55,55,55,55,55,55,-29,-30,-31,-32,55,55,55,55,55,55,-39,-40,-41,-42,-44,-54,55,-49,-63,55,55,55,]),'*':([22,31,34,35,36,37,38,39,40,49,54,69,70,71,74,75,76,77,78,84,86,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,111,115,117,],[-62,57,-45,-46,-47,-50,-51,-52,-53,57,57,-48,-43,57,57,57,57,57,57,57,57,57,57,-31,-32,57,57,57,57,57,57,-39,57,-41,57,-44,-54,57,-49,-63,57,57,57,]),'/':([22,31,34,35,36,37,38,39,40,49,54,69,70,71,74,75,76,77,78,84,86,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,111,115,117,],[-62,58,-45,-46,-47,-50,-51,-52,-53,58,58,-48,-43,58,58,58,58,58,58,58,58,58,58,-31,-32,58,58,58,58,58,58,-39,58,-41,58,-44,-54,58,-49,-63,58,58,58,]),'>':([22,31,34,35,36,37,38,39,40,49,54,69,70,71,74,75,76,77,78,84,86,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,111,115,117,],[-62,59,-45,-46,-47,-50,-51,-52,-53,59,59,-48,-43,59,59,59,59,59,59,59,59,-29,-30,-31,-32,None,None,None,None,None,None,-39,-40,-41,-42,-44,-54,59,-49,-63,59,59,59,]),'<':([22,31,34,35,36,37,38,39,40,49,54,69,70,71,74,75,76,77,78,84,86,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,111,115,117,],[-62,60,-45,-46,-47,-50,-51,-52,-53,60,60,-48,-43,60,60,60,60,60,60,60,60,-29,-30,-31,-32,None,None,None,None,None,None,-39,-40,-41,-42,-44,-54,60,-49,-63,60,60,60,]),'EQ':([22,31,34,35,36,37,38,39,40,49,54,69,70,71,74,75,76,77,78,84,86,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,111,115,117,],[-62,61,-45,-46,-47,-50,-51,-52,-53,61,61,-48,-43,61,61,61,61,61,61,61,61,-29,-30,-31,-32,None,None,None,None,None,None,-39,-40,-41,-42,-44,-54,61,-49,-63,61,61,61,]),'LE':([22,31,34,35,36,37,38,39,40,49,54,69,70,71,74,75,76,77,78,84,86,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,111,115,117,],[-62,62,-45,-46,-47,-50,-51,-52,-53,62,62,-48,-43,62,62,62,62,62,62,62,62,-29,-30,-31,-32,None,None,None,None,None,None,-39,-40,-41,-42,-44,-54,62,-49,-63,62,62,62,]),'GE':([22,31,34,35,36,37,38,39,40,49,54,69,70,71,74,75,76,77,78,84,86,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,111,115,117,],[-62,63,-45,-46,-47,-50,-51,-52,-53,63,63,-48,-43,63,63,63,63,63,63,63,63,-29,-30,-31,-32,None,None,None,None,None,None,-39,-40,-41,-42,-44,-54,63,-49,-63,63,63,63,]),'NOTEQ':([22,31,34,35,36,37,38,39,40,49,54,69,70,71,74,75,76,77,78,84,86,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,111,115,117,],[-62,64,-45,-46,-47,-50,-51,-52,-53,64,64,-48,-43,64,64,64,64,64,64,64,64,-29,-30,-31,-32,None,None,None,None,None,None,-39,-40,-41,-42,-44,-54,64,-49,-63,64,64,64,]),'DOTDIV':([22,31,34,35,36,37,38,39,40,49,54,69,70,71,74,75,76,77,78,84,86,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,111,115,117,],[-62,65,-45,-46,-47,-50,-51,-52,-53,65,65,-48,-43,65,65,65,65,65,65,65,65,65,65,-31,-32,65,65,65,65,65,65,-39,65,-41,65,-44,-54,65,-49,-63,65,65,65,]),'DOTADD':([22,31,34,35,36,37,38,39,40,49,54,69,70,71,74,75,76,77,78,84,86,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,111,115,117,],[-62,66,-45,-46,-47,-50,-51,-52,-53,66,66,-48,-43,66,66,66,66,66,66,66,66,-29,-30,-31,-32,66,66,66,66,66,66,-39,-40,-41,-42,-44,-54,66,-49,-63,66,66,66,]),'DOTMULT':([22,31,34,35,36,37,38,39,40,49,54,69,70,71,74,75,76,77,78,84,86,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,111,115,117,],[-62,67,-45,-46,-47,-50,-51,-52,-53,67,67,-48,-43,67,67,67,67,67,67,67,67,67,67,-31,-32,67,67,67,67,67,67,-39,67,-41,67,-44,-54,67,-49,-63,67,67,67,]),'DOTSUB':([22,31,34,35,36,37,38,39,40,49,54,69,70,71,74,75,76,77,78,84,86,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,111,115,117,],[-62,68,-45,-46,-47,-50,-51,-52,-53,68,68,-48,-43,68,68,68,68,68,68,68,68,-29,-30,-31,-32,68,68,68,68,68,68,-39,-40,-41,-42,-44,-54,68,-49,-63,68,68,68,]),"'":([22,31,34,35,36,37,38,39,40,49,54,69,70,71,74,75,76,77,78,84,86,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,111,115,117,],[-62,69,-45,-46,-47,-50,-51,-52,-53,69,69,-48,69,69,69,69,69,69,69,69,69,69,69,69,69,69,69,69,69,69,69,69,69,69,69,-44,-54,69,-49,-63,69,69,69,]),',':([22,34,35,36,37,38,39,40,48,49,69,70,72,73,81,82,83,84,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,114,115,116,117,],[-62,-45,-46,-47,-50,-51,-52,-53,80,-16,-48,-43,104,-55,80,108,-64,-65,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-41,-42,-44,-54,-15,-49,-63,-56,-66,-67,-25,]),')':([22,34,35,36,37,38,39,40,49,54,69,70,71,81,86,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,],[-62,-45,-46,-47,-50,-51,-52,-53,-16,87,-48,-43,102,106,112,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-41,-42,-44,-54,-15,-49,-63,]),':':([22,34,35,36,37,38,39,40,69,70,84,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,106,107,111,115,],[-62,-45,-46,-47,-50,-51,-52,-53,-48,-43,109,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-41,-42,-44,-54,-49,-63,109,109,]),']':([22,34,35,36,37,38,39,40,69,70,72,73,82,83,84,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,106,107,114,115,116,117,],[-62,-45,-46,-47,-50,-51,-52,-53,-48,-43,103,-55,107,-64,-65,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-39,-40,-41,-42,-44,-54,-49,-63,-56,-66,-67,-25,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'program':([0,],[1,]),'instructions_opt':([0,20,],[2,47,]),'instructions':([0,20,],[3,3,]),'empty':([0,20,],[4,4,]),'instruction':([0,3,20,87,110,112,120,],[5,25,5,113,118,119,121,]),'loop':([0,3,20,87,110,112,120,],[6,6,6,6,6,6,6,]),'ifelse':([0,3,20,87,110,112,120,],[7,7,7,7,7,7,7,]),'controlflow':([0,3,20,87,110,112,120,],[8,8,8,8,8,8,8,]),'assignment':([0,3,20,87,110,112,120,],[9,9,9,9,9,9,9,]),'codeblock':([0,3,20,87,110,112,120,],[10,10,10,10,10,10,10,]),'print':([0,3,20,87,110,112,120,],[11,11,11,11,11,11,11,]),'functioncall':([0,3,18,20,21,30,32,33,42,43,44,45,46,50,51,53,55,56,57,58,59,60,61,62,63,64,65,66,67,68,80,85,87,108,109,110,112,120,],[12,12,34,12,34,34,34,34,34,34,34,34,34,34,34,34,34,34,34,34,34,34,34,34,34,34,34,34,34,34,34,34,12,34,34,12,12,12,]),'forloop':([0,3,20,87,110,112,120,],[13,13,13,13,13,13,13,]),'whileloop':([0,3,20,87,110,112,120,],[14,14,14,14,14,14,14,]),'id':([0,3,18,20,21,30,32,33,42,43,44,45,46,50,51,53,55,56,57,58,59,60,61,62,63,64,65,66,67,68,80,85,87,108,109,110,112,120,],[19,19,36,19,36,36,36,36,36,36,36,36,36,36,36,36,36,36,36,36,36,36,36,36,36,36,36,36,36,36,36,36,19,36,36,19,19,19,]),'expr':([18,21,30,32,33,42,43,44,45,46,50,51,53,55,56,57,58,59,60,61,62,63,64,65,66,67,68,80,85,108,109,],[31,49,54,70,71,74,75,76,77,78,49,84,86,88,89,90,91,92,93,94,95,96,97,98,99,100,101,105,111,115,117,]),'constant':([18,21,30,32,33,41,42,43,44,45,46,50,51,53,55,56,57,58,59,60,61,62,63,64,65,66,67,68,80,85,104,108,109,],[35,35,35,35,35,73,35,35,35,35,35,35,35,35,35,35,35,35,35,35,35,35,35,35,35,35,35,35,35,35,114,35,35,]),'tensor':([18,21,30,32,33,41,42,43,44,45,46,50,51,53,55,56,57,58,59,60,61,62,63,64,65,66,67,68,80,85,104,108,109,],[39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,]),'tuple':([21,50,],[48,81,]),'tensorelem':([41,],[72,]),'index':([51,],[82,]),'range':([51,85,108,],[83,110,116,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> program","S'",1,None,None,None),
+  ('program -> instructions_opt','program',1,'p_program','Mparser.py',26),
+  ('instructions_opt -> instructions','instructions_opt',1,'p_instructions_opt','Mparser.py',30),
+  ('instructions_opt -> empty','instructions_opt',1,'p_instructions_opt','Mparser.py',31),
+  ('empty -> <empty>','empty',0,'p_empty','Mparser.py',35),
+  ('instructions -> instructions instruction','instructions',2,'p_instructions','Mparser.py',40),
+  ('instructions -> instruction','instructions',1,'p_instructions','Mparser.py',41),
+  ('instruction -> loop','instruction',1,'p_instruction','Mparser.py',50),
+  ('instruction -> ifelse','instruction',1,'p_instruction','Mparser.py',51),
+  ('instruction -> controlflow ;','instruction',2,'p_instruction','Mparser.py',52),
+  ('instruction -> assignment ;','instruction',2,'p_instruction','Mparser.py',53),
+  ('instruction -> codeblock','instruction',1,'p_instruction','Mparser.py',54),
+  ('instruction -> print ;','instruction',2,'p_instruction','Mparser.py',55),
+  ('instruction -> functioncall ;','instruction',2,'p_call','Mparser.py',60),
+  ('print -> PRINT tuple','print',2,'p_print','Mparser.py',66),
+  ('tuple -> tuple , expr','tuple',3,'p_tuple','Mparser.py',72),
+  ('tuple -> expr','tuple',1,'p_tuple','Mparser.py',73),
+  ('codeblock -> { instructions_opt }','codeblock',3,'p_codeblock','Mparser.py',82),
+  ('controlflow -> BREAK','controlflow',1,'p_controlflow','Mparser.py',88),
+  ('controlflow -> CONTINUE','controlflow',1,'p_controlflow','Mparser.py',89),
+  ('controlflow -> RETURN expr','controlflow',2,'p_controlflow','Mparser.py',90),
+  ('controlflow -> RETURN','controlflow',1,'p_controlflow','Mparser.py',91),
+  ('loop -> forloop','loop',1,'p_loop','Mparser.py',100),
+  ('loop -> whileloop','loop',1,'p_loop','Mparser.py',101),
+  ('forloop -> FOR ID = range instruction','forloop',5,'p_forloop','Mparser.py',106),
+  ('range -> expr : expr','range',3,'p_range','Mparser.py',112),
+  ('whileloop -> WHILE ( expr ) instruction','whileloop',5,'p_whileloop','Mparser.py',118),
+  ('ifelse -> IF ( expr ) instruction','ifelse',5,'p_ifelse','Mparser.py',124),
+  ('ifelse -> IF ( expr ) instruction ELSE instruction','ifelse',7,'p_ifelse','Mparser.py',125),
+  ('expr -> expr + expr','expr',3,'p_bin_expr','Mparser.py',133),
+  ('expr -> expr - expr','expr',3,'p_bin_expr','Mparser.py',134),
+  ('expr -> expr * expr','expr',3,'p_bin_expr','Mparser.py',135),
+  ('expr -> expr / expr','expr',3,'p_bin_expr','Mparser.py',136),
+  ('expr -> expr > expr','expr',3,'p_bin_expr','Mparser.py',137),
+  ('expr -> expr < expr','expr',3,'p_bin_expr','Mparser.py',138),
+  ('expr -> expr EQ expr','expr',3,'p_bin_expr','Mparser.py',139),
+  ('expr -> expr LE expr','expr',3,'p_bin_expr','Mparser.py',140),
+  ('expr -> expr GE expr','expr',3,'p_bin_expr','Mparser.py',141),
+  ('expr -> expr NOTEQ expr','expr',3,'p_bin_expr','Mparser.py',142),
+  ('expr -> expr DOTDIV expr','expr',3,'p_bin_expr','Mparser.py',143),
+  ('expr -> expr DOTADD expr','expr',3,'p_bin_expr','Mparser.py',144),
+  ('expr -> expr DOTMULT expr','expr',3,'p_bin_expr','Mparser.py',145),
+  ('expr -> expr DOTSUB expr','expr',3,'p_bin_expr','Mparser.py',146),
+  ('expr -> - expr','expr',2,'p_negation_expr','Mparser.py',153),
+  ('expr -> ( expr )','expr',3,'p_one_expr','Mparser.py',159),
+  ('expr -> functioncall','expr',1,'p_one_expr','Mparser.py',160),
+  ('expr -> constant','expr',1,'p_one_expr','Mparser.py',161),
+  ('expr -> id','expr',1,'p_one_expr','Mparser.py',162),
+  ("expr -> expr '",'expr',2,'p_transpose_expr','Mparser.py',172),
+  ('functioncall -> ID ( tuple )','functioncall',4,'p_functioncall','Mparser.py',178),
+  ('constant -> INTNUM','constant',1,'p_constant','Mparser.py',184),
+  ('constant -> FLOATNUM','constant',1,'p_constant','Mparser.py',185),
+  ('constant -> tensor','constant',1,'p_constant','Mparser.py',186),
+  ('constant -> STRING','constant',1,'p_constant_str','Mparser.py',216),
+  ('tensor -> [ tensorelem ]','tensor',3,'p_tensor','Mparser.py',222),
+  ('tensorelem -> constant','tensorelem',1,'p_tensorelem','Mparser.py',227),
+  ('tensorelem -> tensorelem , constant','tensorelem',3,'p_tensorelem','Mparser.py',228),
+  ('assignment -> id = expr','assignment',3,'p_assignment','Mparser.py',237),
+  ('assignment -> id ADDASSIGN expr','assignment',3,'p_assignment','Mparser.py',238),
+  ('assignment -> id SUBASSIGN expr','assignment',3,'p_assignment','Mparser.py',239),
+  ('assignment -> id MULASSIGN expr','assignment',3,'p_assignment','Mparser.py',240),
+  ('assignment -> id DIVASSIGN expr','assignment',3,'p_assignment','Mparser.py',241),
+  ('id -> ID','id',1,'p_id','Mparser.py',247),
+  ('id -> ID [ index ]','id',4,'p_id','Mparser.py',248),
+  ('index -> range','index',1,'p_index','Mparser.py',257),
+  ('index -> expr','index',1,'p_index','Mparser.py',258),
+  ('index -> index , expr','index',3,'p_index','Mparser.py',259),
+  ('index -> index , range','index',3,'p_index','Mparser.py',260),
+]
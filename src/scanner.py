@@ -1,4 +1,6 @@
+import re
 import ply.lex as lex
+from bisect import bisect_right
 
 reserved = {
     'if': 'IF',
@@ -9,9 +11,6 @@ reserved = {
     'continue': 'CONTINUE',
     'return': 'RETURN',
     'print': 'PRINT',
-    'zeros': 'ZEROS',
-    'eye': 'EYE',
-    'ones': 'ONES',
 }
 
 literals = [
@@ -105,9 +104,16 @@ def t_COMMENT(t):
 
 # Error handling rule
 def t_error(t):
-    print(f'Invalid character at line {t.lexer.lineno}')
-    print(t.value[:t.value.find('\n')])
-    print('^')
+    if not getattr(t.lexer, 'final', True) and (len(t.value) == 1 or t.value[0] == '"' and '"' not in t.value[1:]):
+        t.lexer.cut = t.lexpos  # the next chunk of the stream may complete the token, see tokenize
+        t.lexer.skip(len(t.value))
+        return
+    if t.lexpos >= getattr(t.lexer, 'reported', 0):  # a stream lexes the tail of a chunk again with the next one
+        print(f'Invalid character at line {t.lexer.lineno}')
+        print(t.value[:t.value.find('\n')])
+        print('^')
+    if hasattr(t.lexer, 'reported'):
+        t.lexer.reported = t.lexpos + 1
     t.lexer.skip(1)
 
 
@@ -116,4 +122,57 @@ def find_column(text, token):
     return (token.lexpos - line_start) + 1
 
 
-lexer = lex.lex()
+newline = re.compile(r'\n')
+
+
+def tokenize(file, chunk_size=1 << 16):
+    """Tokens of the text read from <file>, as (type, value, lineno, column) tuples.
+
+    The text is read in chunks of <chunk_size> characters and only the tail
+    that the next chunk may change is kept, so memory doesn't grow with the
+    input.  Line and column of a token come from the sorted offsets of the
+    line starts in the buffer instead of a search for the preceding newline.
+    """
+    stream = lexer.clone()
+    buffer = ''
+    lineno = 1
+    reported = 0  # errors before this offset in buffer were printed already
+    line_start = 0  # offset of the start of line <lineno> in buffer, negative when it began in an earlier chunk
+    final = False
+    while not final:
+        chunk = file.read(chunk_size)
+        final = not chunk
+        buffer += chunk
+        starts = [line_start] + [m.end() for m in newline.finditer(buffer)]
+
+        stream.final = final
+        stream.cut = None
+        stream.lineno = lineno
+        stream.reported = reported
+        stream.input(buffer)
+        pending = []  # the last two tokens, the next chunk may still join them: 2.5E|3 lexes as 2.5 and E
+        for token in iter(stream.token, None):  # every other token is complete, it ends before the next two
+            if len(pending) == 2:
+                last = pending.pop(0)
+                i = bisect_right(starts, last.lexpos) - 1
+                yield last.type, last.value, lineno + i, last.lexpos - starts[i] + 1
+            pending.append(token)
+
+        if final or stream.cut is not None:
+            for last in pending:
+                i = bisect_right(starts, last.lexpos) - 1
+                yield last.type, last.value, lineno + i, last.lexpos - starts[i] + 1
+        elif pending:
+            stream.cut = pending[0].lexpos  # lexed again with the next chunk, they may go on there
+        if stream.cut is None:
+            stream.cut = max(starts[-1], 0)  # only blanks and comments left, which end with their line
+
+        i = bisect_right(starts, stream.cut) - 1
+        lineno += i
+        line_start = starts[i] - stream.cut
+        reported = max(stream.reported - stream.cut, 0)
+        buffer = buffer[stream.cut:]
+
+
+# optimize: the regexes come from the shipped lextab.py, delete it to regenerate after changing the tokens
+lexer = lex.lex(optimize=True, lextab='lextab')
@@ -0,0 +1,161 @@
+import io
+import contextlib
+import pytest
+import Mparser
+from Library import functions
+from TypeChecker import TypeChecker
+from main_lab5 import front_end, backends
+from bench_suite import run
+
+# TypeChecker on calls of every function of the Library registry: the
+# (type, shape) its signature gives the result, and the calls it rejects.
+# Then programs calling them on every backend, on a temporary .npy file: the
+# values they print and what is left in the files.
+# usage: cd src && python -m pytest test_library.py
+
+A = 'A = [[1, 2], [3, 4], [5, 6]];'  # int (3, 2)
+F = 'F = [[2.0, 1.0], [1.0, 3.0]];'  # float (2, 2)
+
+# name -> [(program assigning X, its (type, shape)), ...], [program with errors, ...]
+cases = {
+    'zeros': ([('X = zeros(2, 3);', ('float', (2, 3))), ('n = 4; X = zeros(n);', ('float', (None,)))],
+              ['X = zeros([1, 2]);', 'X = zeros(2.5);']),
+    'ones': ([('X = ones(4);', ('float', (4,))), ('X = ones(2, 2) .+ eye(2);', ('float', (2, 2))),
+              ('X = eye(3) .+ ones(3);', ('float', (3, 3)))],
+             ['X = ones(2, 1.5);', 'X = ones(2, 2) .+ ones(3);', 'X = ones(3); X += eye(3);']),
+    'eye': ([('X = eye(3);', ('float', (3, 3))), ('C = eye(2); X = C[0:2, 0:1];', ('float', (2, 1)))],
+            ['X = eye(2, 3);', 'X = eye(2.0);']),
+    'sum': ([(A + 'X = sum(A);', ('int', None)), (A + 'X = sum(A, 0);', ('int', (2,))),
+             (F + 'X = sum(F, 1);', ('float', (2,)))],
+            [A + 'X = sum(A, 2);', 'X = sum(3);', 'X = sum("ab");']),
+    'max': ([(A + 'X = max(A);', ('int', None)), (A + 'X = max(A, 1);', ('int', (3,)))],
+            [A + 'X = max(A, 1.0);']),
+    'min': ([(F + 'X = min(F);', ('float', None)), (F + 'k = 0; X = min(F, k);', ('float', (None,)))],
+            [A + 'X = min(A, A);']),
+    'norm': ([(A + 'X = norm(A);', ('float', None))],
+             ['X = norm(1);', A + 'X = norm(A, 0);']),
+    'dot': ([('X = dot([1, 2], [3, 4]);', ('int', None)), ('X = dot([1, 2], [0.5, 4.0]);', ('float', None))],
+            ['X = dot([1, 2], [3, 4, 5]);', A + 'X = dot(A, [1, 2]);']),
+    'matmul': ([(A + 'X = matmul(A, [1, 2]);', ('int', (3,))), (A + F + 'X = matmul(A, F);', ('float', (3, 2)))],
+               [A + 'X = matmul(A, A);', 'X = matmul([1, 2], [1, 2]);']),
+    'inv': ([(F + 'X = inv(F);', ('float', (2, 2)))],
+            [A + 'X = inv(A);', 'X = inv([1, 2]);']),
+    'solve': ([(F + 'X = solve(F, [1.0, 2.0]);', ('float', (2,))), (F + 'X = solve(F, F);', ('float', (2, 2)))],
+              [F + 'X = solve(F, [1.0, 2.0, 3.0]);', A + 'X = solve(A, [1, 2, 3]);']),
+    'reshape': ([(A + 'X = reshape(A, 2, 3);', ('int', (2, 3))), (A + 'X = reshape(A, 6);', ('int', (6,)))],
+                [A + 'X = reshape(A, 4, 2);', A + 'X = reshape(A);', A + 'X = reshape(A, 2.0, 3);']),
+    'load': ([('X = load("{path}");', ('float', (3, 4))), ('X = load("{path}", "r");', ('float', (3, 4)))],
+             ['X = load("{path}.missing");', 'p = "{path}"; X = load(p);', 'X = load("{path}", "w");']),
+    'save': ([(A + 'X = save(A, "{path}");', ('int', (3, 2)))],
+             ['X = save(1, "{path}");', A + 'X = save(A, 1);']),
+}
+
+
+@pytest.fixture
+def path(tmp_path):  # a .npy file of a float (3, 4) tensor
+    import numpy as np
+    name = str(tmp_path / 'a.npy')
+    np.save(name, np.zeros((3, 4)))
+    return name
+
+
+def check(text):  # (type, shape) TypeChecker gives X in program <text>, and the number of errors
+    checker = TypeChecker()
+    with contextlib.redirect_stdout(io.StringIO()):
+        checker.visit(Mparser.parser.parse(text, lexer=Mparser.scanner.clone(), tracking=True))
+    symbol = checker.current_scope.get('X')
+    return symbol.type if symbol is not None else None, checker.error_count
+
+
+def test_every_function_is_covered():
+    assert set(cases) == set(functions)
+
+
+@pytest.mark.parametrize('name', sorted(cases))
+def test_signature(name, path):
+    accepted, rejected = cases[name]
+    for text, expected in accepted:
+        assert check(text.format(path=path)) == (expected, 0), text
+    for text in rejected:
+        assert check(text.format(path=path))[1] > 0, text
+
+
+@pytest.mark.parametrize('backend', backends)
+@pytest.mark.parametrize('name', ['zeros', 'ones', 'eye'])
+def test_failing_calls_are_reported(name, backend):
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast = front_end(f'n = 0 - 2; X = {name}(n);', optimize=True)
+    with pytest.raises(RuntimeError, match=f'^{name}: negative dimensions are not allowed'):
+        run(ast, backend)
+
+
+@pytest.fixture
+def data(tmp_path):  # a .npy file of the float (3, 4) tensor 0, 1, ..., 11
+    import numpy as np
+    name = str(tmp_path / 'data.npy')
+    np.save(name, np.arange(12.0).reshape(3, 4))
+    return name
+
+
+def output(text, backend):  # what program <text> prints on <backend>
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        ast = front_end(text, optimize=True)
+        assert ast is not None, out.getvalue()
+        run(ast, backend)
+    return out.getvalue().split('\n')[:-1]
+
+
+def unchanged(path):
+    import numpy as np
+    return (np.load(path) == np.arange(12.0).reshape(3, 4)).all()
+
+
+@pytest.mark.parametrize('backend', backends)
+def test_load_maps_the_file(data, backend):
+    text = f'A = load("{data}"); S = A[0:2, 1:3]; print A[1, 2], sum(A); print S[1, 1], sum(S), sum(A[2]);'
+    assert output(text, backend) == ['6.0 66.0', '6.0 14.0 38.0']
+
+
+@pytest.mark.parametrize('backend', backends)
+def test_writes_to_a_mapping_stay_private(data, backend):
+    text = f'A = load("{data}"); A[0, 0] = 100; S = A[1:3, 0:2]; S += S; A += A; print A[0, 0], A[1, 0], sum(A);'
+    assert output(text, backend) == ['200.0 16.0 384.0']
+    assert unchanged(data)
+
+
+@pytest.mark.parametrize('backend', backends)
+def test_read_only_mappings_are_copied_or_refused(data, backend):
+    text = f'R = load("{data}", "r"); R += R; print R[1, 1], sum(R);'
+    assert output(text, backend) == ['10.0 132.0']
+    with pytest.raises(RuntimeError, match='assignment destination is read-only'):
+        output(f'R = load("{data}", "r"); R[0, 0] = 1;', backend)
+    assert unchanged(data)
+
+
+@pytest.mark.parametrize('backend', backends)
+def test_save_round_trips(data, tmp_path, backend):
+    import numpy as np
+    copy = str(tmp_path / 'copy.npy')
+    text = f'A = load("{data}"); B = save(A .+ A, "{copy}"); print sum(B);'
+    assert output(text, backend) == ['132.0']
+    assert (np.load(copy) == 2 * np.arange(12.0).reshape(3, 4)).all()
+    assert output(f'C = load("{copy}", "r"); print C[2, 3];', backend) == ['22.0']
+
+
+@pytest.mark.parametrize('backend', backends)
+def test_save_over_a_mapped_file(data, backend):
+    import numpy as np
+    text = f'A = load("{data}", "r"); B = save(A .* A, "{data}"); print A[1, 1], B[1, 1];'
+    assert output(text, backend) == ['5.0 25.0']  # A still maps the old file
+    assert (np.load(data) == np.arange(12.0).reshape(3, 4) ** 2).all()
+
+
+@pytest.mark.parametrize('backend', backends)
+def test_zeros_ones_eye_values(backend):
+    text = """
+    E = eye(3); O = ones(2, 3); X = eye(2) .+ ones(2);
+    print sum(E), E[1, 1], E[0, 1], sum(O), O[1, 2], X[0, 0], X[0, 1];
+    for i = 0:3 { Z = zeros(2, 2); print sum(Z); Z[0, 0] = 7; E = eye(2); E[0, 1] = 5; }
+    print E[0, 1], E[1, 0];
+    """
+    assert output(text, backend) == ['3.0 1.0 0.0 6.0 1.0 2.0 1.0', '0.0', '0.0', '0.0', '5.0 0.0']
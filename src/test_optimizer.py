@@ -0,0 +1,102 @@
+import io
+import os
+import glob
+import contextlib
+import pytest
+import AST
+from main_lab5 import front_end, backends
+from bench_suite import run
+
+# Differential tests of the optimization passes: every program of
+# lab5/optimizer, one per pass, prints the same on every backend as the
+# unoptimized program does on the interpreter.  A few checks of the optimized
+# trees make sure the passes still fire on the programs.
+# usage: cd src && python -m pytest test_optimizer.py
+
+directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lab5', 'optimizer')
+programs = sorted(glob.glob(os.path.join(directory, '*.m')))
+
+
+def source(name):
+    with open(os.path.join(directory, name)) as file:
+        return file.read()
+
+
+def tree(text, optimize=True):
+    with contextlib.redirect_stdout(io.StringIO()) as errors:
+        ast = front_end(text, optimize)
+    assert ast is not None, errors.getvalue()
+    return ast
+
+
+def output(text, backend, optimize):
+    ast = tree(text, optimize)
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        run(ast, backend)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize('backend', backends)
+@pytest.mark.parametrize('path', programs, ids=os.path.basename)
+def test_optimized_output(path, backend):
+    with open(path) as file:
+        text = file.read()
+    assert output(text, backend, optimize=True) == output(text, 'interpreter', optimize=False)
+
+
+def test_invariant_scalars_are_hoisted():
+    ast = tree(source('loop_invariant_motion.m'))
+    temporaries = [n for n in ast.nodes() if isinstance(n, AST.Assignment) and n.identifier.name.startswith('_t')]
+    assert len(temporaries) == 1 and temporaries[0].expr.shape is None
+
+
+def test_aliased_tensors_are_not_hoisted():
+    ast = tree('A = ones(2, 2); B = A; for i = 0:3 { B[0, 0] = i; x = A .+ A; print x[0, 0]; }')
+    assert not [n for n in ast.nodes() if isinstance(n, AST.Variable) and n.name.startswith('_t')]
+
+
+def test_tensors_of_unknown_shapes_are_not_hoisted():
+    ast = tree('n = 2; A = zeros(n); B = zeros(n); k = 0; while (k < 3) { x = A .+ B; k += 1; }')
+    assert not [n for n in ast.nodes() if isinstance(n, AST.Variable) and n.name.startswith('_t')]
+
+
+def test_elementwise_loops_are_vectorized():
+    ast = tree('A = [1, 2, 3]; C = zeros(3); for i = 0:3 C[i] = A[i] * 2;')
+    assert not [n for n in ast.nodes() if isinstance(n, AST.ForLoop)]
+
+
+def test_nested_loops_are_vectorized():
+    ast = tree('M = [[1, 2], [3, 4], [5, 6]]; K = zeros(3, 2); for i = 0:3 { for j = 0:2 { K[i, j] = M[i, j] * 10; } }')
+    assert not [n for n in ast.nodes() if isinstance(n, AST.ForLoop)]
+
+
+def test_broadcasting_loops_are_not_vectorized():
+    ast = tree('A = [1, 2, 3]; C = zeros(3, 3); for i = 0:3 C[i] = A[i];')
+    assert [n for n in ast.nodes() if isinstance(n, AST.ForLoop)]
+
+
+def test_loops_over_views_are_not_vectorized():
+    ast = tree('A = zeros(5); B = A[1:5]; C = B; for i = 0:4 C[i] = A[i] + 1;')
+    assert [n for n in ast.nodes() if isinstance(n, AST.ForLoop)]
+
+
+def test_loops_to_a_variable_end_are_not_vectorized():
+    ast = tree('n = 0 - 1; C = zeros(3); for i = 0:n C[i] = 5;')
+    assert [n for n in ast.nodes() if isinstance(n, AST.ForLoop)]
+
+
+def test_constants_are_folded():
+    ast = tree(source('constant_folder.m'))
+    assert not [n for n in ast.nodes() if isinstance(n, (AST.IfElse, AST.While))]
+    assert isinstance(ast.instructions[0].expr, AST.IntNum) and ast.instructions[0].expr.value == 22
+
+
+def test_binary_expressions_are_specialized():
+    ast = tree(source('type_specializer.m'))
+    assert [n for n in ast.nodes() if isinstance(n, AST.ScalarBinExpr)]
+    assert [n for n in ast.nodes() if isinstance(n, AST.TensorBinExpr)]
+
+
+def test_tensor_expressions_are_fused():
+    ast = tree(source('tensor_fuser.m'))
+    assert len([n for n in ast.nodes() if isinstance(n, AST.FusedExpr)]) >= 6
@@ -0,0 +1,29 @@
+import io
+import contextlib
+from main_lab5 import front_end
+from Interpreter import Interpreter
+from Profiler import TensorProfiler
+
+# Tensor memory accounting next to the buffer pool: the pool keeps the dead
+# tensors of a plain run for reuse, the peak TensorProfiler reports is still
+# the memory the program holds.
+# usage: cd src && python -m pytest test_profiler.py
+
+program = 'for i = 1:40 Z = zeros(i, 1000);'
+
+
+def run(backend):
+    with contextlib.redirect_stdout(io.StringIO()):
+        front_end(program, optimize=True).accept(backend)
+    return backend
+
+
+def test_pool_keeps_dead_tensors():
+    interpreter = run(Interpreter())
+    assert interpreter.pool.misses == 39 and interpreter.pool.retained == sum(range(1, 40)) * 1000 * 8
+
+
+def test_peak_counts_only_live_tensors():
+    profiler = run(TensorProfiler())
+    assert profiler.peak == (38 + 39) * 1000 * 8  # the last Z and the one replacing it
+    assert sum([entry[0] for entry in profiler.lines.values()]) == 39
@@ -0,0 +1,35 @@
+import io
+import os
+import glob
+import pytest
+import scanner
+
+# Streaming tokenizer against the plain lexer on the whole text: the same
+# tokens at the same lines and columns, whatever the chunk boundaries split.
+# usage: cd src && python -m pytest test_scanner.py
+
+directory = os.path.dirname(os.path.abspath(__file__))
+
+
+def source(path):
+    with open(path) as file:
+        return file.read()
+
+
+texts = [source(path) for path in sorted(glob.glob(os.path.join(directory, 'lab*', '**', '*.m'), recursive=True))] + [
+    'x = 2.5E3 + 12 .* .5E1;\ny = 1.;  # 2.5E3\nz = x <= y;\n',
+    's = "two\nlines"; t = 10;\n\n\n# the end',
+]
+
+
+def plain(text):  # (type, value, lineno, column) of every token of <text>, lexed at once
+    lexer = scanner.lexer.clone()
+    lexer.input(text)
+    return [(t.type, t.value, text.count('\n', 0, t.lexpos) + 1, scanner.find_column(text, t)) for t in iter(lexer.token, None)]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 8, 13])
+@pytest.mark.parametrize('index', range(len(texts)))
+def test_chunks_lex_as_the_whole_text(index, chunk_size):
+    text = texts[index]
+    assert list(scanner.tokenize(io.StringIO(text), chunk_size=chunk_size)) == plain(text)
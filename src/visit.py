@@ -18,33 +18,55 @@ def when(param_type):
         if not isinstance(dispatcher, Dispatcher):
             dispatcher = dispatcher.dispatcher
         dispatcher.add_target(param_type, fn)
-
-        def ff(*args, **kw):
-            return dispatcher(*args, **kw)
-        ff.dispatcher = dispatcher
-        return ff
+        return dispatcher.entry
     return f
 
 
+class DispatchCache(dict):
+    """Handler of every concrete class seen so far, resolved once through the MRO."""
+
+    def __init__(self, targets):
+        super().__init__()
+        self.targets = targets
+
+    def __missing__(self, typ):
+        for cls in typ.__mro__:
+            if cls in self.targets:
+                self[typ] = self.targets[cls]
+                return self[typ]
+        raise TypeError(f'no target registered for {typ.__name__}')
+
+
 class Dispatcher(object):
     def __init__(self, param_name, fn):
-        self.param_index = self.__argspec(fn).args.index(param_name)
+        argspec = self.__argspec(fn)
+        self.param_index = argspec.args.index(param_name)
         self.param_name = param_name
         self.targets = {}
+        self.cache = DispatchCache(self.targets)
+        self.entry = self.__entry(argspec)
+        self.entry.dispatcher = self
 
     def __call__(self, *args, **kw):
-        typ = args[self.param_index].__class__
-        d = self.targets.get(typ)
-        if d is not None:
-            return d(*args, **kw)
-        else:
-            issub = issubclass
-            t = self.targets
-            ks = iter(t)
-            return [t[k](*args, **kw) for k in ks if issub(typ, k)]
+        return self.cache[args[self.param_index].__class__](*args, **kw)
 
     def add_target(self, typ, target):
         self.targets[typ] = target
+        self.cache.clear()
+
+    def __entry(self, argspec):
+        # The function that replaces the decorated method: a single cache lookup, no extra call layer.
+        # Plain (self, node) methods get an exact signature to avoid packing *args/**kw.
+        cache = self.cache
+        if self.param_index == 1 and len(argspec.args) == 2 and not (argspec.varargs or argspec.varkw):
+            def entry(self, node):
+                return cache[node.__class__](self, node)
+        else:
+            param_index = self.param_index
+
+            def entry(*args, **kw):
+                return cache[args[param_index].__class__](*args, **kw)
+        return entry
 
     @staticmethod
     def __argspec(fn):